@@ -181,7 +181,7 @@ def main(argv=[]):
     authentication information required to get the data. Note that the download
     is a request to Amazon S3, not to the Pinterest API itself.
     """
-    download_file(report.url(), path)
+    download_file(report.url(), path, session=api_config.session)
 
 
 if __name__ == "__main__":
@@ -14,12 +14,13 @@ from os.path import abspath, dirname, join
 sys.path.append(abspath(join(dirname(__file__), "..", "src")))
 
 from access_token import AccessToken
-from api_common import SpamException
 from api_config import ApiConfig
-from arguments import common_arguments
+from arguments import common_arguments, positive_integer, prefetch_argument
 from board import Board
+from board_copier import COPY_STRATEGIES, DEFAULT_CONCURRENCY, BoardCopier
+from copy_journal import CopyJournal
+from copy_plan import CopyPlan
 from oauth_scope import Scope
-from pin import Pin
 from user import User
 
 
@@ -47,9 +48,19 @@ def main(argv=[]):
     3. Copy all of the boards from one account to another. This use case is designed
        to be used by developers to create a test account. This use case creates a lot
        of data, so it is advisable to use the dry-run argument to verify the pins and
-       boards to be copied.
+       boards to be copied. The dry run ends with a plan that estimates the number of
+       entities to create, the number of API requests, and the time of the copy.
          ./copy_board.py --dry-run --all -s source_account_token.json -t target_account_token.json
          ./copy_board.py --all -s source_account_token.json -t target_account_token.json
+       Use the journal argument so that the copy can be resumed if it is interrupted.
+       Running the same command again skips the boards, sections, and pins that were
+       copied before the interruption.
+         ./copy_board.py --all --journal copy.ndjson -s source_account_token.json -t target_account_token.json
+       Use the dedup argument to copy into the boards and sections that already exist
+       in the target account (with the same names), and to skip the pins that are
+       already on the target boards (with the same link, title, and image). This
+       argument makes it possible to copy only the pins added since a previous copy.
+         ./copy_board.py --all --dedup -s source_account_token.json -t target_account_token.json
     """  # noqa: E501 because the long command lines are okay
     parser = argparse.ArgumentParser(description="Copy one Board or all Boards")
     parser.add_argument("-b", "--board-id", help="source board identifier")
@@ -65,6 +76,28 @@ def main(argv=[]):
     parser.add_argument(
         "--dry-run", action="store_true", help="print changes but do not execute them"
     )
+    parser.add_argument(
+        "--concurrency",
+        type=positive_integer,
+        default=DEFAULT_CONCURRENCY,
+        help="number of pins to create at the same time",
+    )
+    parser.add_argument(
+        "--strategy",
+        choices=COPY_STRATEGIES,
+        default="auto",
+        help="save pins (same account), create new pins, or choose automatically",
+    )
+    parser.add_argument(
+        "--journal",
+        help="file that records the copied entities, to resume an interrupted copy",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="skip boards, sections, and pins that already exist in the target",
+    )
+    prefetch_argument(parser)
     common_arguments(parser)
     args = parser.parse_args(argv)
 
@@ -112,26 +145,6 @@ def main(argv=[]):
     # get configuration from defaults and/or the environment
     api_config = ApiConfig(verbosity=args.log_level)
 
-    # helper function to copy a pin
-    def copy_pin(pin, pin_data, target_board_id, target_section_id=None):
-        try:
-            pintype = pin_data.get("type")
-            # Sometimes the board list operation will generate entities
-            # (e.g. "more ideas" tiles) that resemble pins but can not be copied.
-            if not pintype or pintype == "pin":
-                print("source pin:")
-                Pin.print_summary(pin_data)
-                target_pin_data = pin.create(
-                    pin_data, target_board_id, target_section_id
-                )
-                print("target pin:")
-                Pin.print_summary(target_pin_data)
-            else:
-                print("skipping pin because type is not 'pin'")
-                Pin.print_summary(pin_data)
-        except SpamException:
-            print("skipping pin because of spam exception")
-
     # Note: The same API configuration is used with both the source
     # and target access tokens.
     if args.source_access_token:
@@ -143,88 +156,63 @@ def main(argv=[]):
     # Default to use the source token (same account) if the target
     # token is not specified.
     target_token_scopes = [Scope.WRITE_PINS, Scope.WRITE_BOARDS]
+    if args.target_access_token and args.strategy == "auto":
+        # read both user accounts to determine whether they are the same
+        source_token_scopes.append(Scope.READ_USERS)
+        target_token_scopes.append(Scope.READ_USERS)
+    if args.dedup:  # read the boards and pins of the target account
+        target_token_scopes += [Scope.READ_BOARDS, Scope.READ_PINS]
+    if args.journal and Scope.READ_USERS not in target_token_scopes:
+        target_token_scopes.append(Scope.READ_USERS)  # identify the target account
     if args.target_access_token:
         target_token = AccessToken(api_config, name=args.target_access_token)
         target_token.fetch(scopes=target_token_scopes)
     else:
         target_token = source_token  # use the same token...
-        source_token_scopes += target_token_scopes  # ...with all scopes
+        source_token_scopes += [  # ...with all scopes
+            scope for scope in target_token_scopes if scope not in source_token_scopes
+        ]
 
     source_token.fetch(scopes=source_token_scopes)  # get the source token
 
-    # This Pin object is reusable. The pin_id attribute is set when the
-    # create method is called successfully.
-    target_pin = Pin(None, api_config, target_token)
-
     if args.all_boards:  # copy all boards for the source user
         user = User(api_config, source_token)
         boards = user.get_boards()
-        source_board = Board(
-            None, api_config, source_token
-        )  # board_id set in loop below
     else:  # copy just the board designated by board_id
         source_board = Board(args.board_id, api_config, source_token)
-        source_board_data = source_board.get()
-        boards = [source_board_data]
-
-    for source_board_data in boards:
-        print("source board:")
-        Board.print_summary(source_board_data)
-        source_board.board_id = source_board_data["id"]
-
-        # Use different name, which is mandatory when using a single access token.
-        # Change the name after the Board.print_summary with the source name.
-        if args.name:
-            print('setting target board name to "' + args.name + '"')
-            source_board_data["name"] = args.name
-
-        # This Board object is reusable. The board_id is set when the
-        # create method is called successfully.
-        target_board = Board(None, api_config, target_token)
-        if args.dry_run:
-            print("dry-run: skipping attempt to create board:")
-            Board.print_summary(source_board_data)
+        boards = [source_board.get()]
+
+    journal = None
+    if args.journal:
+        # the entities in the journal were created in the target account
+        target_user_data = User(api_config, target_token).get()
+        try:
+            journal = CopyJournal(args.journal, target_user_data.get("username"))
+        except ValueError as error:
+            parser.error(str(error))
+    plan = None
+    if args.dry_run:
+        plan = CopyPlan(api_config.rate_limits, concurrency=args.concurrency)
+    with BoardCopier(
+        api_config,
+        source_token,
+        target_token,
+        concurrency=args.concurrency,
+        dry_run=args.dry_run,
+        prefetch=args.prefetch,
+        journal=journal,
+        strategy=args.strategy,
+        plan=plan,
+        dedup=args.dedup,
+    ) as copier:
+        for source_board_data in boards:
+            copier.copy_board(source_board_data, name=args.name)
+        if plan:
+            plan.print_summary()
         else:
-            target_board_data = target_board.create(source_board_data)
-            print("target board:")
-            Board.print_summary(target_board_data)
-
-        # copy board pins
-        for pin_data in source_board.get_pins():
-            # ignore pins in sections for now. they will be copied into each section
-            if pin_data.get("board_section_id"):
-                continue
-            if args.dry_run:
-                print("dry-run: skipping attempt to create board pin:")
-                Pin.print_summary(pin_data)
-            else:
-                copy_pin(target_pin, pin_data, target_board_data["id"])
-
-        # get and copy board sections
-        sections_iterator = source_board.get_sections()
-        for idx, section_data in enumerate(sections_iterator):
-            if args.dry_run:
-                print("dry-run: skipping attempt to create board section:")
-                Board.print_section(section_data)
-            else:
-                print(f"source section #{idx}:")
-                Board.print_section(section_data)
-                target_section_data = target_board.create_section(section_data)
-                print(f"target section #{idx}:")
-                Board.print_section(target_section_data)
-
-            # copy board section pins
-            for pin_data in source_board.get_section_pins(section_data["id"]):
-                if args.dry_run:
-                    print("dry-run: skipping attempt to create board section pin:")
-                    Pin.print_summary(pin_data)
-                else:
-                    copy_pin(
-                        target_pin,
-                        pin_data,
-                        target_board_data["id"],
-                        target_section_data["id"],
-                    )
+            print("pins:", copier.summary())
+    if journal:
+        journal.close()
 
 
 # If this script is being called from the command line, call the main function
@@ -16,6 +16,7 @@ sys.path.append(abspath(join(dirname(__file__), "..", "src")))
 from access_token import AccessToken
 from api_config import ApiConfig
 from arguments import common_arguments
+from media_cache import MediaCache
 from oauth_scope import Scope
 from pin import Pin
 
@@ -29,14 +30,26 @@ def main(argv=[]):
     this script will copy the pin to the board section. Section identifiers can be
     found using the get_board.py script. A section identifier may not be specified
     without a board identifier.
+
+    When more than one media is specified, a video pin is created for each
+    media. The videos are uploaded and processed concurrently.
     """
     parser = argparse.ArgumentParser(description="Copy a Pin")
     parser.add_argument("-p", "--pin-id", required=True, help="source pin identifier")
-    parser.add_argument("-m", "--media", help="media path or id")
+    parser.add_argument(
+        "-m",
+        "--media",
+        action="append",
+        help="media path or id; repeat to create a pin for each media",
+    )
     parser.add_argument(
         "-b", "--board-id", required=True, help="destination board identifier"
     )
     parser.add_argument("-s", "--section", help="destination board section")
+    parser.add_argument(
+        "--media-cache",
+        help="file with the media ids of uploaded videos, to avoid uploading again",
+    )
     common_arguments(parser)
     args = parser.parse_args(argv)
 
@@ -44,15 +57,26 @@ def main(argv=[]):
     api_config = ApiConfig(verbosity=args.log_level)
 
     access_token = AccessToken(api_config, name=args.access_token)
-    access_token.fetch(scopes=[Scope.READ_PINS, Scope.WRITE_BOARDS, Scope.WRITE_PINS])
+    scopes = [Scope.READ_PINS, Scope.WRITE_BOARDS, Scope.WRITE_PINS]
+    if args.media_cache:  # the media cache is keyed by user account
+        scopes.append(Scope.READ_USERS)
+    access_token.fetch(scopes=scopes)
 
     pin = Pin(args.pin_id, api_config, access_token)
+    if args.media_cache:
+        pin.media_cache = MediaCache(args.media_cache)
     pin_data = pin.get()
     print("source pin:")
     Pin.print_summary(pin_data)
-    new_pin_data = pin.create(pin_data, args.board_id, args.section, args.media)
-    print("new pin:")
-    Pin.print_summary(new_pin_data)
+    with pin.media_upload_manager() as uploads:
+        for media in args.media or []:  # start all of the uploads
+            uploads.upload(media)
+        for media in args.media or [None]:
+            new_pin_data = pin.create(
+                pin_data, args.board_id, args.section, media, uploads=uploads
+            )
+            print("new pin:")
+            Pin.print_summary(new_pin_data)
 
 
 if __name__ == "__main__":
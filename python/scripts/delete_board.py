@@ -4,6 +4,7 @@
 # useful for developers who need to clean up test pins, boards, and accounts.
 #
 import argparse
+import datetime
 import sys
 from os.path import abspath, dirname, join
 
@@ -11,30 +12,79 @@ sys.path.append(abspath(join(dirname(__file__), "..", "src")))
 
 from access_token import AccessToken
 from api_config import ApiConfig
-from arguments import common_arguments
+from arguments import common_arguments, positive_integer
 from board import Board
+from board_deleter import (
+    DEFAULT_DELETE_CONCURRENCY,
+    BoardDeleter,
+    BoardFilter,
+    read_board_ids,
+)
 from oauth_scope import Scope
 from user import User
 from utils import input_one_of
 
 
+def iso_date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{value} must be a date like 2022-12-31")
+
+
 def main(argv=[]):
     """
     This script is intended primarily for developers who need to delete boards
     that were used for test purposes. The script requests input that verifies
     the intent to permanantly delete data.
-    """
+
+    By default, the script asks for confirmation before deleting each board.
+    Use --batch to delete many boards (e.g. after a load test) with a single
+    confirmation. In batch mode, the boards are deleted concurrently. The boards
+    can be selected with a regular expression for the name, a creation date,
+    or a file with one board identifier on each line. For example:
+      ./delete_board.py --all-boards --batch --name-regex '^load test' --created-before 2022-12-31
+      ./delete_board.py --board-list boards.txt --batch --concurrency 8
+    """  # noqa: E501 because the long command lines are okay
     parser = argparse.ArgumentParser(description="Delete one Board or all Boards")
     parser.add_argument("-b", "--board-id", help="identifier of board to be deleted")
     parser.add_argument(
         "--all-boards", action="store_true", help="delete all boards from the account"
     )
+    parser.add_argument(
+        "--board-list", help="file with the identifiers of the boards to be deleted"
+    )
+    parser.add_argument(
+        "--name-regex", help="only delete boards with names that match the regex"
+    )
+    parser.add_argument(
+        "--created-before",
+        type=iso_date,
+        help="only delete boards created before the date (YYYY-MM-DD)",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="confirm once and delete the boards concurrently",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=positive_integer,
+        default=DEFAULT_DELETE_CONCURRENCY,
+        help="number of boards to delete at the same time in batch mode",
+    )
     common_arguments(parser)
     args = parser.parse_args(argv)
 
-    # Check the arguments: need specify exactly one of board_id and all_boards.
-    if not (bool(args.board_id) ^ bool(args.all_boards)):
-        parser.error("specify exactly one of --board-id and --all-boards")
+    # Check the arguments: need specify exactly one way to select the boards.
+    if [bool(args.board_id), args.all_boards, bool(args.board_list)].count(True) != 1:
+        parser.error(
+            "specify exactly one of --board-id, --all-boards, and --board-list"
+        )
+    if args.board_id and (args.name_regex or args.created_before):
+        parser.error(
+            "--name-regex and --created-before can not be used with --board-id"
+        )
 
     # get configuration from defaults and/or the environment
     api_config = ApiConfig(verbosity=args.log_level)
@@ -43,16 +93,45 @@ def main(argv=[]):
     access_token = AccessToken(api_config, name=args.access_token)
     access_token.fetch(scopes=[Scope.READ_USERS, Scope.READ_BOARDS, Scope.WRITE_BOARDS])
 
-    if args.all_boards:  # delete all boards for the user
-        user = User(api_config, access_token)
-        user_data = user.get()
-        boards = user.get_boards()
-        confirmation = f"Delete all boards for {user_data['username']}"
-    else:  # copy just the board designated by board_id
+    skipped_boards = []  # boards that do not match the filter
+    if args.board_id:  # delete just the board designated by board_id
         deletion_board = Board(args.board_id, api_config, access_token)
         board_data = deletion_board.get()
         confirmation = f"Delete this board: {Board.text_id(board_data)}"
         boards = [board_data]
+    else:  # delete the boards of the user that match the filter
+        board_ids = read_board_ids(args.board_list) if args.board_list else None
+        board_filter = BoardFilter(
+            name_pattern=args.name_regex,
+            created_before=args.created_before,
+            board_ids=board_ids,
+        )
+        user = User(api_config, access_token)
+        user_data = user.get()
+        boards = []
+        for board_data in user.get_boards():
+            if board_filter.matches(board_data):
+                boards.append(board_data)
+            else:
+                skipped_boards.append(board_data)
+        found = set(board_data["id"] for board_data in boards)
+        for board_id in board_ids or []:
+            if board_id not in found:
+                print(f"board {board_id} not found")
+                skipped_boards.append({"id": board_id})
+        if args.all_boards and not (args.name_regex or args.created_before):
+            confirmation = f"Delete all boards for {user_data['username']}"
+        else:
+            confirmation = f"Delete {len(boards)} boards for {user_data['username']}"
+
+    if not boards:
+        print("No boards to delete.")
+        exit()
+
+    if args.batch:  # list the boards, because there is only one confirmation
+        print(f"{len(boards)} boards will be deleted:")
+        for board_data in boards:
+            print("  ", Board.text_id(board_data))
 
     try:
         print(
@@ -72,17 +151,30 @@ def main(argv=[]):
         print("Deletion not confirmed. Exiting.")
         exit()
 
-    deletion_board = Board(None, api_config, access_token)  # board_id set in loop below
-    for board_data in boards:
-        # one final check before deletion
-        Board.print_summary(board_data)
-        if "yes" != input_one_of(
-            f"Delete board: {Board.text_id(board_data)}? ", ["yes", "no"], "yes"
-        ):
-            continue
-
-        deletion_board.board_id = board_data["id"]
-        deletion_board.delete()
+    concurrency = args.concurrency if args.batch else 1
+    with BoardDeleter(api_config, access_token, concurrency=concurrency) as deleter:
+        for board_data in skipped_boards:
+            deleter.skip(board_data)
+        if args.batch:
+            deleter.delete_boards(boards)
+        else:
+            for board_data in boards:
+                # one final check before deletion
+                Board.print_summary(board_data)
+                if "yes" == input_one_of(
+                    f"Delete board: {Board.text_id(board_data)}? ",
+                    ["yes", "no"],
+                    "yes",
+                ):
+                    deleter.delete_board(board_data)
+                else:
+                    deleter.skip(board_data)
+
+    summary = deleter.summary()
+    print(
+        f"deleted: {summary['deleted']}, failed: {summary['failed']}, "
+        f"skipped: {summary['skipped']}"
+    )
 
 
 # If this script is being called from the command line, call the main function
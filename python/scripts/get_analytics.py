@@ -9,8 +9,10 @@ sys.path.append(abspath(join(dirname(__file__), "..", "src")))
 from access_token import AccessToken
 from advertisers import Advertisers
 from analytics import AdAnalytics, PinAnalytics, UserAnalytics
+from analytics_store import DEFAULT_SETTLING_DAYS, AnalyticsStore
+from analytics_table import AnalyticsTable
 from api_config import ApiConfig
-from arguments import common_arguments
+from arguments import common_arguments, non_negative_integer
 from oauth_scope import Scope
 from user import User
 from utils import input_number, input_path_for_write
@@ -71,6 +73,14 @@ def main(argv=[]):
     metrics values, at least one linked Ad Account needs to have an active
     advertising campaign. The access token requires READ_USERS and
     READ_ADVERTISERS scopes.
+
+    Use the analytics-store argument to save the daily metrics in a SQLite
+    database, so that running the script again only requests the days that
+    are not in the database, as well as the most recent days (specified by the
+    settling-days argument) which may still change.
+
+    Advertising analytics with a granularity other than DAY are computed from
+    the daily metrics, so the analytics-store can be used for any granularity.
     """
     parser = argparse.ArgumentParser(description="Get Analytics")
     parser.add_argument(
@@ -99,6 +109,21 @@ def main(argv=[]):
         "--ad-group-id", help="Get analytics for this ad group identifier."
     )
     parser.add_argument("--ad-id", help="Get analytics for this ad identifier.")
+    parser.add_argument(
+        "--analytics-store", help="SQLite file used to save the daily metrics."
+    )
+    parser.add_argument(
+        "--settling-days",
+        type=non_negative_integer,
+        default=DEFAULT_SETTLING_DAYS,
+        help="Request the metrics for this number of recent days again.",
+    )
+    parser.add_argument(
+        "--granularity",
+        default="DAY",
+        choices=["DAY", "WEEK", "MONTH", "TOTAL"],
+        help="Granularity of advertising analytics, computed from daily metrics.",
+    )
     common_arguments(parser)
     args = parser.parse_args(argv)
 
@@ -136,6 +161,12 @@ def main(argv=[]):
     user_data = user.get()
     user.print_summary(user_data)
 
+    analytics_store = None
+    if args.analytics_store:
+        analytics_store = AnalyticsStore(
+            args.analytics_store, settling_days=args.settling_days
+        )
+
     if args.analytics_object == "user":
         # Get analytics for the user account associated with the access token.
         analytics = (
@@ -143,6 +174,7 @@ def main(argv=[]):
             .last_30_days()
             .metrics({"IMPRESSION", "PIN_CLICK_RATE"})
         )
+        analytics.analytics_store = analytics_store
         results = analytics.get()  # not calling with an ad_account_id argument
     elif args.analytics_object == "pin":
         # Get analytics for the pin.
@@ -151,6 +183,7 @@ def main(argv=[]):
             .last_30_days()
             .metrics({"IMPRESSION", "PIN_CLICK"})
         )
+        analytics.analytics_store = analytics_store
         results = analytics.get(args.ad_account_id)  # ad account id may be None
     elif args.analytics_object == "ad_account_user":
         # Get analytics for the user account associated with an ad account.
@@ -159,6 +192,7 @@ def main(argv=[]):
             .last_30_days()
             .metrics({"IMPRESSION", "PIN_CLICK_RATE"})
         )
+        analytics.analytics_store = analytics_store
         advertisers = Advertisers(user_data.get("id"), api_config, access_token)
         # When using find_and_get_analytics, analytics.get() will be called with
         # an ad_account_id argument.
@@ -179,8 +213,10 @@ def main(argv=[]):
             AdAnalytics(api_config, access_token)
             .last_30_days()
             .metrics({"SPEND_IN_DOLLAR", "TOTAL_CLICKTHROUGH"})
-            .granularity("DAY")
+            .granularity(args.granularity)
         )
+        analytics.analytics_store = analytics_store
+        analytics.local_rollup = True
         advertisers = Advertisers(user_data.get("id"), api_config, access_token)
         ads_entities = [
             {
@@ -225,9 +261,19 @@ def main(argv=[]):
         return
 
     # Prompt for the name of an output file and write the analytics results.
+    # The daily metrics are written as a table when the name ends with .csv.
     path = input_path_for_write(
         "Please enter a file name for the analytics output:", "analytics_output.json"
     )
+    if path.endswith(".csv"):
+        if isinstance(results, dict):  # user or pin analytics
+            table = AnalyticsTable.from_organic(results)
+        else:
+            table = AnalyticsTable.from_rows(results)
+        with open(path, "w", newline="") as csv_file:
+            table.to_csv(csv_file)
+        return
+
     with open(path, "w") as json_file:
         json.dump(results, json_file, indent=2)
 
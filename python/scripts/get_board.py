@@ -8,7 +8,7 @@ sys.path.append(abspath(join(dirname(__file__), "..", "src")))
 
 from access_token import AccessToken
 from api_config import ApiConfig
-from arguments import common_arguments
+from arguments import common_arguments, prefetch_argument
 from board import Board
 from oauth_scope import Scope
 from pin import Pin
@@ -28,6 +28,7 @@ def main(argv=[]):
     parser.add_argument(
         "--pins", action="store_true", help="Get the Pins for the Board"
     )
+    prefetch_argument(parser, stream=True)
     common_arguments(parser)
     args = parser.parse_args(argv)
 
@@ -43,20 +44,24 @@ def main(argv=[]):
     access_token.fetch(scopes=scopes)
 
     board = Board(args.board_id, api_config, access_token)
+    board.prefetch = args.prefetch
+    board.stream = args.stream
     board_data = board.get()
     board.print_summary(board_data)
 
-    if args.pins:
-        for pin_data in board.get_pins():
-            # ignore pins in sections for now. they will be printed for each section
-            if not pin_data.get("board_section_id"):
-                Pin.print_summary(pin_data)
+    if not args.pins:
+        for section_data in board.get_sections():
+            board.print_section(section_data)
+        return
 
-    for section_data in board.get_sections():
+    # list the pins once, grouped by section
+    snapshot = board.get_snapshot()
+    for pin_data in snapshot.board_pins:
+        Pin.print_summary(pin_data)
+    for section_data in snapshot.sections:
         board.print_section(section_data)
-        if args.pins:
-            for pin_data in board.get_section_pins(section_data["id"]):
-                Pin.print_summary(pin_data)
+        for pin_data in snapshot.section_pins[section_data["id"]]:
+            Pin.print_summary(pin_data)
 
 
 if __name__ == "__main__":
@@ -7,7 +7,7 @@ sys.path.append(abspath(join(dirname(__file__), "..", "src")))
 
 from access_token import AccessToken
 from api_config import ApiConfig
-from arguments import common_arguments, positive_integer
+from arguments import common_arguments, positive_integer, prefetch_argument
 from oauth_scope import Scope
 from pin import Pin
 from user import User
@@ -23,6 +23,10 @@ def main(argv=[]):
     parser.add_argument(
         "-ps", "--page-size", help="Pins per page", default=25, type=positive_integer
     )
+    parser.add_argument(
+        "--checkpoint", help="file used to save and to resume the position in the pins"
+    )
+    prefetch_argument(parser, stream=True)
     common_arguments(parser)
     args = parser.parse_args(argv)
 
@@ -36,7 +40,11 @@ def main(argv=[]):
 
     # get information about all of the pins in the user's profile
     user = User(api_config, access_token)
-    pin_iterator = user.get_pins(query_parameters={"page_size": args.page_size})
+    user.prefetch = args.prefetch
+    user.stream = args.stream
+    pin_iterator = user.get_pins(
+        query_parameters={"page_size": args.page_size}, checkpoint_path=args.checkpoint
+    )
     user.print_multiple(args.page_size, "pin", Pin, pin_iterator)
 
 
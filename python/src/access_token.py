@@ -4,8 +4,6 @@ import json
 import os
 import pathlib
 
-import requests
-
 from api_common import ApiCommon
 from oauth_scope import Scope
 from user_auth import get_auth_code
@@ -172,7 +170,7 @@ class AccessToken(ApiCommon):
             if self.api_config.verbosity >= 3:
                 self.api_config.credentials_warning()
                 print(post_data)
-        response = requests.post(
+        response = self.api_config.session.post(
             self.api_config.api_uri + "/v5/oauth/token",
             headers=self.auth_headers,
             data=post_data,
@@ -194,7 +192,7 @@ class AccessToken(ApiCommon):
             if self.api_config.verbosity >= 3:
                 self.api_config.credentials_warning()
                 print(post_data)
-        response = requests.post(
+        response = self.api_config.session.post(
             self.api_config.api_uri + "/v5/oauth/token",
             headers=self.auth_headers,
             data=post_data,
@@ -1,12 +1,330 @@
+import copy
+import json
+from concurrent.futures import ThreadPoolExecutor
+
 from analytics_attributes import AdAnalyticsAttributes, AnalyticsAttributes
+from analytics_rollup import ROLLUP_GRANULARITIES, rollup, rollup_metrics
+from analytics_store import STATUS, consecutive_ranges
 from api_object import ApiObject
 
+MAX_ANALYTICS_IDS = 250  # maximum number of entities in one analytics request
+DEFAULT_ANALYTICS_CONCURRENCY = 4  # number of analytics requests at the same time
+
+# organic rate metrics and the metrics used to compute them
+ORGANIC_RATE_METRICS = {
+    "ENGAGEMENT_RATE": ("ENGAGEMENT", "IMPRESSION"),
+    "OUTBOUND_CLICK_RATE": ("OUTBOUND_CLICK", "IMPRESSION"),
+    "PIN_CLICK_RATE": ("PIN_CLICK", "IMPRESSION"),
+    "SAVE_RATE": ("SAVE", "IMPRESSION"),
+}
+
+# data status of organic analytics for days that are not final
+PENDING_DATA_STATUSES = {"PROCESSING", "ESTIMATE"}
+
+# organic metrics that are counts, which can be summed over days, unlike
+# rates, averages, and audiences (numbers of unique users)
+ORGANIC_ADDITIVE_METRICS = {
+    "CLICKTHROUGH",
+    "CLOSEUP",
+    "ENGAGEMENT",
+    "FULL_SCREEN_PLAY",
+    "FULL_SCREEN_PLAYTIME",
+    "IMPRESSION",
+    "OUTBOUND_CLICK",
+    "PIN_CLICK",
+    "PROFILE_VISIT",
+    "QUARTILE_95_PERCENT_VIEW",
+    "SAVE",
+    "TOTAL_COMMENTS",
+    "TOTAL_REACTIONS",
+    "USER_FOLLOW",
+    "VIDEO_10S_VIEW",
+    "VIDEO_MRC_VIEW",
+    "VIDEO_START",
+    "VIDEO_V50_WATCH_TIME",
+}
+
 #
 # This module uses Pinterest API v5 in three classes:
 # * UserAnalytics synchronously retrieves user (organic) reports.
 # * PinAnalytics synchronously retrieves pin (organic) reports.
 # * AdAnalytics synchronously retrieves advertising reports.
 #
+# The API limits the date range of each report to MAX_DAYS days, so longer
+# date ranges are split into windows (see AnalyticsAttributes.date_windows)
+# that are requested concurrently. The results are merged into one report.
+#
+# When the analytics_store attribute is set to an AnalyticsStore, the daily
+# values are saved in the store and only the days that are not in the store
+# (or that are still settling) are requested.
+#
+# When the local_rollup attribute of AdAnalytics is True, WEEK, MONTH, and
+# TOTAL reports are computed from the DAY report (see analytics_rollup), so
+# reports with several granularities only request the daily metrics.
+#
+
+
+def fetch_date_windows(analytics, fetch, merge, window_metrics=None):
+    """
+    Call fetch with a copy of the analytics object for each window of the
+    date range, and returns the results merged by the merge function. When
+    there is only one window, returns the result of fetch(analytics).
+
+    When window_metrics is set, the windows request window_metrics(metrics)
+    instead of the metrics, e.g. the components that are required to compute
+    rates for the whole date range. The merge function is called with the
+    results and the metrics that were requested by the caller.
+    """
+    windows = analytics.date_windows()
+    if len(windows) == 1:
+        return fetch(analytics)
+
+    metrics = analytics.metrics_array(required=False)
+    fetch_metrics = window_metrics(metrics) if window_metrics else metrics
+
+    def fetch_window(window):
+        # the copy shares the attributes and the session of the original
+        window_analytics = copy.copy(analytics)
+        window_analytics.date_range(*window)
+        if fetch_metrics:
+            window_analytics._metrics = set(fetch_metrics)
+        return fetch(window_analytics)
+
+    concurrency = min(DEFAULT_ANALYTICS_CONCURRENCY, len(windows))
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return merge(list(executor.map(fetch_window, windows)), metrics)
+
+
+def organic_window_metrics(metrics):
+    """
+    Returns the metrics to request for each window of an organic report with
+    a date range that is split: the additive metrics and rates, and the
+    components of the rates. Raises ValueError if any of the metrics can not
+    be computed for the whole date range from the daily metrics.
+    """
+    if not metrics:
+        raise ValueError("metrics must be set to split the date range")
+    window_metrics = set()
+    for metric in metrics:
+        if metric in ORGANIC_RATE_METRICS:
+            window_metrics.update(ORGANIC_RATE_METRICS[metric])
+        elif metric not in ORGANIC_ADDITIVE_METRICS:
+            raise ValueError(f"{metric} can not be computed from daily metrics")
+        window_metrics.add(metric)
+    return sorted(window_metrics)
+
+
+def summary_metrics(daily_metrics, metrics=None):
+    """
+    Returns the totals of the additive daily metrics. Rates are computed from
+    the totals of their components, and are omitted if the components are not
+    in the daily metrics. Other metrics (e.g. audiences) are omitted. When
+    metrics is set, only those metrics are returned.
+    """
+    totals = {}
+    rates = set(metric for metric in metrics or [] if metric in ORGANIC_RATE_METRICS)
+    for day in daily_metrics:
+        for metric, value in (day.get("metrics") or {}).items():
+            if metric in ORGANIC_RATE_METRICS:
+                rates.add(metric)
+            elif metric in ORGANIC_ADDITIVE_METRICS and value is not None:
+                totals[metric] = totals.get(metric, 0) + value
+    for metric in rates:
+        numerator, denominator = ORGANIC_RATE_METRICS[metric]
+        if numerator in totals and denominator in totals:
+            total = totals[denominator]
+            totals[metric] = totals[numerator] / total if total else 0
+    if metrics:
+        totals = {metric: totals[metric] for metric in metrics if metric in totals}
+    return totals
+
+
+def merge_organic_windows(results, metrics=None):
+    """
+    Merge the organic (user or pin) analytics for consecutive date windows.
+    The daily metrics of each split (e.g. "all") are concatenated, days that
+    appear in more than one window are removed, and the summary metrics are
+    computed again for the whole date range. When metrics is set, the
+    metrics that were only requested to compute rates are removed.
+    """
+    merged = {}
+    for result in results:
+        for split, value in result.items():
+            if not isinstance(value, dict):
+                merged[split] = value
+                continue
+            split_metrics = merged.setdefault(split, {"daily_metrics": []})
+            dates = set(day.get("date") for day in split_metrics["daily_metrics"])
+            for day in value.get("daily_metrics") or []:
+                if day.get("date") not in dates:
+                    split_metrics["daily_metrics"].append(day)
+            if "lifetime_metrics" in value:  # does not depend on the dates
+                split_metrics["lifetime_metrics"] = value["lifetime_metrics"]
+    for split_metrics in merged.values():
+        if isinstance(split_metrics, dict):
+            daily_metrics = split_metrics["daily_metrics"]
+            split_metrics["summary_metrics"] = summary_metrics(daily_metrics, metrics)
+            if metrics:
+                split_metrics["daily_metrics"] = [
+                    select_metrics(day, metrics) for day in daily_metrics
+                ]
+    return merged
+
+
+def select_metrics(day, metrics):
+    """
+    Returns the organic analytics of a day with only the metrics.
+    """
+    if not day.get("metrics"):
+        return day
+    day_metrics = day["metrics"]
+    return dict(
+        day, metrics={key: day_metrics[key] for key in metrics if key in day_metrics}
+    )
+
+
+def merge_ad_windows(results, _metrics=None):
+    """
+    Merge the advertising analytics rows for consecutive date windows,
+    removing rows for the same entities and DATE that appear more than once.
+    """
+    rows = []
+    keys = set()
+    for result in results:
+        for row in result:
+            key = (row.get("DATE"),) + tuple(
+                sorted((k, v) for k, v in row.items() if k.endswith("_ID"))
+            )
+            if key not in keys:
+                keys.add(key)
+                rows.append(row)
+    return rows
+
+
+def organic_records(result):
+    """
+    Returns the (split, date, metrics) records of organic analytics. The
+    metrics include the data status of the day, and are None for days that
+    are still being processed. The lifetime metrics are returned in a record
+    without a date.
+    """
+    for split, value in result.items():
+        if not isinstance(value, dict):
+            continue
+        for day in value.get("daily_metrics") or []:
+            if day.get("data_status") in PENDING_DATA_STATUSES:
+                yield split, day["date"], None
+            else:
+                metrics = dict(day.get("metrics") or {})
+                metrics[STATUS] = day.get("data_status")
+                yield split, day["date"], metrics
+        if value.get("lifetime_metrics"):
+            yield split, None, value["lifetime_metrics"]
+
+
+def organic_from_records(records, results=(), metrics=None):
+    """
+    Returns organic analytics built from (split, date, metrics) records and
+    the days of the results that are still being processed, which are not
+    stored. When metrics is set, only those metrics are returned.
+    """
+    report = {}
+    for split, date, record_metrics in records:
+        split_metrics = report.setdefault(split, {"daily_metrics": []})
+        if date is None:
+            split_metrics["lifetime_metrics"] = record_metrics
+            continue
+        day_metrics = dict(record_metrics)
+        day = {"date": date, "data_status": day_metrics.pop(STATUS, "READY")}
+        if day_metrics:
+            day["metrics"] = day_metrics
+        split_metrics["daily_metrics"].append(day)
+    for result in results:
+        for split, value in result.items():
+            if not isinstance(value, dict):
+                continue
+            for day in value.get("daily_metrics") or []:
+                if day.get("data_status") in PENDING_DATA_STATUSES:
+                    split_metrics = report.setdefault(split, {"daily_metrics": []})
+                    split_metrics["daily_metrics"].append(day)
+    for split_metrics in report.values():
+        daily_metrics = sorted(split_metrics["daily_metrics"], key=lambda d: d["date"])
+        split_metrics["summary_metrics"] = summary_metrics(daily_metrics, metrics)
+        if metrics:
+            daily_metrics = [select_metrics(day, metrics) for day in daily_metrics]
+        split_metrics["daily_metrics"] = daily_metrics
+    return report
+
+
+def ad_records(rows):
+    """
+    Returns the (entity, date, metrics) records of advertising analytics.
+    The entity is the JSON encoding of the identifiers in the row.
+    """
+    for row in rows:
+        ids = {key: value for key, value in row.items() if key.endswith("_ID")}
+        metrics = {
+            key: value for key, value in row.items() if key not in ids and key != "DATE"
+        }
+        yield json.dumps(ids, sort_keys=True), row["DATE"], metrics
+
+
+def ad_from_records(records, _results=(), _metrics=None):
+    """
+    Returns advertising analytics rows built from (entity, date, metrics)
+    records.
+    """
+    return [
+        dict(json.loads(entity), DATE=date, **metrics)
+        for entity, date, metrics in records
+    ]
+
+
+def fetch_stored(
+    analytics, path, fetch, merge, to_records, from_records, window_metrics=None
+):
+    """
+    Get the analytics for the date range of the analytics object, using the
+    analytics_store for the days that have already been requested. Reports
+    that can not be stored by day (e.g. without metrics or with a granularity
+    other than DAY) are always requested.
+
+    The window_metrics function is used to request long date ranges (see
+    fetch_date_windows), and also determines the metrics that are stored,
+    e.g. with the components of rates. When window_metrics raises ValueError,
+    the report is requested without the store.
+    """
+    store = analytics.analytics_store
+    metrics = analytics.metrics_array(required=False)
+    stored_metrics = None
+    if (
+        store
+        and metrics
+        and "ALL" not in metrics
+        and analytics.attrs.get("granularity", "DAY") == "DAY"
+    ):
+        try:
+            stored_metrics = window_metrics(metrics) if window_metrics else metrics
+        except ValueError:
+            pass  # e.g. averages, which can not be computed from the stored days
+    if not stored_metrics:
+        return fetch_date_windows(analytics, fetch, merge, window_metrics)
+
+    analytics.verify_attributes()
+    attrs = "&".join(f"{key}={analytics.attrs[key]}" for key in sorted(analytics.attrs))
+    scope = f"{path}{attrs}"
+    start_date, end_date = analytics._start_date, analytics._end_date
+    results = []
+    missing_dates = store.missing_dates(scope, stored_metrics, start_date, end_date)
+    for window in consecutive_ranges(missing_dates):
+        window_analytics = copy.copy(analytics)
+        window_analytics.date_range(*window)
+        window_analytics._metrics = set(stored_metrics)
+        result = fetch_date_windows(window_analytics, fetch, merge, window_metrics)
+        store.put(scope, stored_metrics, *window, to_records(result))
+        results.append(result)
+    records = store.get(scope, stored_metrics, start_date, end_date)
+    return from_records(records, results, metrics)
 
 
 class UserAnalytics(AnalyticsAttributes, ApiObject):
@@ -71,10 +389,18 @@ class UserAnalytics(AnalyticsAttributes, ApiObject):
         """
         if ad_account_id:
             self.attrs["ad_account_id"] = ad_account_id
+        path = "/v5/user_account/analytics?"
         try:
-            return self.request_data(
-                "/v5/user_account/analytics?"
-                + self.uri_attributes("metric_types", False)
+            return fetch_stored(
+                self,
+                path,
+                lambda analytics: analytics.request_data(
+                    path + analytics.uri_attributes("metric_types", False)
+                ),
+                merge_organic_windows,
+                organic_records,
+                organic_from_records,
+                organic_window_metrics,
             )
         finally:
             self.attrs.pop("ad_account_id", None)
@@ -130,10 +456,18 @@ class PinAnalytics(AnalyticsAttributes, ApiObject):
         """
         if ad_account_id:
             self.attrs["ad_account_id"] = ad_account_id
+        path = f"/v5/pins/{self.pin_id}/analytics?"
         try:
-            return self.request_data(
-                f"/v5/pins/{self.pin_id}/analytics?"
-                + self.uri_attributes("metric_types", False)
+            return fetch_stored(
+                self,
+                path,
+                lambda analytics: analytics.request_data(
+                    path + analytics.uri_attributes("metric_types", False)
+                ),
+                merge_organic_windows,
+                organic_records,
+                organic_from_records,
+                organic_window_metrics,
             )
         finally:
             self.attrs.pop("ad_account_id", None)
@@ -155,8 +489,23 @@ class AdAnalytics(AdAnalyticsAttributes, ApiObject):
 
     The ApiObject parent class implements the REST transaction used
     to fetch the metrics.
+
+    The get_campaigns, get_ad_groups, and get_ads methods get analytics
+    for many entities with one request for each MAX_ANALYTICS_IDS entities.
+    These requests are sent concurrently, and the rows of all of the
+    responses are returned in a dict keyed by (entity id, date). For
+    example, with granularity DAY:
+       analytics.get_ads(ad_account_id, ad_ids)[(ad_id, "2022-03-01")]
+    The date is None with granularity TOTAL.
+
+    Set local_rollup to True to compute reports with granularity WEEK, MONTH,
+    or TOTAL from the daily metrics. The date range of these reports is not
+    limited to MAX_DAYS days, and with an analytics_store the daily metrics
+    are only requested once for all of the granularities.
     """
 
+    local_rollup = False
+
     def __init__(self, api_config, access_token):
         super().__init__(api_config, access_token)
         self.required_attrs.update({"granularity"})
@@ -165,13 +514,40 @@ class AdAnalytics(AdAnalyticsAttributes, ApiObject):
             {"conversion_report_time": {"TIME_OF_AD_ACTION", "TIME_OF_CONVERSION"}}
         )
 
+    def date_windows(self):
+        windows = super().date_windows()
+        if len(windows) > 1 and self.attrs["granularity"] not in ["DAY", "HOUR"]:
+            raise ValueError(
+                f"granularity must be DAY or HOUR for more than {self.MAX_DAYS} days"
+                " (or set local_rollup)"
+            )
+        return windows
+
     def request(self, request_uri):
         """
         Note that the uri_attributes method takes care of encoding the parameters.
         For example, the metrics are sent in the "columns" parameter as a
         comma-separated string.
         """
-        return self.request_data(request_uri + self.uri_attributes("columns", True))
+        granularity = self.attrs.get("granularity")
+        if self.local_rollup and granularity in ROLLUP_GRANULARITIES:
+            metrics = self.metrics_array()
+            # the copy shares the session, but not the attributes and metrics
+            daily = copy.copy(self)
+            daily.attrs = dict(self.attrs, granularity="DAY")
+            daily._metrics = set(rollup_metrics(metrics))
+            return rollup(daily.request(request_uri), granularity, metrics)
+
+        return fetch_stored(
+            self,
+            request_uri,
+            lambda analytics: analytics.request_data(
+                request_uri + analytics.uri_attributes("columns", True)
+            ),
+            merge_ad_windows,
+            ad_records,
+            ad_from_records,
+        )
 
     # https://developers.pinterest.com/docs/api/v5/ad_account-analytics/
     def get_ad_account(self, ad_account_id):
@@ -206,3 +582,73 @@ class AdAnalytics(AdAnalyticsAttributes, ApiObject):
         request_uri = f"/v5/ad_accounts/{ad_account_id}/ads/analytics"
         request_uri += f"?ad_ids={ad_id}&"
         return self.request(request_uri)
+
+    def request_entities(
+        self,
+        request_path,
+        ids_parameter,
+        id_column,
+        entity_ids,
+        concurrency=DEFAULT_ANALYTICS_CONCURRENCY,
+    ):
+        """
+        Get analytics for the entities with one request for each chunk of
+        MAX_ANALYTICS_IDS identifiers. Returns the rows by (entity id, date).
+        """
+        entity_ids = [str(entity_id) for entity_id in entity_ids]
+        chunks = []
+        for start in range(0, len(entity_ids), MAX_ANALYTICS_IDS):
+            end = start + MAX_ANALYTICS_IDS
+            chunks.append(",".join(entity_ids[start:end]))
+        if not chunks:
+            return {}
+
+        def request_chunk(chunk):
+            return self.request(f"{request_path}?{ids_parameter}={chunk}&")
+
+        rows = {}
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(chunks))) as executor:
+            for chunk_rows in executor.map(request_chunk, chunks):
+                for row in chunk_rows:
+                    rows[(str(row.get(id_column)), row.get("DATE"))] = row
+        return rows
+
+    def get_campaigns(
+        self, ad_account_id, campaign_ids, concurrency=DEFAULT_ANALYTICS_CONCURRENCY
+    ):
+        """
+        Get analytics for many campaigns, by (campaign id, date).
+        """
+        return self.request_entities(
+            f"/v5/ad_accounts/{ad_account_id}/campaigns/analytics",
+            "campaign_ids",
+            "CAMPAIGN_ID",
+            campaign_ids,
+            concurrency,
+        )
+
+    def get_ad_groups(
+        self, ad_account_id, ad_group_ids, concurrency=DEFAULT_ANALYTICS_CONCURRENCY
+    ):
+        """
+        Get analytics for many ad groups, by (ad group id, date).
+        """
+        return self.request_entities(
+            f"/v5/ad_accounts/{ad_account_id}/ad_groups/analytics",
+            "ad_group_ids",
+            "AD_GROUP_ID",
+            ad_group_ids,
+            concurrency,
+        )
+
+    def get_ads(self, ad_account_id, ad_ids, concurrency=DEFAULT_ANALYTICS_CONCURRENCY):
+        """
+        Get analytics for many ads, by (ad id, date).
+        """
+        return self.request_entities(
+            f"/v5/ad_accounts/{ad_account_id}/ads/analytics",
+            "ad_ids",
+            "AD_ID",
+            ad_ids,
+            concurrency,
+        )
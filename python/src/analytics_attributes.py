@@ -20,8 +20,14 @@ class AnalyticsAttributes:
     """
     This class profiles common variables and functions related
     to the metrics returned by analytics endpoints.
+
+    Set analytics_store to an AnalyticsStore to save the daily metrics of
+    synchronous reports, so that the days that have already been requested
+    are not requested again.
     """
 
+    analytics_store = None
+
     def __init__(self, *args):
         super().__init__(*args)  # forward all args to allow multiple inheritance
         self._start_date = None
@@ -85,6 +91,7 @@ class AnalyticsAttributes:
     def date_range(self, start_date, end_date):
         """
         Shortcut: set required start date and end date in one call.
+        Synchronous reports split date ranges that are longer than MAX_DAYS.
         """
         self._start_date = start_date
         self._end_date = end_date
@@ -105,6 +112,29 @@ class AnalyticsAttributes:
 
     ATTR_DATE_FORMAT = "%Y-%m-%d"
 
+    # maximum number of days in the date range of a synchronous report
+    MAX_DAYS = 90
+
+    def date_windows(self):
+        """
+        Returns the date range split into consecutive (start date, end date)
+        windows of at most MAX_DAYS days.
+        """
+        self.verify_attributes()
+        start = datetime.datetime.strptime(self._start_date, self.ATTR_DATE_FORMAT)
+        end = datetime.datetime.strptime(self._end_date, self.ATTR_DATE_FORMAT)
+        windows = []
+        while start <= end:
+            window_end = min(start + datetime.timedelta(days=self.MAX_DAYS - 1), end)
+            windows.append(
+                (
+                    start.strftime(self.ATTR_DATE_FORMAT),
+                    window_end.strftime(self.ATTR_DATE_FORMAT),
+                )
+            )
+            start = window_end + datetime.timedelta(days=1)
+        return windows
+
     def check_date_attr(self, name, date):
         try:
             datetime.datetime.strptime(date, self.ATTR_DATE_FORMAT)
@@ -0,0 +1,139 @@
+import datetime
+import re
+
+ROLLUP_GRANULARITIES = ["WEEK", "MONTH", "TOTAL"]
+DATE_FORMAT = "%Y-%m-%d"
+
+# advertising ratio metrics: (numerator, denominator, scale), for example
+# CPM = 1000 * spend / paid impressions
+AD_RATIO_METRICS = {
+    "CTR": ("CLICKTHROUGH_1", "IMPRESSION_1", 1),
+    "CTR_2": ("CLICKTHROUGH_2", "IMPRESSION_2", 1),
+    "ECTR": ("TOTAL_CLICKTHROUGH", "TOTAL_IMPRESSION", 1),
+    "ENGAGEMENT_RATE": ("ENGAGEMENT_1", "IMPRESSION_1", 1),
+    "EENGAGEMENT_RATE": ("TOTAL_ENGAGEMENT", "TOTAL_IMPRESSION", 1),
+    "CPC_IN_MICRO_DOLLAR": ("SPEND_IN_MICRO_DOLLAR", "CLICKTHROUGH_1", 1),
+    "ECPC_IN_DOLLAR": ("SPEND_IN_DOLLAR", "TOTAL_CLICKTHROUGH", 1),
+    "ECPC_IN_MICRO_DOLLAR": ("SPEND_IN_MICRO_DOLLAR", "TOTAL_CLICKTHROUGH", 1),
+    "CPM_IN_DOLLAR": ("SPEND_IN_DOLLAR", "IMPRESSION_1", 1000),
+    "CPM_IN_MICRO_DOLLAR": ("SPEND_IN_MICRO_DOLLAR", "IMPRESSION_1", 1000),
+    "ECPM_IN_MICRO_DOLLAR": ("SPEND_IN_MICRO_DOLLAR", "TOTAL_IMPRESSION", 1000),
+    "ECPE_IN_DOLLAR": ("SPEND_IN_DOLLAR", "TOTAL_ENGAGEMENT", 1),
+}
+
+# advertising metrics that are counts or amounts, which can be summed over
+# days, unlike the number of unique users (reach), frequencies, averages,
+# costs per action, ROAS, budgets, and attributes such as names and statuses
+AD_ADDITIVE_METRICS = {
+    "CLICKTHROUGH_1",
+    "CLICKTHROUGH_2",
+    "ENGAGEMENT_1",
+    "ENGAGEMENT_2",
+    "IMPRESSION_1",
+    "IMPRESSION_2",
+    "OUTBOUND_CLICK_1",
+    "OUTBOUND_CLICK_2",
+    "PAID_IMPRESSION",
+    "REPIN_1",
+    "REPIN_2",
+    "SPEND_IN_DOLLAR",
+    "SPEND_IN_MICRO_DOLLAR",
+    "TOTAL_CLICKTHROUGH",
+    "TOTAL_CONVERSIONS",
+    "TOTAL_ENGAGEMENT",
+    "TOTAL_IMPRESSION",
+    "TOTAL_REPIN",
+    "TOTAL_VIDEO_3SEC_VIEWS",
+    "TOTAL_VIDEO_MRC_VIEWS",
+    "TOTAL_WEB_SESSIONS",
+    "VIDEO_3SEC_VIEWS_2",
+    "VIDEO_MRC_VIEWS_2",
+}
+
+# conversion counts and values, e.g. TOTAL_CHECKOUT, TOTAL_CLICK_SIGNUP, and
+# TOTAL_WEB_CHECKOUT_VALUE_IN_MICRO_DOLLAR, and video quartile views
+AD_ADDITIVE_METRIC = re.compile(
+    r"^TOTAL(_WEB|_APP|_OFFLINE)?(_CLICK|_VIEW|_ENGAGEMENT)?"
+    r"_(ADD_TO_CART|APP_INSTALL|CHECKOUT|CUSTOM|LEAD|PAGE_VISIT|SEARCH|SIGNUP"
+    r"|UNKNOWN|WATCH_VIDEO)(_QUANTITY|_VALUE_IN_MICRO_DOLLAR)?$"
+    r"|^(TOTAL_)?VIDEO_P(0|25|50|75|95|100)_COMBINED(_2)?$"
+)
+
+
+def is_additive(metric):
+    return metric in AD_ADDITIVE_METRICS or bool(AD_ADDITIVE_METRIC.match(metric))
+
+
+def rollup_metrics(metrics):
+    """
+    Returns the daily metrics that are required to compute the metrics for
+    a coarser granularity: the additive metrics, and the components of the
+    ratio metrics. Raises ValueError if any of the metrics is not a known
+    additive or ratio metric, so it can not be computed from daily metrics.
+    """
+    daily_metrics = set()
+    for metric in metrics:
+        if metric in AD_RATIO_METRICS:
+            daily_metrics.update(AD_RATIO_METRICS[metric][:2])
+        elif is_additive(metric):
+            daily_metrics.add(metric)
+        else:
+            raise ValueError(f"{metric} can not be computed from daily metrics")
+    return sorted(daily_metrics)
+
+
+def period_start(date, granularity):
+    """
+    Returns the first date of the WEEK (starting on Monday) or MONTH that
+    contains the date, or None for TOTAL.
+    """
+    if granularity == "TOTAL":
+        return None
+    day = datetime.datetime.strptime(date, DATE_FORMAT).date()
+    if granularity == "WEEK":
+        day -= datetime.timedelta(days=day.weekday())
+    else:
+        day = day.replace(day=1)
+    return day.strftime(DATE_FORMAT)
+
+
+def rollup(rows, granularity, metrics):
+    """
+    Compute the rows for a WEEK, MONTH, or TOTAL granularity from the rows
+    of a report with granularity DAY, in the same format as the rows returned
+    by the API. The DATE of each row is the first day of the period, and
+    there is no DATE with granularity TOTAL.
+
+    The rows of each entity (e.g. AD_ID) are summed for each period, and
+    ratio metrics are computed from the sums of their components, so the
+    rows must have the metrics returned by rollup_metrics(metrics). Other
+    columns of the rows are ignored. Ratios with a zero denominator are 0.
+    """
+    daily_metrics = rollup_metrics(metrics)
+    totals = {}  # (identifiers, period) -> metrics
+    for row in rows:
+        ids = tuple(sorted((k, v) for k, v in row.items() if k.endswith("_ID")))
+        period = period_start(row["DATE"], granularity)
+        period_totals = totals.setdefault((ids, period), {})
+        for metric in daily_metrics:
+            value = row.get(metric)
+            if value is not None:
+                period_totals[metric] = period_totals.get(metric, 0) + value
+
+    result = []
+    for (ids, period), period_totals in totals.items():
+        row = dict(ids)
+        if period:
+            row["DATE"] = period
+        for metric in metrics:
+            if metric in AD_RATIO_METRICS:
+                numerator, denominator, scale = AD_RATIO_METRICS[metric]
+                if numerator in period_totals and denominator in period_totals:
+                    total = period_totals[denominator]
+                    row[metric] = (
+                        scale * period_totals[numerator] / total if total else 0
+                    )
+            elif metric in period_totals:
+                row[metric] = period_totals[metric]
+        result.append(row)
+    return result
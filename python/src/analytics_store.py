@@ -0,0 +1,197 @@
+import datetime
+import json
+import sqlite3
+import threading
+
+DEFAULT_SETTLING_DAYS = 3  # recent days that are requested again, for conversions
+DATE_FORMAT = "%Y-%m-%d"
+STATUS = "data_status"  # key of the status of a day in the metrics of a record
+
+
+def date_range(start_date, end_date):
+    """
+    Returns the list of dates (YYYY-MM-DD) from start_date to end_date.
+    """
+    start = datetime.datetime.strptime(start_date, DATE_FORMAT).date()
+    end = datetime.datetime.strptime(end_date, DATE_FORMAT).date()
+    return [
+        (start + datetime.timedelta(days=days)).strftime(DATE_FORMAT)
+        for days in range((end - start).days + 1)
+    ]
+
+
+def consecutive_ranges(dates):
+    """
+    Group a sorted list of dates into (start date, end date) ranges of
+    consecutive dates.
+    """
+    ranges = []
+    previous = None
+    for date in dates:
+        day = datetime.datetime.strptime(date, DATE_FORMAT).date()
+        if previous and day - previous == datetime.timedelta(days=1):
+            ranges[-1] = (ranges[-1][0], date)
+        else:
+            ranges.append((date, date))
+        previous = day
+    return ranges
+
+
+class AnalyticsStore:
+    """
+    Persistent store of daily analytics in a SQLite database, so that
+    reports for the same date range (e.g. the last 30 days) only request the
+    days that have not been requested before.
+
+    Each value is stored by scope, entity, metric, and date. The scope
+    identifies the report: the endpoint, the entity identifiers in the
+    request, and the attributes other than the dates and metrics (e.g. the
+    granularity and the attribution windows). The entity identifies a row of
+    the report (e.g. one ad of a request for many ads).
+
+    The dates that have been requested for each scope and metric are saved,
+    including dates without any data. Conversions can be reported days after
+    the ad action, so the last settling_days days (UTC) are always requested
+    again.
+
+    Values that do not depend on the dates (e.g. the lifetime metrics of
+    organic analytics) are stored by scope and entity, and are replaced by
+    each request that returns them.
+    """
+
+    def __init__(self, path, settling_days=DEFAULT_SETTLING_DAYS):
+        self.path = path
+        self.settling_days = settling_days
+        self._lock = threading.Lock()
+        # the connection is shared by the threads that request date windows
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS metric_values ("
+                " scope TEXT, entity TEXT, metric TEXT, date TEXT, value TEXT,"
+                " PRIMARY KEY (scope, entity, metric, date))"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS fetched_dates ("
+                " scope TEXT, metric TEXT, date TEXT,"
+                " PRIMARY KEY (scope, metric, date))"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS scope_values ("
+                " scope TEXT, entity TEXT, metric TEXT, value TEXT,"
+                " PRIMARY KEY (scope, entity, metric))"
+            )
+
+    @classmethod
+    def today(cls):
+        return datetime.datetime.now(datetime.timezone.utc).date()
+
+    def missing_dates(self, scope, metrics, start_date, end_date):
+        """
+        Returns the dates from start_date to end_date that must be requested,
+        because they have not been requested for all of the metrics or they
+        are in the settling window.
+        """
+        settled = self.today() - datetime.timedelta(days=self.settling_days)
+        settled = settled.strftime(DATE_FORMAT)
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT date, COUNT(*) FROM fetched_dates"
+                " WHERE scope = ? AND date BETWEEN ? AND ?"
+                f" AND metric IN ({','.join('?' * len(metrics))})"
+                " GROUP BY date",
+                [scope, start_date, end_date] + list(metrics),
+            ).fetchall()
+        complete = set(date for date, count in rows if count == len(metrics))
+        return [
+            date
+            for date in date_range(start_date, end_date)
+            if date not in complete or date > settled
+        ]
+
+    def put(self, scope, metrics, start_date, end_date, records):
+        """
+        Save the records for the dates from start_date to end_date, which
+        replace any values that were saved before. Each record is an
+        (entity, date, metrics) tuple. When the metrics of a record are None,
+        the data for that date is not ready, so the date will be requested
+        again. The metrics of a record may include the status of the day
+        (with the STATUS key), and the metrics of a record without a date
+        are values that do not depend on the dates.
+        """
+        dates = date_range(start_date, end_date)
+        pending = set()
+        values = []
+        scope_values = []
+        for entity, date, record_metrics in records:
+            if record_metrics is None:
+                pending.add(date)
+                continue
+            if date is None:
+                for metric, value in record_metrics.items():
+                    scope_values.append((scope, entity, metric, json.dumps(value)))
+                continue
+            for metric in list(metrics) + [STATUS]:
+                if metric in record_metrics:
+                    value = json.dumps(record_metrics[metric])
+                    values.append((scope, entity, metric, date, value))
+        with self._lock, self.connection:
+            for metric in list(metrics) + [STATUS]:
+                self.connection.execute(
+                    "DELETE FROM metric_values WHERE scope = ? AND metric = ?"
+                    " AND date BETWEEN ? AND ?",
+                    (scope, metric, start_date, end_date),
+                )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO metric_values VALUES (?, ?, ?, ?, ?)", values
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO fetched_dates VALUES (?, ?, ?)",
+                [
+                    (scope, metric, date)
+                    for date in dates
+                    if date not in pending
+                    for metric in metrics
+                ],
+            )
+            if scope_values:
+                self.connection.execute(
+                    "DELETE FROM scope_values WHERE scope = ?", (scope,)
+                )
+                self.connection.executemany(
+                    "INSERT INTO scope_values VALUES (?, ?, ?, ?)", scope_values
+                )
+
+    def get(self, scope, metrics, start_date, end_date):
+        """
+        Returns the (entity, date, metrics) records for the dates from
+        start_date to end_date, in order of date and entity. The records
+        without a date (with all of the values that do not depend on the
+        dates) are returned first.
+        """
+        metrics = list(metrics) + [STATUS]
+        with self._lock:
+            scope_rows = self.connection.execute(
+                "SELECT entity, metric, value FROM scope_values"
+                " WHERE scope = ? ORDER BY entity",
+                (scope,),
+            ).fetchall()
+            rows = self.connection.execute(
+                "SELECT entity, date, metric, value FROM metric_values"
+                " WHERE scope = ? AND date BETWEEN ? AND ?"
+                f" AND metric IN ({','.join('?' * len(metrics))})"
+                " ORDER BY date, entity",
+                [scope, start_date, end_date] + metrics,
+            ).fetchall()
+        records = {}
+        for entity, metric, value in scope_rows:
+            records.setdefault((entity, None), {})[metric] = json.loads(value)
+        for entity, date, metric, value in rows:
+            records.setdefault((entity, date), {})[metric] = json.loads(value)
+        return [
+            (entity, date, record_metrics)
+            for (entity, date), record_metrics in records.items()
+        ]
+
+    def close(self):
+        self.connection.close()
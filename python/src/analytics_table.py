@@ -0,0 +1,219 @@
+import array
+import csv
+import itertools
+import json
+import math
+
+try:
+    import numpy
+except ImportError:  # numpy is optional
+    numpy = None
+
+
+def is_key_column(name):
+    """
+    The DATE and identifier columns are keys, and the other columns are metrics.
+    """
+    return name == "DATE" or name.endswith("_ID")
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class AnalyticsTable:
+    """
+    Columnar representation of analytics: the DATE and identifier (e.g. AD_ID)
+    columns are strings, and each metric is an array of floats, so
+    a long daily report for many ads uses much less memory than a list of
+    dicts, and aggregations do not need to loop over dicts. For example:
+       table = AnalyticsTable.from_rows(analytics.get_ad_account(ad_account_id))
+       january = table.between("2022-01-01", "2022-01-31")
+       ctr = january.ratio("TOTAL_CLICKTHROUGH", "TOTAL_IMPRESSION")
+
+    The columns are numpy arrays when numpy is installed, which makes the
+    aggregations vectorized. Otherwise, metrics use the array module and keys
+    use lists. Missing metric values are NaN and are ignored by aggregations.
+
+    Columns with values that are not numbers (e.g. CAMPAIGN_NAME or
+    CAMPAIGN_ENTITY_STATUS) are stored as strings, like the keys, and are
+    not in the metrics of the table.
+    """
+
+    def __init__(self, columns):
+        self.columns = {}
+        length = None
+        for name, values in columns.items():
+            values = list(values)
+            if is_key_column(name) or not all(
+                value is None or is_number(value) for value in values
+            ):
+                self.columns[name] = self._string_array(values)
+            else:
+                self.columns[name] = self._metric_array(values)
+            if length is not None and len(self.columns[name]) != length:
+                raise ValueError(f"column {name} does not have {length} values")
+            length = len(self.columns[name])
+        self.length = length or 0
+
+    @classmethod
+    def _string_array(cls, values):
+        values = ["" if value is None else str(value) for value in values]
+        return numpy.array(values, dtype=str) if numpy else values
+
+    @classmethod
+    def _metric_array(cls, values):
+        values = [math.nan if value is None else float(value) for value in values]
+        return numpy.array(values, dtype=float) if numpy else array.array("d", values)
+
+    @classmethod
+    def _is_metric(cls, values):
+        if numpy:
+            return values.dtype.kind == "f"
+        return isinstance(values, array.array)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Create a table from the rows returned by AdAnalytics, which are dicts
+        with a DATE (for granularity DAY), identifiers, and metrics.
+        """
+        rows = list(rows)
+        names = []
+        for row in rows:
+            for name in row:
+                if name not in names:
+                    names.append(name)
+        return cls({name: [row.get(name) for row in rows] for name in names})
+
+    @classmethod
+    def from_organic(cls, result, split="all"):
+        """
+        Create a table from the daily metrics returned by UserAnalytics or
+        PinAnalytics, for one of the splits.
+        """
+        days = result.get(split, {}).get("daily_metrics") or []
+        rows = [dict(day.get("metrics") or {}, DATE=day["date"]) for day in days]
+        return cls.from_rows(rows)
+
+    def __len__(self):
+        return self.length
+
+    def column(self, name):
+        return self.columns[name]
+
+    @property
+    def metrics(self):
+        return [
+            name for name, values in self.columns.items() if self._is_metric(values)
+        ]
+
+    def sum(self, metric):
+        """
+        Returns the sum of the metric, ignoring missing values.
+        """
+        values = self.columns[metric]
+        if numpy:
+            return float(numpy.nansum(values))
+        return math.fsum(value for value in values if not math.isnan(value))
+
+    def mean(self, metric):
+        """
+        Returns the mean of the metric, ignoring missing values, or NaN.
+        """
+        values = self.columns[metric]
+        if numpy:
+            count = int(numpy.count_nonzero(~numpy.isnan(values)))
+        else:
+            count = sum(1 for value in values if not math.isnan(value))
+        return self.sum(metric) / count if count else math.nan
+
+    def ratio(self, numerator, denominator):
+        """
+        Returns the ratio of the sums of two metrics (e.g. clicks and
+        impressions for a click-through rate), or NaN if the denominator is 0.
+        """
+        total = self.sum(denominator)
+        return self.sum(numerator) / total if total else math.nan
+
+    def select(self, mask):
+        """
+        Returns a table with the rows for which the mask (a sequence of
+        booleans with one value for each row) is true.
+        """
+        if numpy:
+            mask = numpy.asarray(mask, dtype=bool)
+            return AnalyticsTable._from_arrays(
+                {name: values[mask] for name, values in self.columns.items()},
+                int(numpy.count_nonzero(mask)),
+            )
+        mask = list(mask)
+        columns = {}
+        for name, values in self.columns.items():
+            selected = itertools.compress(values, mask)
+            if self._is_metric(values):
+                columns[name] = array.array("d", selected)
+            else:
+                columns[name] = list(selected)
+        return AnalyticsTable._from_arrays(columns, sum(mask))
+
+    @classmethod
+    def _from_arrays(cls, columns, length):
+        table = cls.__new__(cls)
+        table.columns = columns
+        table.length = length
+        return table
+
+    def where(self, name, value):
+        """
+        Returns a table with the rows where the column has the value.
+        """
+        values = self.columns[name]
+        if numpy:
+            return self.select(values == str(value))
+        return self.select([item == str(value) for item in values])
+
+    def between(self, start_date, end_date):
+        """
+        Returns a table with the rows from start_date to end_date (YYYY-MM-DD).
+        """
+        dates = self.columns["DATE"]
+        if numpy:
+            return self.select((dates >= start_date) & (dates <= end_date))
+        return self.select([start_date <= date <= end_date for date in dates])
+
+    def _lists(self):
+        # tolist converts numpy arrays (and array.array) to Python values
+        return {
+            name: values.tolist() if hasattr(values, "tolist") else list(values)
+            for name, values in self.columns.items()
+        }
+
+    def to_rows(self):
+        """
+        Returns the table as a list of dicts, like the rows from AdAnalytics.
+        """
+        lists = self._lists()
+        return [dict(zip(lists, row)) for row in zip(*lists.values())]
+
+    def to_json(self, json_file):
+        """
+        Write the table as a JSON object with a list of values for each
+        column. Missing values are written as null.
+        """
+        lists = {
+            name: [None if value != value else value for value in values]
+            for name, values in self._lists().items()
+        }
+        json.dump(lists, json_file)
+
+    def to_csv(self, csv_file):
+        """
+        Write the table as CSV, with a header line with the column names.
+        Missing values are written as empty fields.
+        """
+        writer = csv.writer(csv_file)
+        lists = self._lists()
+        writer.writerow(lists.keys())
+        for row in zip(*lists.values()):
+            writer.writerow("" if value != value else value for value in row)
@@ -1,4 +1,5 @@
 # Common code for all API calls
+from json_stream import JsonItemStream
 
 
 # Errors to handle Pinterest API use cases
@@ -96,3 +97,20 @@ class ApiCommon:
             print(unpacked)
 
         return unpacked
+
+    def unpack_stream(self, response, key="items"):
+        """
+        Check for errors and return a JsonItemStream for the list of items in
+        the response, which must have been requested with stream=True.
+        Errors are handled (and raised) by unpack.
+        """
+        self._check(response)
+        if not response.ok:
+            return self.unpack(response)
+
+        if self.api_config.verbosity >= 1:
+            print(response)
+        if self.api_config.verbosity >= 3:
+            print("x-pinterest-rid:", response.headers.get("x-pinterest-rid"))
+
+        return JsonItemStream(response, key)
@@ -1,5 +1,12 @@
 import os  # for environment variables
 
+from http_session import DEFAULT_POOL_CONNECTIONS, DEFAULT_POOL_MAXSIZE, HttpSession
+from json_codec import get_json_codec
+from rate_limiter import RateLimiter, parse_rate_limits
+from request_metrics import RequestMetrics
+from response_cache import DEFAULT_CACHE_MAX_BYTES, ResponseCache
+from retry_policy import DEFAULT_MAX_RETRIES, DEFAULT_RETRY_BACKOFF, RetryPolicy
+
 # Construct the redirect_uri for the OAuth process. The REDIRECT_URI must
 # be literally the same as configured at https://developers.pinterest.com/apps/.
 # The port is fixed for now. It would be better to configure a selection
@@ -38,6 +45,81 @@ class ApiConfig:
         self.oauth_uri = os.environ.get("PINTEREST_OAUTH_URI") or DEFAULT_OAUTH_URI
         self.api_uri = os.environ.get("PINTEREST_API_URI") or DEFAULT_API_URI
 
+        # The HTTP session (and its connection pool) is shared by every object
+        # that uses this configuration.
+        self.pool_connections = int(
+            os.environ.get("PINTEREST_POOL_CONNECTIONS") or DEFAULT_POOL_CONNECTIONS
+        )
+        self.pool_maxsize = int(
+            os.environ.get("PINTEREST_POOL_MAXSIZE") or DEFAULT_POOL_MAXSIZE
+        )
+        self.keep_alive = os.environ.get("PINTEREST_KEEP_ALIVE", "true").lower() in (
+            "true",
+            "1",
+            "yes",
+        )
+
+        # Requests that fail with 429 or 5xx are retried with backoff.
+        self.max_retries = int(
+            os.environ.get("PINTEREST_MAX_RETRIES") or DEFAULT_MAX_RETRIES
+        )
+        self.retry_backoff = float(
+            os.environ.get("PINTEREST_RETRY_BACKOFF") or DEFAULT_RETRY_BACKOFF
+        )
+
+        # Requests are paced to stay within the rate limits for each access
+        # token and endpoint category. See rate_limiter.py for the defaults.
+        self.rate_limits = parse_rate_limits(
+            os.environ.get("PINTEREST_RATE_LIMITS") or ""
+        )
+
+        # GET responses are cached on disk when a cache directory is specified.
+        self.cache_dir = os.environ.get("PINTEREST_CACHE_DIR")
+        self.cache_max_bytes = int(
+            os.environ.get("PINTEREST_CACHE_MAX_BYTES") or DEFAULT_CACHE_MAX_BYTES
+        )
+        self.cache_stale_while_revalidate = os.environ.get(
+            "PINTEREST_CACHE_STALE_WHILE_REVALIDATE", "false"
+        ).lower() in ("true", "1", "yes")
+        response_cache = None
+        if self.cache_dir:
+            response_cache = ResponseCache(
+                self.cache_dir,
+                max_bytes=self.cache_max_bytes,
+                stale_while_revalidate=self.cache_stale_while_revalidate,
+            )
+
+        # Latency and throughput metrics are written to this file at exit,
+        # in JSON when the name ends with .json and in Prometheus text format
+        # otherwise.
+        self.metrics_file = os.environ.get("PINTEREST_METRICS_FILE")
+        metrics = None
+        if self.metrics_file:
+            metrics = RequestMetrics()
+            metrics.write_at_exit(self.metrics_file)
+
+        # JSON is encoded and decoded with orjson when it is installed, unless
+        # PINTEREST_JSON_CODEC is json (the standard library). Large JSON
+        # request bodies are compressed when PINTEREST_GZIP_MIN_BYTES is set.
+        self.json_codec = os.environ.get("PINTEREST_JSON_CODEC") or "auto"
+        gzip_min_bytes = os.environ.get("PINTEREST_GZIP_MIN_BYTES")
+        self.gzip_min_bytes = int(gzip_min_bytes) if gzip_min_bytes else None
+
+        self.session = HttpSession(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            keep_alive=self.keep_alive,
+            retry_policy=RetryPolicy(
+                max_retries=self.max_retries, backoff=self.retry_backoff
+            ),
+            rate_limiter=RateLimiter(self.rate_limits),
+            response_cache=response_cache,
+            metrics=metrics,
+            json_codec=get_json_codec(self.json_codec),
+            gzip_min_bytes=self.gzip_min_bytes,
+            verbosity=self.verbosity,
+        )
+
     def get_application_id(self):
         """
         Get Pinterest application ID and secret from the OS environment.
@@ -1,15 +1,36 @@
 import requests
 
 from api_object import ApiObject
+from media_upload_manager import DEFAULT_UPLOAD_CONCURRENCY, MediaUploadManager
+from multipart_stream import MultipartStream
+
+UPLOAD_RETRIES = 3  # attempts to upload a file again after a connection error
 
 
 class ApiMediaObject(ApiObject):
     """
     Subclass of an ApiObject with media functionality.
+
+    Set media_cache to a MediaCache to reuse the media_id of files that
+    have already been uploaded. Set upload_progress to a function that is
+    called with the number of bytes sent and the total number of bytes
+    while a file is uploaded.
     """
 
     def __init__(self, api_config, access_token):
         super().__init__(api_config, access_token)
+        self.media_cache = None
+        self.upload_progress = None
+        self._media_account = None  # username of the access token
+
+    def media_account(self):
+        """
+        Returns the username of the user account of the access token, which
+        identifies the owner of uploaded media in the media_cache.
+        """
+        if not self._media_account:
+            self._media_account = self.request_data("/v5/user_account")["username"]
+        return self._media_account
 
     def upload_media(self, media):
         """
@@ -18,6 +39,13 @@ class ApiMediaObject(ApiObject):
         """
         raise RuntimeError("upload_media() must be overridden")
 
+    def media_upload_manager(self, concurrency=DEFAULT_UPLOAD_CONCURRENCY):
+        """
+        Returns a MediaUploadManager that uploads media files concurrently
+        with this object and waits for all of them to be processed.
+        """
+        return MediaUploadManager(self, concurrency)
+
     def media_to_media_id(self, media):
         """
         This function translates the media argument into a media_id,
@@ -41,7 +69,18 @@ class ApiMediaObject(ApiObject):
             raise ValueError(f"invalid media: {media}") from None
 
         # valid file found
-        return self.upload_media(media)
+        if not self.media_cache:
+            return self.upload_media(media)
+
+        key = self.media_cache.key(media, self.media_account())
+        media_id = self.media_cache.get(key)
+        if media_id:
+            if self.api_config.verbosity >= 2:
+                print(f"reusing media id {media_id} for {media}")
+            return media_id
+        media_id = self.upload_media(media)
+        self.media_cache.put(key, media_id)
+        return media_id
 
     def upload_file_multipart(self, url, file_path, post_data):
         """
@@ -56,8 +95,28 @@ class ApiMediaObject(ApiObject):
             self.api_config.credentials_warning()
             print(post_data)
 
-        with open(file_path, "rb") as file_object:
-            response = requests.post(
-                url, data=post_data, files={"file": (None, file_object)}
-            )
+        # The file is streamed from a MultipartStream, so that large videos
+        # are not read into memory. The whole file is sent again when the
+        # connection fails, because the upload can not be resumed.
+        with MultipartStream(
+            file_path, post_data, progress=self.upload_progress
+        ) as stream:
+            self.reset_backoff()
+            for attempt in range(UPLOAD_RETRIES + 1):
+                try:
+                    response = self.session.post(
+                        url, data=stream, headers=stream.headers()
+                    )
+                    break
+                except requests.ConnectionError as error:
+                    if attempt == UPLOAD_RETRIES:
+                        raise
+                    self.wait_backoff(f"{type(error).__name__} during upload.")
             self.check(response)
+
+            if self.api_config.verbosity >= 2:
+                megabytes = len(stream) / 1e6
+                print(
+                    f"uploaded {megabytes:.1f} MB at "
+                    f"{stream.throughput() / 1e6:.1f} MB/s"
+                )
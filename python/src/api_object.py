@@ -1,73 +1,301 @@
+import json
+import os
+import queue
+import threading
 import time
 from urllib.parse import urlencode
 
-import requests
-
 from api_common import ApiCommon
+from json_stream import JsonItemStream
 from utils import input_one_of
 
 
+class PagePrefetcher:
+    """
+    Fetches pages for a PagedIterator in a worker thread, so that the next
+    pages are retrieved while the caller processes the current page. At most
+    depth pages are held in memory until they are consumed.
+    """
+
+    def __init__(self, paged_iterator, bookmark, depth):
+        self.paged_iterator = paged_iterator
+        self.pages = queue.Queue(maxsize=depth)
+        self.stopped = threading.Event()
+        self.error = None  # raised again by get() after the worker has stopped
+        self.thread = threading.Thread(
+            target=self._run, args=(bookmark,), name="page-prefetch", daemon=True
+        )
+        self.thread.start()
+
+    def _put(self, page):
+        # wait for space in the queue, but give up if the iterator is closed
+        while not self.stopped.is_set():
+            try:
+                self.pages.put(page, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self, bookmark):
+        while bookmark and not self.stopped.is_set():
+            try:
+                page = self.paged_iterator._fetch_page(bookmark)
+            except Exception as error:
+                self._put(error)  # raised by get() in the caller's thread
+                return
+            if not self._put(page):
+                return
+            _, items, bookmark = page
+            if not items:
+                return
+
+    def get(self):
+        """
+        Returns the next page as a tuple. See PagedIterator._fetch_page.
+        """
+        if self.error:
+            raise self.error
+        page = self.pages.get()
+        if isinstance(page, Exception):
+            self.error = page
+            raise page
+        return page
+
+    def close(self):
+        self.stopped.set()
+
+
 class PagedIterator:
     """
     This class implements paging on top of the bookmark functionality provided
     by the Pinterest API class. It hides the paging mechanism behind an iterator.
+
+    When prefetch is greater than zero, up to that number of pages are fetched
+    in a background thread while the current page is being consumed.
+
+    When stream is True, each page is decoded incrementally (see JsonItemStream)
+    so that items are returned while the page is being downloaded, and the
+    bookmark for the next page is read at the end of the page. Streaming can
+    not be combined with prefetching, which needs the bookmark of a page
+    before the page is consumed.
+
+    The position of the iterator can be saved with checkpoint() and restored
+    with from_checkpoint(). When checkpoint_path is set, the checkpoint is also
+    written to that file after every checkpoint_interval pages, so that a long
+    enumeration can be resumed after a crash without downloading pages again.
+    The file is removed when the iteration is complete.
     """
 
-    def _get_response(self, path_maybe_with_bookmark):
+    def _path_with_bookmark(self, bookmark):
+        """
+        Determine whether the query needs to be added to the path or if the
+        bookmark will be an additional parameter at the end of the query.
+        """
+        if not bookmark:
+            return self.path
+        delimiter = "&" if "?" in self.path else "?"
+        return self.path + delimiter + "bookmark=" + bookmark
+
+    def _fetch_page(self, bookmark, stream=False):
         """
         Use api_object to run HTTP GET. Then, look for bookmark in response.
+        Returns a (bookmark used for this page, items, next bookmark) tuple.
+        When streaming, items is a JsonItemStream and the next bookmark is read
+        after the items.
         """
-        response = self.api_object.get_response(path_maybe_with_bookmark)
+        path = self._path_with_bookmark(bookmark)
+        if stream:
+            response = self.api_object.get_response(path, stream=True)
+            return bookmark, self.api_object.unpack_stream(response), None
+        response = self.api_object.get_response(path)
         unpacked = self.api_object.unpack(response)
-        # the field with the items container is determined in the iterator constructor
-        self.items = unpacked.get("items")
-        self.bookmark = unpacked.get("bookmark")
+        return bookmark, unpacked.get("items"), unpacked.get("bookmark")
+
+    def _set_page(self, page):
+        self.page_bookmark, self.items, self.bookmark = page
         self.index = 0
 
-    def __init__(self, api_object, path):
+    def __init__(
+        self,
+        api_object,
+        path,
+        prefetch=0,
+        bookmark=None,
+        index=0,
+        checkpoint_path=None,
+        checkpoint_interval=1,
+        done=False,
+        stream=False,
+    ):
         """
         Save the api_object and path for subsequent pages of information.
+        Use the bookmark, index, and done arguments to start at a position
+        saved by checkpoint(), or use from_checkpoint().
         """
+        if stream and prefetch:
+            raise ValueError("stream can not be used with prefetch")
         self.api_object = api_object
         self.path = path  # to be used with the bookmark on subsequent requests
-        self._get_response(path)  # first time, get response without bookmark
+        self.prefetch = prefetch
+        self.prefetcher = None
+        self.stream = stream
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.pages = 0  # number of pages consumed
+        self.done = done
+        if done:  # resuming a completed iteration
+            self._set_page((None, [], None))
+            return
+        # first time, get response with the initial bookmark (usually none)
+        self._set_page(self._fetch_page(bookmark, self.stream))
+        if self.stream:  # skip the items that have already been returned
+            while self.index < index and self._has_item():
+                self._take_item()
+                self.index += 1
+        self.index = index
+        if prefetch and self.bookmark:
+            self.prefetcher = PagePrefetcher(self, self.bookmark, prefetch)
+
+    @classmethod
+    def from_checkpoint(cls, api_object, checkpoint, **kwargs):
+        """
+        Create an iterator that resumes at the position saved by checkpoint().
+        """
+        return cls(
+            api_object,
+            checkpoint["path"],
+            bookmark=checkpoint.get("bookmark"),
+            index=checkpoint.get("index", 0),
+            done=checkpoint.get("done", False),
+            **kwargs,
+        )
+
+    def checkpoint(self):
+        """
+        Returns the position of the iterator as a dict that can be serialized
+        with JSON. The position is the next item that will be returned.
+        """
+        checkpoint = {
+            "path": self.path,
+            "bookmark": self.page_bookmark,
+            "index": self.index,
+        }
+        if self.done:
+            checkpoint["done"] = True
+        return checkpoint
+
+    def write_checkpoint(self):
+        """
+        Write the checkpoint to checkpoint_path. The file is replaced atomically
+        so that a crash does not leave a partial checkpoint.
+        """
+        temporary_path = f"{self.checkpoint_path}.tmp"
+        with open(temporary_path, "w") as checkpoint_file:
+            json.dump(self.checkpoint(), checkpoint_file)
+        os.replace(temporary_path, self.checkpoint_path)
 
     def __iter__(self):
         return self
 
+    def _has_item(self):
+        """
+        Check whether there is another item in the current page. For a
+        streamed page, the bookmark is available after the last item.
+        """
+        if isinstance(self.items, JsonItemStream):
+            try:
+                if self.items.peek():
+                    return True
+            except json.JSONDecodeError as error:
+                self.items.close()
+                # the same error as ApiCommon.unpack
+                raise RuntimeError(
+                    "response does not have valid json content: " + str(error)
+                )
+            self.bookmark = self.items.fields.get("bookmark")
+            return False
+        return self.index < len(self.items)
+
+    def _take_item(self):
+        if isinstance(self.items, JsonItemStream):
+            return next(self.items)
+        return self.items[self.index]
+
     def __next__(self):
-        if self.index >= len(self.items):
+        if not self._has_item():
             # need to fetch more data, if there is a bookmark
             if self.bookmark:
-                # Determine whether the query needs to be added to the path or
-                # if the bookmark will be an additional parameter at the end
-                # of the query.
-                delimiter = "&" if "?" in self.path else "?"
-                path_with_bookmark = self.path + delimiter + "bookmark=" + self.bookmark
-                self._get_response(path_with_bookmark)
-                if not self.items:  # in case there is some sort of error
+                self._page_consumed()
+                if self.prefetcher:
+                    self._set_page(self.prefetcher.get())
+                else:
+                    self._set_page(self._fetch_page(self.bookmark, self.stream))
+                if not self._has_item():  # in case there is some sort of error
+                    self._finish()
                     raise StopIteration
             else:
+                self._finish()
                 raise StopIteration  # no bookmark => all done
 
-        retval = self.items[self.index]  # get the current element
+        retval = self._take_item()  # get the current element
         self.index += 1  # increment the index for the next time
         return retval
 
+    def _page_consumed(self):
+        """
+        All of the items in the current page have been returned. Save the
+        position at the start of the next page, if required.
+        """
+        self.pages += 1
+        if self.checkpoint_path and self.pages % self.checkpoint_interval == 0:
+            self.page_bookmark = self.bookmark
+            self.index = 0
+            self.items = []
+            self.write_checkpoint()
+
+    def _finish(self):
+        if not self.done:
+            self.done = True
+            if self.checkpoint_path:
+                # the next enumeration with the same file starts over
+                try:
+                    os.remove(self.checkpoint_path)
+                except FileNotFoundError:
+                    pass
+        self.close()
+
+    def close(self):
+        """
+        Stop prefetching and streaming. Call this method when the iteration
+        is abandoned before the last page.
+        """
+        if isinstance(self.items, JsonItemStream):
+            self.items.close()
+        if self.prefetcher:
+            self.prefetcher.close()
+
 
 class ApiObject(ApiCommon):
     def __init__(self, api_config, access_token):
         super().__init__(api_config)
         self.api_uri = api_config.api_uri
         self.access_token = access_token
+        # all objects that share the configuration share the connection pool
+        self.session = api_config.session
+        # number of pages to fetch in the background for paged iterators
+        self.prefetch = 0
+        # decode the pages of paged iterators incrementally
+        self.stream = False
 
-    def get_response(self, path):
+    def get_response(self, path, stream=False):
         if self.api_config.verbosity >= 2:
             print(f"GET {self.api_uri + path}")
-        return requests.get(
+        return self.session.get(
             self.api_uri + path,
             headers=self.access_token.header(),
             allow_redirects=False,
+            stream=stream,
         )
 
     def request_data(self, path):
@@ -78,7 +306,7 @@ class ApiObject(ApiCommon):
             print(f"PUT {self.api_uri + path}")
             if self.api_config.verbosity >= 3:
                 print(put_data)
-        response = requests.put(
+        response = self.session.put(
             self.api_uri + path,
             data=put_data,
             headers=self.access_token.header(),
@@ -86,23 +314,28 @@ class ApiObject(ApiCommon):
         )
         return self.unpack(response)
 
-    def post_data(self, path, post_data=None):
+    def post_data(self, path, post_data=None, retry_safe=False):
+        """
+        POST requests are not retried after a failure unless retry_safe
+        is True, because the request may not be idempotent.
+        """
         if self.api_config.verbosity >= 2:
             print(f"POST {self.api_uri + path}")
             if self.api_config.verbosity >= 3:
                 print(post_data)
-        response = requests.post(
+        response = self.session.post(
             self.api_uri + path,
             json=post_data,
             headers=self.access_token.header(),
             allow_redirects=False,
+            retry_safe=retry_safe,
         )
         return self.unpack(response)
 
     def delete_and_check(self, path):
         if self.api_config.verbosity >= 2:
             print(f"DELETE {self.api_uri + path}")
-        response = requests.delete(
+        response = self.session.delete(
             self.api_uri + path,
             headers=self.access_token.header(),
             allow_redirects=False,
@@ -135,8 +368,33 @@ class ApiObject(ApiCommon):
             path += delimiter + urlencode(query_parameters)
         return path
 
-    def get_iterator(self, path, query_parameters=None):
-        return PagedIterator(self, self.add_query(path, query_parameters))
+    def get_iterator(
+        self, path, query_parameters=None, checkpoint_path=None, checkpoint_interval=1
+    ):
+        """
+        Returns a PagedIterator for the path. When checkpoint_path is specified,
+        the position of this iterator is saved in the file after every
+        checkpoint_interval pages, and if the file exists, the iterator resumes
+        at the saved position.
+        """
+        path = self.add_query(path, query_parameters)
+        kwargs = {"prefetch": self.prefetch, "stream": self.stream}
+        if checkpoint_path:
+            kwargs["checkpoint_path"] = checkpoint_path
+            kwargs["checkpoint_interval"] = checkpoint_interval
+            try:
+                with open(checkpoint_path, "r") as checkpoint_file:
+                    checkpoint = json.load(checkpoint_file)
+            except FileNotFoundError:
+                checkpoint = None
+            if checkpoint and not checkpoint.get("done"):
+                if checkpoint["path"] != path:
+                    raise ValueError(
+                        f"checkpoint in {checkpoint_path} is for {checkpoint['path']}"
+                    )
+                print(f"resuming from checkpoint in {checkpoint_path}")
+                return PagedIterator.from_checkpoint(self, checkpoint, **kwargs)
+        return PagedIterator(self, path, **kwargs)
 
     @classmethod
     def print_multiple(cls, page_size, object_name, object_class, paged_iterator):
@@ -9,6 +9,34 @@ def positive_integer(number):
     return ivalue
 
 
+def non_negative_integer(number):
+    ivalue = int(number)
+    if ivalue < 0:
+        raise argparse.ArgumentTypeError(f"{number} must be a non-negative integer")
+    return ivalue
+
+
+def prefetch_argument(parser, stream=False):
+    """
+    Set the command line arguments for scripts that iterate over many pages.
+    When stream is True, the pages may be decoded incrementally instead of
+    being prefetched (the two options can not be combined).
+    """
+    group = parser.add_mutually_exclusive_group() if stream else parser
+    group.add_argument(
+        "--prefetch",
+        type=non_negative_integer,
+        default=0,
+        help="number of pages to fetch in the background",
+    )
+    if stream:
+        group.add_argument(
+            "--stream",
+            action="store_true",
+            help="return the items of each page while the page is downloaded",
+        )
+
+
 def common_arguments(parser):
     """
     Set command line arguments that are common to all of the scripts.
@@ -0,0 +1,130 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from api_object import PagedIterator
+
+
+class AsyncPagedIterator:
+    """
+    Asynchronous iterator on top of a PagedIterator. Each item is retrieved
+    in an executor thread, so fetching the next page does not block the
+    event loop.
+    """
+
+    def __init__(self, paged_iterator, executor=None):
+        self.paged_iterator = paged_iterator
+        self.executor = executor
+
+    def __aiter__(self):
+        return self
+
+    _END = object()  # returned by the executor when there are no more items
+
+    async def __anext__(self):
+        # StopIteration can not be raised into a Future, so the executor
+        # returns a sentinel instead.
+        loop = asyncio.get_running_loop()
+        item = await loop.run_in_executor(
+            self.executor, next, self.paged_iterator, self._END
+        )
+        if item is self._END:
+            raise StopAsyncIteration
+        return item
+
+
+class AsyncApiObject:
+    """
+    Wrapper that makes it possible to drive any ApiObject (for example, a Pin,
+    a Board, a User, Advertisers, AdAnalytics, or an AsyncReport) from an
+    asyncio event loop. For example:
+       board = AsyncApiObject(Board(board_id, api_config, access_token))
+       board_data = await board.get()
+       async for pin_data in await board.get_pins():
+           ...
+
+    This is not a native asyncio HTTP client: the only HTTP dependency of
+    this code is requests, so each request runs in a thread of an executor
+    using the pooled session of the ApiConfig. By default, the executor has
+    one worker for each pooled connection (PINTEREST_POOL_MAXSIZE), so set
+    that variable to the number of requests that should be in flight at the
+    same time. To share one executor between several wrappers, pass it as
+    the executor argument.
+
+    The ApiObject is not copied, so the errors raised (e.g. RateLimitException
+    and SpamException) are exactly the same as for synchronous calls. For the
+    same reason, objects that keep state between calls (e.g. the pin_id set by
+    Pin.create) are shared by all of the wrappers of the object, so each
+    concurrent task needs its own ApiObject instance.
+
+    Call close (or use the wrapper as a context manager) to shut down the
+    executor created by the wrapper. An executor passed as an argument is
+    not shut down, because it may be shared.
+    """
+
+    def __init__(self, api_object, executor=None):
+        self.api_object = api_object
+        self._owns_executor = not executor
+        if not executor:
+            executor = ThreadPoolExecutor(max_workers=api_object.session.pool_maxsize)
+        self.executor = executor
+
+    def close(self):
+        if self._owns_executor:
+            self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    async def _run(self, function, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            self.executor, functools.partial(function, *args, **kwargs)
+        )
+        if isinstance(result, PagedIterator):
+            return AsyncPagedIterator(result, self.executor)
+        return result
+
+    async def request_data(self, path):
+        return await self._run(self.api_object.request_data, path)
+
+    async def put_data(self, path, put_data):
+        return await self._run(self.api_object.put_data, path, put_data)
+
+    async def post_data(self, path, post_data=None, retry_safe=False):
+        return await self._run(
+            self.api_object.post_data, path, post_data, retry_safe=retry_safe
+        )
+
+    async def delete_and_check(self, path):
+        return await self._run(self.api_object.delete_and_check, path)
+
+    async def get_iterator(self, path, query_parameters=None):
+        """
+        Returns an AsyncPagedIterator after the first page has been retrieved.
+        """
+        return await self._run(self.api_object.get_iterator, path, query_parameters)
+
+    def __getattr__(self, name):
+        """
+        Any other method of the ApiObject (e.g. Board.get or Pin.create) is
+        returned as a coroutine function. Other attributes are returned as-is.
+        """
+        attribute = getattr(self.api_object, name)
+        if not callable(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        async def coroutine(*args, **kwargs):
+            return await self._run(attribute, *args, **kwargs)
+
+        return coroutine
@@ -1,6 +1,23 @@
 from api_object import ApiObject
 
 
+class BoardSnapshot:
+    """
+    The sections of a board and its pins, grouped by section.
+      sections: the section data, in the order returned by the API
+      board_pins: the pins that are not in a section
+      section_pins: dict of the pins in each section, by section id
+    """
+
+    def __init__(self, sections, board_pins, section_pins):
+        self.sections = sections
+        self.board_pins = board_pins
+        self.section_pins = section_pins
+
+    def pin_count(self):
+        return len(self.board_pins) + sum(map(len, self.section_pins.values()))
+
+
 class Board(ApiObject):
     def __init__(self, board_id, api_config, access_token):
         super().__init__(api_config, access_token)
@@ -81,3 +98,21 @@ class Board(ApiObject):
         return self.get_iterator(
             f"/v5/boards/{self.board_id}/sections/{section_id}/pins", query_parameters
         )
+
+    def get_snapshot(self):
+        """
+        Returns a BoardSnapshot with the sections and pins of the board. The
+        pins of the board (which include the pins in sections) are listed once
+        and grouped by board_section_id, instead of listing the pins of each
+        section again with get_section_pins.
+        """
+        sections = list(self.get_sections())
+        section_pins = {section_data["id"]: [] for section_data in sections}
+        board_pins = []
+        for pin_data in self.get_pins():
+            section_id = pin_data.get("board_section_id")
+            if section_id:
+                section_pins.setdefault(section_id, []).append(pin_data)
+            else:
+                board_pins.append(pin_data)
+        return BoardSnapshot(sections, board_pins, section_pins)
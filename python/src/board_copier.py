@@ -0,0 +1,429 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from api_common import RateLimitException, SpamException
+from board import Board
+from pin import Pin
+from pin_index import PinIndex
+from user import User
+
+DEFAULT_CONCURRENCY = 4  # number of pins created at the same time
+RATE_LIMIT_RETRIES = 3  # attempts to copy a pin after RateLimitException
+RATE_LIMIT_PAUSE = 10.0  # initial pause (in seconds) after RateLimitException
+MAX_RATE_LIMIT_PAUSE = 120.0
+COPY_STRATEGIES = ["auto", "create", "save"]
+
+
+class BoardCopier:
+    """
+    Copies boards, with their sections and pins, from the account of the
+    source access token to the account of the target access token.
+
+    The board and its sections are created first. Then, the pins are created
+    by a pool of concurrency worker threads while the source board is being
+    read. Each pin is created in the target section that corresponds to its
+    source section.
+
+    The workers share the HttpSession of the ApiConfig, so requests are paced
+    by its rate limiter. When a pin can not be created because of the rate
+    limit (RateLimitException), all of the workers pause and the pin is tried
+    again. The pause doubles each time, up to MAX_RATE_LIMIT_PAUSE.
+
+    The strategy determines how pins are copied. "save" saves the source pin
+    to the target board, which is much cheaper than "create", which creates a
+    new pin with the media of the source pin, but it is only possible when the
+    source and target are the same account. "auto" (the default) uses save
+    when the source and target access tokens are for the same user.
+
+    The result for each pin (copied, skipped, spam, or failed) is saved in
+    the results list.
+
+    When a journal (a CopyJournal) is specified, every board, section, and pin
+    that is created is saved in the journal, as well as the pins that are
+    skipped. Entities that are already in the journal are not created again,
+    so an interrupted copy can be run again to continue where it stopped.
+    Pins that failed are tried again. These pins have the status
+    already_copied in the results.
+
+    When dedup is True, a board that already exists in the target account
+    with the same name is used instead of creating a new board, as are the
+    sections with the same names. The pins of the existing board are read
+    once into a PinIndex, and source pins with the same link, title, and image
+    as a pin in the index are not copied. These pins also have the status
+    already_copied in the results, so copying a board again only copies the
+    pins that were added since the last copy.
+
+    When a plan (a CopyPlan) is specified for a dry run, the entities that
+    would be created and the requests that would be sent are counted in the
+    plan, to estimate the cost of the copy.
+    """
+
+    def __init__(
+        self,
+        api_config,
+        source_token,
+        target_token,
+        concurrency=DEFAULT_CONCURRENCY,
+        dry_run=False,
+        prefetch=0,
+        journal=None,
+        strategy="auto",
+        plan=None,
+        dedup=False,
+    ):
+        if strategy not in COPY_STRATEGIES:
+            raise ValueError(f"strategy must be one of {', '.join(COPY_STRATEGIES)}")
+        self.api_config = api_config
+        self.source_token = source_token
+        self.target_token = target_token
+        self.concurrency = concurrency
+        self.dry_run = dry_run
+        self.prefetch = prefetch
+        self.journal = journal
+        self.strategy = strategy
+        self.plan = plan
+        self.dedup = dedup
+        self._target_boards = None  # board data by name, read when needed
+        self.results = []  # dict for each pin, in order of completion
+        self.pause = RATE_LIMIT_PAUSE
+        self.pause_until = 0.0  # set after RateLimitException
+        self._lock = threading.Lock()
+        # limits the number of pins that have been read but not copied
+        self._slots = threading.BoundedSemaphore(2 * concurrency)
+        self.executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="copy-pin"
+        )
+
+    def close(self):
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _print(self, *lines):
+        # print the lines together, even when workers print at the same time
+        with self._lock:
+            for line in lines:
+                if callable(line):
+                    line()
+                else:
+                    print(line)
+
+    def _record(self, pin_data, status, target_id=None, error=None):
+        result = {"source_id": pin_data.get("id"), "status": status}
+        if target_id:
+            result["target_id"] = target_id
+        if error:
+            result["error"] = str(error)
+        if self.journal and status in ["copied", "skipped", "spam"]:
+            self.journal.record("pin", pin_data.get("id"), target_id, status)
+        with self._lock:
+            self.results.append(result)
+        return result
+
+    def summary(self):
+        """
+        Returns the number of pins with each status.
+        """
+        counts = {}
+        with self._lock:
+            for result in self.results:
+                counts[result["status"]] = counts.get(result["status"], 0) + 1
+        return counts
+
+    def _wait_for_pause(self):
+        while True:
+            with self._lock:
+                delay = self.pause_until - time.monotonic()
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    def _rate_limited(self):
+        with self._lock:
+            now = time.monotonic()
+            if self.pause_until <= now:  # not already paused by another worker
+                print(f"Rate limit exceeded. Pausing for {self.pause:.0f} seconds...")
+                self.pause_until = now + self.pause
+                self.pause = min(2 * self.pause, MAX_RATE_LIMIT_PAUSE)
+
+    def pin_strategy(self):
+        """
+        Returns the strategy used to copy pins: "create" or "save".
+        """
+        if self.strategy == "auto":
+            if self.source_token is self.target_token:
+                same_account = True
+            else:
+                source_user = User(self.api_config, self.source_token).get()
+                target_user = User(self.api_config, self.target_token).get()
+                same_account = source_user["username"] == target_user["username"]
+            self.strategy = "save" if same_account else "create"
+            print(f"copying pins with {self.strategy}")
+        return self.strategy
+
+    def _copy(self, pin_data, target_board_id, target_section_id):
+        if self.strategy == "save":
+            source_pin = Pin(pin_data["id"], self.api_config, self.target_token)
+            return source_pin.save(target_board_id, target_section_id)
+        # Each worker needs its own Pin, because create sets the pin_id.
+        target_pin = Pin(None, self.api_config, self.target_token)
+        return target_pin.create(pin_data, target_board_id, target_section_id)
+
+    def copy_pin(self, pin_data, target_board_id, target_section_id=None):
+        """
+        Create a copy of the pin in the target board and section, and
+        returns the result.
+        """
+        # Sometimes the board list operation will generate entities
+        # (e.g. "more ideas" tiles) that resemble pins but can not be copied.
+        pintype = pin_data.get("type")
+        if pintype and pintype != "pin":
+            self._print(
+                "skipping pin because type is not 'pin'",
+                lambda: Pin.print_summary(pin_data),
+            )
+            return self._record(pin_data, "skipped")
+
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            self._wait_for_pause()
+            try:
+                target_pin_data = self._copy(
+                    pin_data, target_board_id, target_section_id
+                )
+                break
+            except SpamException:
+                self._print("skipping pin because of spam exception")
+                return self._record(pin_data, "spam")
+            except RateLimitException as error:
+                if attempt == RATE_LIMIT_RETRIES:
+                    return self._failed(pin_data, error)
+                self._rate_limited()
+            except Exception as error:
+                return self._failed(pin_data, error)
+
+        with self._lock:
+            self.pause = RATE_LIMIT_PAUSE  # reset after a success
+        self._print(
+            "source pin:",
+            lambda: Pin.print_summary(pin_data),
+            "target pin:",
+            lambda: Pin.print_summary(target_pin_data),
+        )
+        return self._record(pin_data, "copied", target_pin_data["id"])
+
+    def _failed(self, pin_data, error):
+        self._print(f"failed to copy pin {pin_data.get('id')}: {error!r}")
+        return self._record(pin_data, "failed", error=error)
+
+    def _plan(self, kind, present=False, method=None, path=None, skipped=False):
+        if self.plan:
+            if skipped:
+                self.plan.skipped_pins += 1
+            else:
+                self.plan.add(kind, present)
+            if method:
+                self.plan.add_calls(method, path)
+
+    def _plan_listing(self, path, iterator):
+        """
+        Count the GET requests of a listing that has been read to the end.
+        The pages of the iterator are only counted when the next page is
+        fetched, so the first page is added here.
+        """
+        if self.plan:
+            self.plan.add_calls("GET", path, iterator.pages + 1)
+
+    def _already_copied(self, source_id, target_id):
+        self._plan("pin", present=True)
+        with self._lock:
+            self.results.append(
+                {
+                    "source_id": source_id,
+                    "status": "already_copied",
+                    "target_id": target_id,
+                }
+            )
+
+    def _submit(
+        self, futures, pin_data, target_board_id, target_section_id=None, index=None
+    ):
+        entry = self.journal and self.journal.get("pin", pin_data.get("id"))
+        if entry:
+            self._already_copied(entry["source"], entry["target"])
+            return
+
+        target_pin_id = index and index.get(pin_data)
+        if target_pin_id:
+            self._print(f"pin {pin_data.get('id')} is already on the target board")
+            self._already_copied(pin_data.get("id"), target_pin_id)
+            return
+
+        if self.dry_run:
+            self._print(
+                "dry-run: skipping attempt to create pin:",
+                lambda: Pin.print_summary(pin_data),
+            )
+            pintype = pin_data.get("type")
+            if pintype and pintype != "pin":
+                self._plan("pin", skipped=True)
+            elif self.strategy == "save":
+                self._plan("pin", method="POST", path=f"/v5/pins/{pin_data['id']}/save")
+            else:
+                self._plan("pin", method="POST", path="/v5/pins")
+            return
+
+        self._slots.acquire()  # wait for the workers to catch up
+        try:
+            future = self.executor.submit(
+                self.copy_pin, pin_data, target_board_id, target_section_id
+            )
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        futures.append(future)
+
+    def _existing_board(self, name):
+        """
+        Returns the data of the board with the name in the target account,
+        or None. The boards of the target account are read once.
+        """
+        if self._target_boards is None:
+            user = User(self.api_config, self.target_token)
+            boards = user.get_boards()
+            self._target_boards = {
+                board_data["name"]: board_data for board_data in boards
+            }
+            self._plan_listing("/v5/boards", boards)
+        return self._target_boards.get(name)
+
+    def _journal_target(self, kind, source_id):
+        return self.journal and self.journal.target(kind, source_id)
+
+    def _journal_record(self, kind, source_data, target_data):
+        if self.journal:
+            self.journal.record(kind, source_data["id"], target_data["id"])
+
+    def copy_board(self, source_board_data, name=None):
+        """
+        Copy the board with its sections and pins. Use the name argument to
+        change the name of the target board, which is required when the source
+        and target are the same account. Returns the target board data.
+        """
+        self.pin_strategy()  # determine the strategy before starting the workers
+        print("source board:")
+        Board.print_summary(source_board_data)
+        source_board = Board(
+            source_board_data["id"], self.api_config, self.source_token
+        )
+        source_board.prefetch = self.prefetch
+
+        # Use different name, which is mandatory when using a single access token.
+        # Change the name after the Board.print_summary with the source name.
+        if name:
+            print(f'setting target board name to "{name}"')
+            source_board_data = dict(source_board_data, name=name)
+
+        target_board = Board(None, self.api_config, self.target_token)
+        target_board_id = self._journal_target("board", source_board_data["id"])
+        existing_board_data = None
+        if not target_board_id and self.dedup:
+            existing_board_data = self._existing_board(source_board_data["name"])
+        if target_board_id:
+            print(f"board was already copied to {target_board_id}")
+            self._plan("board", present=True)
+            target_board.board_id = target_board_id
+            target_board_data = {"id": target_board_id}
+        elif existing_board_data:
+            print(f"board already exists in the target: {existing_board_data['id']}")
+            self._plan("board", present=True)
+            target_board.board_id = existing_board_data["id"]
+            target_board_data = existing_board_data
+        elif self.dry_run:
+            print("dry-run: skipping attempt to create board:")
+            Board.print_summary(source_board_data)
+            self._plan("board", method="POST", path="/v5/boards")
+            target_board_data = {"id": None}
+        else:
+            target_board_data = target_board.create(source_board_data)
+            self._journal_record("board", source_board_data, target_board_data)
+            print("target board:")
+            Board.print_summary(target_board_data)
+
+        # read the sections and pins that are already on the target board
+        existing_section_ids = {}  # by name
+        index = None
+        if self.dedup and target_board.board_id:
+            path = f"/v5/boards/{target_board.board_id}"
+            target_sections = target_board.get_sections()
+            for section_data in target_sections:
+                existing_section_ids[section_data["name"]] = section_data["id"]
+            self._plan_listing(path + "/sections", target_sections)
+            target_pins = target_board.get_pins()
+            index = PinIndex(target_pins)
+            self._plan_listing(path + "/pins", target_pins)
+            print(f"{len(index)} pins are already on the target board")
+
+        # create all of the sections before any of the pins
+        target_section_ids = {}  # by source section id
+        sections = source_board.get_sections()
+        for idx, section_data in enumerate(sections):
+            target_section_id = self._journal_target("section", section_data["id"])
+            if target_section_id:
+                print(f"section was already copied to {target_section_id}")
+                self._plan("section", present=True)
+                target_section_ids[section_data["id"]] = target_section_id
+                continue
+            target_section_id = existing_section_ids.get(section_data["name"])
+            if target_section_id:
+                print(f"section already exists in the target: {target_section_id}")
+                self._plan("section", present=True)
+                target_section_ids[section_data["id"]] = target_section_id
+                continue
+            if self.dry_run:
+                print("dry-run: skipping attempt to create board section:")
+                Board.print_section(section_data)
+                self._plan(
+                    "section",
+                    method="POST",
+                    path=f"/v5/boards/{target_board_data['id']}/sections",
+                )
+                target_section_ids[section_data["id"]] = None
+                continue
+            print(f"source section #{idx}:")
+            Board.print_section(section_data)
+            target_section_data = target_board.create_section(section_data)
+            self._journal_record("section", section_data, target_section_data)
+            print(f"target section #{idx}:")
+            Board.print_section(target_section_data)
+            target_section_ids[section_data["id"]] = target_section_data["id"]
+
+        # The pins of the board include the pins in sections, so the board is
+        # read once (like Board.get_snapshot) and each pin is copied as soon
+        # as it has been read.
+        futures = []
+        pins = source_board.get_pins()
+        for pin_data in pins:
+            section_id = pin_data.get("board_section_id")
+            if section_id and section_id not in target_section_ids:
+                self._print(f"section {section_id} not found, copying to board")
+            self._submit(
+                futures,
+                pin_data,
+                target_board_data["id"],
+                target_section_ids.get(section_id),
+                index,
+            )
+
+        for future in futures:
+            future.result()  # wait for all of the pins on the board
+        # the pages are read again by the copy
+        path = f"/v5/boards/{source_board_data['id']}"
+        self._plan_listing(path + "/sections", sections)
+        self._plan_listing(path + "/pins", pins)
+        return target_board_data
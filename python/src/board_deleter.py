@@ -0,0 +1,129 @@
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from board import Board
+
+DEFAULT_DELETE_CONCURRENCY = 4  # number of boards deleted at the same time
+
+
+def read_board_ids(path):
+    """
+    Read a file with one board identifier on each line. Blank lines and
+    lines that start with # are ignored.
+    """
+    with open(path, "r") as board_file:
+        return [
+            line.strip()
+            for line in board_file
+            if line.strip() and not line.strip().startswith("#")
+        ]
+
+
+class BoardFilter:
+    """
+    Selects boards by name (a regular expression that is searched for in the
+    name), by creation date (boards created before a datetime.date), and by
+    identifier (a collection of board ids). A board must match all of the
+    criteria that are specified.
+    """
+
+    def __init__(self, name_pattern=None, created_before=None, board_ids=None):
+        self.name_pattern = re.compile(name_pattern) if name_pattern else None
+        self.created_before = created_before and created_before.isoformat()
+        self.board_ids = set(board_ids) if board_ids is not None else None
+
+    def matches(self, board_data):
+        if self.board_ids is not None and board_data["id"] not in self.board_ids:
+            return False
+        if self.name_pattern and not self.name_pattern.search(
+            board_data.get("name") or ""
+        ):
+            return False
+        if self.created_before:
+            # created_at is an ISO 8601 time, e.g. 2020-01-01T20:10:40
+            created_at = board_data.get("created_at")
+            if not created_at or created_at >= self.created_before:
+                return False
+        return True
+
+
+class BoardDeleter:
+    """
+    Deletes boards with a pool of concurrency worker threads.
+
+    The workers share the HttpSession of the ApiConfig, so requests are paced
+    by its rate limiter and DELETE requests that fail with a 429 or 5xx
+    response are retried by its retry policy.
+
+    The result for each board (deleted, failed, or skipped) is saved in the
+    results list.
+    """
+
+    def __init__(
+        self, api_config, access_token, concurrency=DEFAULT_DELETE_CONCURRENCY
+    ):
+        self.api_config = api_config
+        self.access_token = access_token
+        self.results = []  # dict for each board, in order of completion
+        self._lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="delete-board"
+        )
+
+    def close(self):
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _record(self, board_data, status, error=None):
+        result = {"board_id": board_data["id"], "status": status}
+        if error:
+            result["error"] = str(error)
+        with self._lock:
+            self.results.append(result)
+        return result
+
+    def skip(self, board_data):
+        return self._record(board_data, "skipped")
+
+    def delete_board(self, board_data):
+        """
+        Delete the board and returns the result.
+        """
+        # Each worker needs its own Board, because the board_id is an attribute.
+        board = Board(board_data["id"], self.api_config, self.access_token)
+        try:
+            board.delete()
+        except Exception as error:
+            with self._lock:
+                print(f"failed to delete board {board_data['id']}: {error!r}")
+            return self._record(board_data, "failed", error)
+        if self.api_config.verbosity >= 1:
+            with self._lock:
+                print(f"deleted board {Board.text_id(board_data)}")
+        return self._record(board_data, "deleted")
+
+    def delete_boards(self, boards):
+        """
+        Delete all of the boards concurrently, and wait for the deletions.
+        """
+        futures = [
+            self.executor.submit(self.delete_board, board_data) for board_data in boards
+        ]
+        for future in futures:
+            future.result()
+
+    def summary(self):
+        """
+        Returns the number of boards with each status.
+        """
+        counts = {"deleted": 0, "failed": 0, "skipped": 0}
+        with self._lock:
+            for result in self.results:
+                counts[result["status"]] += 1
+        return counts
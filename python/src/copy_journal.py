@@ -0,0 +1,83 @@
+import json
+import threading
+
+
+class CopyJournal:
+    """
+    Append-only journal of the boards, sections, and pins created by a copy,
+    saved in a file with one JSON object per line (NDJSON). For example:
+      {"kind": "board", "source": "1234", "target": "5678"}
+      {"kind": "pin", "source": "2345", "target": null, "status": "spam"}
+
+    When a copy is interrupted and run again with the same journal, the
+    entities in the journal are not created again. Each line is flushed as
+    soon as the entity has been created, and a partial line left by a crash
+    is ignored when the journal is read.
+
+    The entities in the journal exist only in the target account, so the
+    journal records the target_account (e.g. the username of the target
+    access token) in its first entry, and a journal for another target
+    account raises ValueError:
+      {"kind": "account", "source": null, "target": "pindexter"}
+    """
+
+    def __init__(self, path, target_account=None):
+        self.path = path
+        self.entries = {}  # (kind, source id) -> entry
+        self.target_account = None
+        partial = False
+        try:
+            with open(path, "r") as journal_file:
+                for line in journal_file:
+                    partial = not line.endswith("\n")
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:  # partial line written during a crash
+                        continue
+                    if entry["kind"] == "account":
+                        self.target_account = entry["target"]
+                        continue
+                    self.entries[(entry["kind"], entry["source"])] = entry
+        except FileNotFoundError:
+            pass
+        if target_account and self.target_account not in (None, target_account):
+            raise ValueError(
+                f"journal {path} is for target account {self.target_account}, "
+                f"not {target_account}"
+            )
+        self._lock = threading.Lock()
+        self.journal_file = open(path, "a")
+        if partial:  # end the partial line, so that it is not continued
+            self.journal_file.write("\n")
+        if target_account and not self.target_account:
+            self.record("account", None, target_account)
+            self.target_account = target_account
+
+    def get(self, kind, source_id):
+        """
+        Returns the entry for the source entity, or None if it has not been copied.
+        """
+        with self._lock:
+            return self.entries.get((kind, source_id))
+
+    def target(self, kind, source_id):
+        """
+        Returns the identifier of the copy of the source entity, or None.
+        """
+        entry = self.get(kind, source_id)
+        return entry and entry["target"]
+
+    def record(self, kind, source_id, target_id, status=None):
+        """
+        Save the identifier of the entity created from the source entity.
+        """
+        entry = {"kind": kind, "source": source_id, "target": target_id}
+        if status:
+            entry["status"] = status
+        with self._lock:
+            self.journal_file.write(json.dumps(entry) + "\n")
+            self.journal_file.flush()
+            self.entries[(kind, source_id)] = entry
+
+    def close(self):
+        self.journal_file.close()
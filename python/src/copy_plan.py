@@ -0,0 +1,91 @@
+from rate_limiter import DEFAULT_RATE_LIMITS, DEFAULT_WINDOW, endpoint_category
+
+ESTIMATED_LATENCY = 0.5  # seconds, typical time for one API request
+COPY_KINDS = ["board", "section", "pin"]
+
+
+class CopyPlan:
+    """
+    Estimates the cost of a copy, as determined by a dry run of BoardCopier:
+      * the number of boards, sections, and pins that will be created, and
+        the number that are already present in the target (e.g. in the
+        journal of an earlier copy) and will be skipped.
+      * the number of API requests in each rate limit category.
+      * the expected wall time of the copy.
+
+    The wall time is the larger of two estimates. The first assumes that each
+    request takes latency seconds, that the boards, sections, and pages of
+    pins are processed one at a time, and that concurrency pins are created at
+    the same time. The second is the time required to stay within the rate
+    limits (requests per minute) for each category, after an initial burst
+    of one minute of requests.
+    """
+
+    def __init__(
+        self,
+        rate_limits=None,
+        concurrency=1,
+        latency=ESTIMATED_LATENCY,
+        window=DEFAULT_WINDOW,
+    ):
+        self.rate_limits = dict(DEFAULT_RATE_LIMITS)
+        self.rate_limits.update(rate_limits or {})
+        self.concurrency = concurrency
+        self.latency = latency
+        self.window = window
+        self.create = dict.fromkeys(COPY_KINDS, 0)
+        self.present = dict.fromkeys(COPY_KINDS, 0)
+        self.skipped_pins = 0  # entities that are not pins
+        self.calls = {}  # number of requests by rate limit category
+        self.pin_calls = 0  # requests that are sent concurrently
+
+    def add(self, kind, present=False):
+        """
+        Count an entity that will be created, or that is already present.
+        """
+        if present:
+            self.present[kind] += 1
+        else:
+            self.create[kind] += 1
+
+    def add_calls(self, method, path, count=1):
+        """
+        Count the requests that will be sent to the endpoint.
+        """
+        category = endpoint_category(method, path)
+        self.calls[category] = self.calls.get(category, 0) + count
+        if path.startswith("/v5/pins"):
+            self.pin_calls += count
+
+    def wall_time(self):
+        """
+        Returns the expected time for the copy, in seconds.
+        """
+        serial_calls = sum(self.calls.values()) - self.pin_calls
+        latency_time = (serial_calls + self.pin_calls / self.concurrency) * self.latency
+        rate_time = 0.0
+        for category, calls in self.calls.items():
+            limit = self.rate_limits.get(category, self.rate_limits["org_read"])
+            # the token bucket allows a burst of limit requests
+            rate_time = max(rate_time, max(0, calls - limit) * self.window / limit)
+        return max(latency_time, rate_time)
+
+    def print_summary(self):
+        print("--- Copy Plan ---")
+        for kind in COPY_KINDS:
+            print(
+                f"{kind}s: {self.create[kind]} to create, "
+                f"{self.present[kind]} already present"
+            )
+        if self.skipped_pins:
+            print(f"skipped (not pins): {self.skipped_pins}")
+        print("API requests:")
+        for category, calls in sorted(self.calls.items()):
+            limit = self.rate_limits.get(category, self.rate_limits["org_read"])
+            print(f"  {category}: {calls} (limit {limit:.0f} per minute)")
+        minutes, seconds = divmod(round(self.wall_time()), 60)
+        print(
+            f"expected time: {minutes} minutes {seconds} seconds "
+            f"with concurrency {self.concurrency}"
+        )
+        print("-----------------")
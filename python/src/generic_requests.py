@@ -1,11 +1,12 @@
 import requests
 
 
-def download_file(url, path):
+def download_file(url, path, session=None):
     """
-    Use streaming HTTP request to download a file.
+    Use streaming HTTP request to download a file. Pass the session
+    from the ApiConfig to reuse its pooled connections.
     """
-    with requests.get(url, stream=True) as response:
+    with (session or requests).get(url, stream=True) as response:
         response.raise_for_status()
         with open(path, "wb") as output:
             # use typical disk block size as chunk_size
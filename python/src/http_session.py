@@ -0,0 +1,230 @@
+import functools
+import gzip
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from json_codec import JsonCodec
+from retry_policy import RetryPolicy
+
+# requests opens a new connection (and a new TLS handshake) for every call to
+# the module-level functions like requests.get. A session keeps connections in
+# a pool so that they can be reused across calls to the same host.
+DEFAULT_POOL_CONNECTIONS = 10  # number of hosts with pooled connections
+DEFAULT_POOL_MAXSIZE = 10  # number of connections kept for each host
+
+
+class HttpSession(requests.Session):
+    """
+    A requests.Session with a connection pool that is shared by all of
+    the objects that send HTTP requests with the same ApiConfig: ApiObject
+    and its subclasses, AccessToken, and the helpers that talk to S3.
+
+    pool_connections is the number of hosts for which connections are pooled.
+    pool_maxsize is the maximum number of connections kept for each host,
+    which should be at least the number of threads that share the session.
+    When keep_alive is False, the session asks the server to close each
+    connection after the response instead of returning it to the pool.
+
+    The retry_policy determines which failed requests are retried, and how
+    long to wait before each retry. By default, requests are not retried.
+    The number of retries and the time spent waiting for each request are
+    saved in the retries and retry_sleep attributes of the response, and
+    the totals for the session are in the attributes with the same names.
+
+    When a rate_limiter is specified, requests with an Authorization header
+    wait for the budget of their access token and endpoint category before
+    they are sent. The time spent waiting is saved in the rate_limit_wait
+    attribute of the response.
+
+    When a response_cache is specified, the responses to GET requests are
+    cached as described in ResponseCache, and other requests invalidate the
+    cached responses for their path. Responses that come from the cache
+    have a from_cache attribute set to True.
+
+    When metrics (a RequestMetrics) are specified, the latency, size, status,
+    and retries of every request are recorded, including cached responses.
+
+    The json_codec (see json_codec.py) encodes the json argument of requests
+    and decodes response.json(). By default, requests uses the json module
+    of the standard library. When gzip_min_bytes is specified, JSON request
+    bodies of at least that size are sent with gzip compression. Compressed
+    responses (gzip, and brotli when the brotli package is installed) are
+    requested and decompressed by requests.
+    """
+
+    def __init__(
+        self,
+        pool_connections=DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize=DEFAULT_POOL_MAXSIZE,
+        keep_alive=True,
+        retry_policy=None,
+        rate_limiter=None,
+        response_cache=None,
+        metrics=None,
+        json_codec=None,
+        gzip_min_bytes=None,
+        verbosity=0,
+    ):
+        super().__init__()
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.retry_policy = retry_policy or RetryPolicy(max_retries=0)
+        self.rate_limiter = rate_limiter
+        self.response_cache = response_cache
+        self.metrics = metrics
+        self.json_codec = json_codec or JsonCodec()
+        self.gzip_min_bytes = gzip_min_bytes
+        self.verbosity = verbosity
+
+        # totals for all requests, which may be sent by multiple threads
+        self.retries = 0
+        self.retry_sleep = 0.0
+        self._lock = threading.Lock()
+
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+        if not keep_alive:
+            self.headers["Connection"] = "close"
+
+    def request(self, method, url, *args, retry_safe=False, **kwargs):
+        """
+        Send the request, retrying as specified by the retry policy.
+        Set retry_safe to True to allow retries of a POST request.
+        """
+        # requests encodes and decodes with the standard library by default
+        custom_codec = self.json_codec.name != JsonCodec.name
+        if kwargs.get("json") is not None and (
+            custom_codec or self.gzip_min_bytes is not None
+        ):
+            kwargs = self._encode_json(kwargs)
+
+        start = time.monotonic()
+        response = None
+        try:
+            response = self._cached_request(
+                method, url, *args, retry_safe=retry_safe, **kwargs
+            )
+        finally:
+            if self.metrics:
+                self.metrics.record(method, url, response, time.monotonic() - start)
+
+        if custom_codec:
+            response.json = functools.partial(self.json_codec.response_json, response)
+        return response
+
+    def _encode_json(self, kwargs):
+        """
+        Replace the json argument with an encoded (and maybe compressed) body.
+        """
+        kwargs = dict(kwargs)
+        body = self.json_codec.dumps(kwargs.pop("json"))
+        # copy the headers, because the caller may reuse the dict
+        headers = dict(kwargs.get("headers") or {})
+        headers["Content-Type"] = "application/json"
+        if self.gzip_min_bytes is not None and len(body) >= self.gzip_min_bytes:
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+        kwargs["data"] = body
+        kwargs["headers"] = headers
+        return kwargs
+
+    def _cached_request(self, method, url, *args, retry_safe=False, **kwargs):
+        cache = self.response_cache
+        if cache and method.upper() not in ("GET", "HEAD", "OPTIONS"):
+            try:
+                return self._send(method, url, *args, retry_safe=retry_safe, **kwargs)
+            finally:
+                # the request may have changed the resource, even if it failed
+                cache.invalidate(url)
+        if (
+            not cache
+            or method.upper() != "GET"
+            or kwargs.get("stream")
+            or cache.ttl(url) is None
+        ):
+            return self._send(method, url, *args, retry_safe=retry_safe, **kwargs)
+
+        headers = kwargs.get("headers")
+        entry = cache.get(url, headers)
+        if entry:
+            if entry.age() < cache.ttl(url):
+                return entry.response(url)
+            if cache.stale_while_revalidate:
+                threading.Thread(
+                    target=self._revalidate,
+                    args=(method, url, entry, args, kwargs),
+                    daemon=True,
+                ).start()
+                return entry.response(url)
+        return self._revalidate(method, url, entry, args, kwargs)
+
+    def _revalidate(self, method, url, entry, args, kwargs):
+        """
+        Send a GET request (conditional, when there is a cached entry with an
+        ETag) and update the cache with the response.
+        """
+        cache = self.response_cache
+        headers = kwargs.get("headers")
+        if entry and entry.etag():
+            # copy the headers, because the caller may reuse the dict
+            kwargs = dict(kwargs, headers=dict(headers or {}))
+            kwargs["headers"]["If-None-Match"] = entry.etag()
+        response = self._send(method, url, *args, **kwargs)
+        if entry and response.status_code == 304:
+            response.close()  # return the connection to the pool
+            cache.refresh(url, headers, entry)
+            return entry.response(url)
+        if response.ok:
+            cache.put(url, headers, response)
+        return response
+
+    def _send(self, method, url, *args, retry_safe=False, **kwargs):
+        bucket = None
+        if self.rate_limiter:
+            bucket = self.rate_limiter.bucket(kwargs.get("headers"), method, url)
+        rate_limit_wait = 0.0
+        retries = 0
+        retry_sleep = 0.0
+        while True:
+            if bucket:
+                rate_limit_wait += bucket.acquire()
+            try:
+                response = super().request(method, url, *args, **kwargs)
+                if bucket:
+                    self.rate_limiter.update(bucket, response)
+            except requests.ConnectionError as error:
+                if not self.retry_policy.can_retry(method, retries, retry_safe):
+                    raise
+                delay = self.retry_policy.delay(None, retries)
+                reason = f"{type(error).__name__} for {method} {url}"
+            else:
+                if self.retry_policy.should_retry(
+                    method, response, retries, retry_safe
+                ):
+                    delay = self.retry_policy.delay(response, retries)
+                else:
+                    delay = None
+                if delay is None:
+                    response.retries = retries
+                    response.retry_sleep = retry_sleep
+                    response.rate_limit_wait = rate_limit_wait
+                    return response
+                reason = f"{response.status_code} response to {method} {url}"
+                response.close()  # return the connection to the pool
+
+            if self.verbosity >= 1:
+                print(f"{reason}. Retrying in {delay:.1f} seconds...")
+            time.sleep(delay)
+            retries += 1
+            retry_sleep += delay
+            with self._lock:
+                self.retries += 1
+                self.retry_sleep += delay
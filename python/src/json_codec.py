@@ -0,0 +1,68 @@
+import json
+
+import requests
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+JSON_CODECS = ["auto", "json", "orjson"]
+
+
+class JsonCodec:
+    """
+    Encodes request bodies and decodes responses with the json module of the
+    standard library, exactly like requests does.
+    """
+
+    name = "json"
+
+    def dumps(self, data):
+        """
+        Returns the data encoded as UTF-8 JSON bytes.
+        """
+        return json.dumps(data, allow_nan=False).encode("utf-8")
+
+    def loads(self, content):
+        return json.loads(content)
+
+    def response_json(self, response):
+        """
+        Decode the content of the response. Errors are raised as
+        requests.JSONDecodeError, like response.json().
+        """
+        try:
+            return self.loads(response.content)
+        except ValueError as error:
+            raise requests.JSONDecodeError(
+                str(error), getattr(error, "doc", ""), getattr(error, "pos", 0)
+            ) from error
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    Uses orjson, which is several times faster than the standard library.
+    """
+
+    name = "orjson"
+
+    def dumps(self, data):
+        return orjson.dumps(data)
+
+    def loads(self, content):
+        return orjson.loads(content)
+
+
+def get_json_codec(name="auto"):
+    """
+    Returns the codec with the name. "auto" is orjson when it is installed,
+    and the standard library otherwise.
+    """
+    if name not in JSON_CODECS:
+        raise ValueError(f"JSON codec must be one of {', '.join(JSON_CODECS)}")
+    if name == "orjson" and not orjson:
+        raise ValueError("the orjson JSON codec requires the orjson package")
+    if name == "json" or not orjson:
+        return JsonCodec()
+    return OrjsonCodec()
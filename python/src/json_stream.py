@@ -0,0 +1,155 @@
+import codecs
+import json
+
+CHUNK_SIZE = 16 * 1024  # bytes read from the response at a time
+
+WHITESPACE = " \t\n\r"
+NUMBER = "0123456789+-.eE"  # characters that may continue a number
+
+
+class JsonItemStream:
+    """
+    Incremental decoder for a JSON object with a list of items, like the
+    responses for the list endpoints of the Pinterest API:
+       {"items": [{...}, {...}, ...], "bookmark": "..."}
+
+    Iterating over the stream returns each element of the list as soon as it
+    has been read from the response, so that a page does not need to be held
+    in memory and the first item is available before the page has been
+    downloaded. The other values in the object (e.g. the bookmark) are saved
+    in the fields dict, which is complete when the iteration is finished.
+    Only the top-level values are decoded incrementally: each item is decoded
+    with the standard json module.
+    """
+
+    def __init__(self, response, key="items", chunk_size=CHUNK_SIZE):
+        self.response = response
+        self.key = key
+        self.chunks = response.iter_content(chunk_size=chunk_size)
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.json_decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+        self.fields = {}
+        self.items = self._parse()
+        self.peeked = []
+
+    def _read(self):
+        """
+        Append the next chunk of the response to the buffer. Returns False at
+        the end of the response.
+        """
+        if self.eof:
+            return False
+        # discard the part of the buffer that has been decoded
+        start = self.position
+        self.buffer = self.buffer[start:]
+        self.position = 0
+        try:
+            chunk = next(self.chunks)
+        except StopIteration:
+            self.buffer += self.decoder.decode(b"", final=True)
+            self.eof = True
+            return False
+        self.buffer += self.decoder.decode(chunk)
+        return True
+
+    def _error(self, message):
+        return json.JSONDecodeError(message, self.buffer, self.position)
+
+    def _next_char(self):
+        """
+        Skip whitespace and return the next character, or "" at the end.
+        """
+        while True:
+            while (
+                self.position < len(self.buffer)
+                and self.buffer[self.position] in WHITESPACE
+            ):
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._read():
+                return ""
+
+    def _expect(self, characters):
+        char = self._next_char()
+        if not char or char not in characters:
+            raise self._error(f"Expecting one of {characters!r}")
+        self.position += 1
+        return char
+
+    def _value(self):
+        """
+        Decode the JSON value at the current position.
+        """
+        self._next_char()
+        while True:
+            try:
+                value, end = self.json_decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if not self._read():
+                    raise
+                continue
+            # A number (e.g. "-1." or "12") may continue in the next chunk,
+            # so it is complete only when it is followed by another character.
+            if (
+                isinstance(value, (int, float))
+                and not isinstance(value, bool)
+                and (end == len(self.buffer) or self.buffer[end] in NUMBER)
+                and self._read()
+            ):
+                continue
+            self.position = end
+            return value
+
+    def _parse(self):
+        self._expect("{")
+        if self._next_char() == "}":
+            self.position += 1
+            return
+        while True:
+            key = self._value()
+            if not isinstance(key, str):
+                raise self._error("Expecting property name")
+            self._expect(":")
+            if key == self.key and self._next_char() == "[":
+                self.position += 1
+                if self._next_char() == "]":
+                    self.position += 1
+                else:
+                    while True:
+                        yield self._value()
+                        if self._expect(",]") == "]":
+                            break
+            else:
+                self.fields[key] = self._value()
+            if self._expect(",}") == "}":
+                return
+
+    def peek(self):
+        """
+        Returns True if there is another item, decoding it if necessary.
+        """
+        if not self.peeked:
+            try:
+                self.peeked.append(next(self.items))
+            except StopIteration:
+                self.close()
+                return False
+        return True
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.peek():
+            raise StopIteration
+        return self.peeked.pop()
+
+    def close(self):
+        """
+        Release the connection. Called automatically at the end of the items.
+        """
+        self.response.close()
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+HASH_CHUNK_SIZE = 1024 * 1024  # bytes read at a time to hash a file
+DEFAULT_MEDIA_MAX_AGE = 7 * 24 * 3600  # seconds before a media_id is uploaded again
+
+
+def file_sha256(path, chunk_size=HASH_CHUNK_SIZE):
+    """
+    Returns the SHA-256 hash of the file, which is read in chunks so that
+    large videos are not loaded in memory.
+    """
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as media_file:
+        for chunk in iter(lambda: media_file.read(chunk_size), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class MediaCache:
+    """
+    Persistent cache of the media_id for each uploaded media file, so that
+    a video that is used for many pins is uploaded and processed only once.
+
+    The key is the SHA-256 hash of the content of the file and the account
+    (e.g. the username) that uploaded it, because media may only be used by
+    that account. The account is used instead of the access token, so that
+    entries are still found after the token is refreshed. Each entry has the
+    media_id, its processing status (as returned by the media API), and the
+    time of the upload. Entries that are older than max_age seconds or that
+    failed are not used.
+
+    The cache is saved as JSON in the file at path.
+    """
+
+    def __init__(self, path, max_age=DEFAULT_MEDIA_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r") as cache_file:
+                self.entries = json.load(cache_file)
+        except FileNotFoundError:
+            self.entries = {}
+
+    @classmethod
+    def key(cls, media_path, account):
+        return f"{file_sha256(media_path)}:{account}"
+
+    def get(self, key):
+        """
+        Returns the media_id for the key, or None if it should be uploaded.
+        """
+        with self._lock:
+            entry = self.entries.get(key)
+        if not entry or entry["status"] == "failed":
+            return None
+        if time.time() - entry["uploaded"] > self.max_age:
+            return None
+        return entry["media_id"]
+
+    def put(self, key, media_id, status="registered"):
+        with self._lock:
+            self.entries[key] = {
+                "media_id": media_id,
+                "status": status,
+                "uploaded": time.time(),
+            }
+            self._write()
+
+    def status(self, media_id):
+        """
+        Returns the saved processing status of the media_id, or None.
+        """
+        with self._lock:
+            for entry in self.entries.values():
+                if entry["media_id"] == media_id:
+                    return entry["status"]
+        return None
+
+    def set_status(self, media_id, status):
+        with self._lock:
+            for entry in self.entries.values():
+                if entry["media_id"] == media_id:
+                    entry["status"] = status
+            self._write()
+
+    def _write(self):
+        # replace the file atomically so that a crash does not corrupt the cache
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w") as cache_file:
+            json.dump(self.entries, cache_file, indent=2)
+        os.replace(temporary_path, self.path)
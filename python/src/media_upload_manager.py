@@ -0,0 +1,180 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+DEFAULT_UPLOAD_CONCURRENCY = 4  # number of files uploaded at the same time
+MEDIA_LIST_SCAN = 250  # number of recent uploads checked with one list request
+MIN_POLL_DELAY = 1.0  # seconds
+MAX_POLL_DELAY = 10.0  # seconds
+
+
+class MediaUploadManager:
+    """
+    Uploads many media files at the same time and waits for all of them to
+    be processed. For example:
+       with pin.media_upload_manager() as manager:
+           futures = [manager.upload(path) for path in video_paths]
+           media_ids = [future.result() for future in futures]
+
+    Each file is uploaded by a pool of concurrency threads, with the
+    upload_media method of the ApiMediaObject (e.g. Pin). The processing
+    status of all of the pending media_ids is checked by a single polling
+    thread, which lists the recent uploads with the media list endpoint
+    and only requests the status of the media that are not in the list.
+    The polling delay is shared by all of the media: it doubles (up to
+    MAX_POLL_DELAY) while no upload changes status, and goes back to
+    MIN_POLL_DELAY when any upload makes progress.
+
+    upload returns a Future that completes with the media_id when the
+    status is succeeded, or with a RuntimeError when the status is failed.
+    The same Future is returned when the same media is uploaded again, so
+    the uploads can be started before the media are used (e.g. by
+    Pin.create with the uploads argument).
+    """
+
+    def __init__(
+        self,
+        api_media_object,
+        concurrency=DEFAULT_UPLOAD_CONCURRENCY,
+        min_delay=MIN_POLL_DELAY,
+        max_delay=MAX_POLL_DELAY,
+    ):
+        self.api_media_object = api_media_object
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.delay = min_delay
+        self.pending = {}  # media_id -> (Future, last status)
+        self.futures = {}  # media -> Future
+        self.executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="media-upload"
+        )
+        self.stopped = threading.Event()
+        self.changed = threading.Condition()  # notified when media are added
+        self.poller = threading.Thread(
+            target=self._poll, name="media-poll", daemon=True
+        )
+        self.poller.start()
+
+    def upload(self, media):
+        """
+        Upload the media (a file path, or an existing media_id, as accepted by
+        media_to_media_id) and returns a Future for the processed media_id.
+        """
+        with self.changed:
+            if media in self.futures:
+                return self.futures[media]
+            future = Future()
+            self.futures[media] = future
+
+        def run():
+            try:
+                media_id = self.api_media_object.media_to_media_id(media)
+            except Exception as error:
+                future.set_exception(error)
+                return
+            media_cache = self.api_media_object.media_cache
+            if media_cache and media_cache.status(media_id) == "succeeded":
+                future.set_result(media_id)
+                return
+            with self.changed:
+                self.pending[media_id] = (future, None)
+                self.delay = self.min_delay
+                self.changed.notify()
+
+        self.executor.submit(run)
+        return future
+
+    def _media_statuses(self, media_ids):
+        """
+        Returns the status of each of the media_ids.
+        """
+        statuses = {}
+        remaining = set(media_ids)
+        media_list = self.api_media_object.get_iterator("/v5/media", {"page_size": 100})
+        try:
+            for index, media_data in enumerate(media_list):
+                if media_data.get("media_id") in remaining:
+                    statuses[media_data["media_id"]] = media_data.get("status")
+                    remaining.discard(media_data["media_id"])
+                if not remaining or index + 1 >= MEDIA_LIST_SCAN:
+                    break
+        finally:
+            media_list.close()
+        for media_id in remaining:  # not one of the recent uploads
+            media_data = self.api_media_object.request_data(f"/v5/media/{media_id}")
+            statuses[media_id] = media_data.get("status")
+        return statuses
+
+    def _poll(self):
+        while not self.stopped.is_set():
+            with self.changed:
+                while not self.pending and not self.stopped.is_set():
+                    self.changed.wait()
+                media_ids = list(self.pending)
+            if self.stopped.is_set():
+                return
+
+            try:
+                statuses = self._media_statuses(media_ids)
+            except Exception as error:  # fail all of the pending uploads
+                with self.changed:
+                    for media_id in media_ids:
+                        future, _ = self.pending.pop(media_id)
+                        future.set_exception(error)
+                continue
+
+            if self._update(statuses):
+                self.stopped.wait(self.delay)
+
+    def _update(self, statuses):
+        """
+        Complete the futures of the media that have been processed and adjust
+        the polling delay. Returns True when some media are still pending.
+        """
+        progress = False
+        with self.changed:
+            for media_id, status in statuses.items():
+                future, last_status = self.pending[media_id]
+                progress = progress or status != last_status
+                if status in ["succeeded", "failed"]:
+                    del self.pending[media_id]
+                    self._finish(media_id, status, future)
+                elif not status:
+                    del self.pending[media_id]
+                    error = RuntimeError(f"media upload {media_id} not found")
+                    future.set_exception(error)
+                else:
+                    self.pending[media_id] = (future, status)
+            if progress:
+                self.delay = self.min_delay
+            else:
+                self.delay = min(2 * self.delay, self.max_delay)
+            return bool(self.pending)
+
+    def _finish(self, media_id, status, future):
+        media_cache = self.api_media_object.media_cache
+        if media_cache:
+            media_cache.set_status(media_id, status)
+        if status == "succeeded":
+            future.set_result(media_id)
+        else:
+            future.set_exception(RuntimeError(f"media upload {media_id} failed"))
+
+    def close(self):
+        """
+        Wait for the uploads to finish and stop polling. The futures of media
+        that are still being processed are cancelled.
+        """
+        self.executor.shutdown()
+        with self.changed:
+            self.stopped.set()
+            self.changed.notify()
+        self.poller.join()
+        for future, _ in self.pending.values():
+            future.cancel()
+        self.pending = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,104 @@
+import mmap
+import os
+import time
+import uuid
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # bytes sent at a time
+
+
+class MultipartStream:
+    """
+    A multipart/form-data request body with form fields followed by a file,
+    which is sent in chunks of chunk_size bytes without reading the whole
+    file into memory. For example:
+        with MultipartStream(file_path, post_data) as stream:
+            session.post(url, data=stream, headers=stream.headers())
+
+    The file is memory-mapped, so each chunk is read from the page cache and
+    the memory used by an upload does not depend on the size of the file.
+
+    requests sends the body by iterating over the stream, with the length
+    returned by len(). Each iteration starts again at the beginning of the
+    body, so the same stream can be sent again after a failure.
+
+    progress is called after each chunk with the number of bytes sent and
+    the total number of bytes. throughput returns the bytes per second of
+    the last (or current) iteration.
+    """
+
+    def __init__(
+        self,
+        file_path,
+        fields=None,
+        file_field="file",
+        chunk_size=UPLOAD_CHUNK_SIZE,
+        progress=None,
+    ):
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.boundary = uuid.uuid4().hex
+        self.head = b""
+        for name, value in (fields or {}).items():
+            self.head += self._part_header(name) + f"{value}\r\n".encode("utf-8")
+        self.head += self._part_header(file_field)
+        self.tail = f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+
+        self.file_object = open(file_path, "rb")
+        self.file_size = os.fstat(self.file_object.fileno()).st_size
+        self.mmap = None
+        if self.file_size:  # an empty file can not be mapped
+            self.mmap = mmap.mmap(self.file_object.fileno(), 0, access=mmap.ACCESS_READ)
+        self.bytes_sent = 0
+        self.start_time = None
+        self.end_time = None
+
+    def _part_header(self, name):
+        return (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+        ).encode("utf-8")
+
+    def headers(self):
+        return {"Content-Type": f"multipart/form-data; boundary={self.boundary}"}
+
+    def __len__(self):
+        return len(self.head) + self.file_size + len(self.tail)
+
+    def _chunks(self):
+        yield self.head
+        for start in range(0, self.file_size, self.chunk_size):
+            end = min(start + self.chunk_size, self.file_size)
+            yield self.mmap[start:end]
+        yield self.tail
+
+    def __iter__(self):
+        self.bytes_sent = 0
+        self.start_time = time.monotonic()
+        self.end_time = None
+        for chunk in self._chunks():
+            yield chunk
+            # the chunk has been sent when the next chunk is requested
+            self.bytes_sent += len(chunk)
+            if self.progress:
+                self.progress(self.bytes_sent, len(self))
+        self.end_time = time.monotonic()
+
+    def throughput(self):
+        """
+        Returns the number of bytes sent per second.
+        """
+        if self.start_time is None:
+            return 0.0
+        elapsed = (self.end_time or time.monotonic()) - self.start_time
+        return self.bytes_sent / elapsed if elapsed > 0 else 0.0
+
+    def close(self):
+        if self.mmap:
+            self.mmap.close()
+        self.file_object.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
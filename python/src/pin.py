@@ -47,13 +47,14 @@ class Pin(ApiMediaObject):
         return url
 
     # https://developers.pinterest.com/docs/api/v5/pins-create/
-    def create(self, pin_data, board_id, section=None, media=None):
+    def create(self, pin_data, board_id, section=None, media=None, uploads=None):
         """
         Create a pin from a pin_data structure that is returned by GET.
         Use the board_id and (optional) section arguments to indicate
         where the pin should be created. Use the media argument (either
         a media identifier or the file name of a video file) to create
-        a Video Pin.
+        a Video Pin. When uploads (a MediaUploadManager) is specified,
+        it is used to upload the media and to wait for its processing.
         """
         OPTIONAL_ATTRIBUTES = {
             "link": 2048,
@@ -66,11 +67,15 @@ class Pin(ApiMediaObject):
         }
 
         # https://developers.pinterest.com/docs/api-features/creating-boards-and-pins/#creating-video-pins
-        media_id = self.media_to_media_id(media)
+        if uploads and media:
+            media_id = uploads.upload(media).result()
+        else:
+            media_id = self.media_to_media_id(media)
+            if media_id:
+                self.check_media_id(media_id)
 
         image_url = self.max_resolution_image_url(pin_data)
         if media_id:
-            self.check_media_id(media_id)
             create_data["media_source"] = {
                 "source_type": "video_id",
                 "cover_image_url": image_url,
@@ -111,12 +116,16 @@ class Pin(ApiMediaObject):
         """
         Poll for the status of the media until it is complete.
         """
+        if self.media_cache and self.media_cache.status(media_id) == "succeeded":
+            return
         self.reset_backoff()
         while True:
             media_response = self.request_data(f"/v5/media/{media_id}")
             status = media_response.get("status")
             if not status:
                 raise RuntimeError(f"media upload {media_id} not found")
+            if status in ["succeeded", "failed"] and self.media_cache:
+                self.media_cache.set_status(media_id, status)
             if status == "succeeded":
                 return
             if status == "failed":
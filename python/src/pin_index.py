@@ -0,0 +1,52 @@
+import posixpath
+from urllib.parse import urlparse
+
+
+def pin_fingerprint(pin_data):
+    """
+    Returns a fingerprint of the link, title, and image of the pin, which is
+    the same for a pin and its copies.
+
+    Pinterest serves each image at URLs that differ only in a size directory
+    (e.g. /150x150/ or /originals/) and names the file after the content of
+    the image, so the image is identified by the file name of the largest
+    image, which does not depend on the host or the size.
+    """
+    image_name = None
+    images = (pin_data.get("media") or {}).get("images")
+    if images:
+        largest = max(
+            images.values(), key=lambda image: max(image["width"], image["height"])
+        )
+        image_name = posixpath.basename(urlparse(largest["url"]).path)
+    return (pin_data.get("link") or "", pin_data.get("title") or "", image_name)
+
+
+class PinIndex:
+    """
+    Index of the pins on a board by fingerprint, which is used to skip
+    copying pins that are already on the target board. The index is built
+    with one paged scan of the pins of the board (including the pins in
+    sections).
+    """
+
+    def __init__(self, pins=()):
+        self.pin_ids = {}  # fingerprint -> pin identifier
+        for pin_data in pins:
+            self.add(pin_data)
+
+    @classmethod
+    def from_board(cls, board):
+        return cls(board.get_pins())
+
+    def add(self, pin_data):
+        self.pin_ids.setdefault(pin_fingerprint(pin_data), pin_data["id"])
+
+    def get(self, pin_data):
+        """
+        Returns the identifier of a pin with the same fingerprint, or None.
+        """
+        return self.pin_ids.get(pin_fingerprint(pin_data))
+
+    def __len__(self):
+        return len(self.pin_ids)
@@ -0,0 +1,198 @@
+import hashlib
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+# Pinterest enforces rate limits separately for each user/application and for
+# each category of endpoint. The budgets below (requests per minute) are
+# conservative defaults. Each budget is adjusted with the x-ratelimit-* headers
+# of the responses, and the defaults may be overridden with the
+# PINTEREST_RATE_LIMITS environment variable. For example:
+#   PINTEREST_RATE_LIMITS="pins_write=60,ads_analytics=100"
+DEFAULT_RATE_LIMITS = {
+    "ads_analytics": 300,
+    "ads_read": 1000,
+    "ads_write": 300,
+    "boards_read": 1000,
+    "boards_write": 300,
+    "org_analytics": 300,
+    "org_read": 1000,
+    "org_write": 300,
+    "pins_read": 1000,
+    "pins_write": 300,
+}
+DEFAULT_WINDOW = 60  # seconds, for the budgets and for x-ratelimit-limit
+
+# (regular expression for the path, category prefix) in order of precedence.
+# The suffix of the category is _read for GET requests and _write otherwise.
+ENDPOINT_CATEGORIES = [
+    (re.compile(r"^/v5/ad_accounts/[^/]+/(.*/)?(analytics|reports)"), "ads_analytics"),
+    (re.compile(r"^/v5/ad_accounts"), "ads"),
+    (re.compile(r"^/v5/(user_account|pins/[^/]+)/analytics"), "org_analytics"),
+    (re.compile(r"^/v5/(pins|media)"), "pins"),
+    (re.compile(r"^/v5/boards"), "boards"),
+]
+
+
+def endpoint_category(method, url):
+    """
+    Returns the rate limit category for a request.
+    """
+    path = urlparse(url).path
+    for regex, category in ENDPOINT_CATEGORIES:
+        if regex.match(path):
+            break
+    else:
+        category = "org"
+    if category.endswith("_analytics"):
+        return category
+    return category + ("_read" if method.upper() == "GET" else "_write")
+
+
+def parse_rate_limits(value):
+    """
+    Parse a string like "pins_write=60,ads_analytics=100" into a dict
+    of requests per minute.
+    """
+    rate_limits = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        category, _, limit = item.partition("=")
+        try:
+            limit = float(limit)
+        except ValueError:
+            raise ValueError(f"invalid rate limit: {item}") from None
+        if not limit > 0:
+            raise ValueError(f"rate limit must be positive: {item}")
+        rate_limits[category.strip()] = limit
+    return rate_limits
+
+
+class TokenBucket:
+    """
+    Token bucket that allows bursts of up to capacity requests, refilled
+    at rate tokens per second. The bucket may be shared by threads.
+    """
+
+    def __init__(self, capacity, rate):
+        if not rate > 0:
+            raise ValueError(f"rate must be positive: {rate}")
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0  # set when the server says the budget is exhausted
+        self.wait_time = 0.0  # total time spent waiting for tokens
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """
+        Wait until a token is available, then take it. Returns the number
+        of seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                # allow for rounding errors in the refill computation
+                if now >= self.blocked_until and self.tokens >= 1 - 1e-9:
+                    self.tokens -= 1
+                    self.wait_time += waited
+                    return waited
+                delay = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(delay)
+            waited += delay
+
+    def update(self, limit=None, remaining=None, reset=None, window=DEFAULT_WINDOW):
+        """
+        Adjust the bucket to the budget reported by the server: limit requests
+        per window seconds, of which remaining requests are left for the next
+        reset seconds.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if limit:
+                self.capacity = limit
+                self.rate = limit / window
+            if remaining is not None:
+                self.tokens = min(self.tokens, remaining)
+                if remaining <= 0 and reset:
+                    self.blocked_until = now + reset
+
+
+class RateLimiter:
+    """
+    Paces requests so that they stay within a budget for each access token
+    and each endpoint category. Buckets are created as needed, and are shared
+    by all of the threads (and coroutines, which use threads via
+    AsyncApiObject) that send requests with the same HttpSession.
+    """
+
+    def __init__(self, rate_limits=None, window=DEFAULT_WINDOW):
+        self.rate_limits = dict(DEFAULT_RATE_LIMITS)
+        self.rate_limits.update(rate_limits or {})
+        self.window = window
+        self.buckets = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def token_key(cls, headers):
+        """
+        Returns a key for the access token in the Authorization header, which
+        does not reveal the credential. Requests without authorization (e.g.
+        uploads to S3) are not limited.
+        """
+        authorization = headers.get("Authorization") if headers else None
+        if not authorization:
+            return None
+        return hashlib.sha256(authorization.encode()).hexdigest()
+
+    def bucket(self, headers, method, url):
+        """
+        Returns the bucket for the request, or None if the request is not limited.
+        """
+        token_key = self.token_key(headers)
+        if not token_key:
+            return None
+        category = endpoint_category(method, url)
+        key = (token_key, category)
+        with self._lock:
+            bucket = self.buckets.get(key)
+            if not bucket:
+                limit = self.rate_limits.get(category, self.rate_limits["org_read"])
+                bucket = TokenBucket(limit, limit / self.window)
+                self.buckets[key] = bucket
+            return bucket
+
+    @classmethod
+    def _header_number(cls, headers, name):
+        """
+        Parse the first number in a header like "100" or "100, 100;w=60".
+        """
+        match = re.match(r"\s*([0-9.]+)", headers.get(name) or "")
+        return float(match.group(1)) if match else None
+
+    def update(self, bucket, response):
+        """
+        Adjust the bucket with the x-ratelimit-* headers of the response.
+        """
+        headers = response.headers
+        limit = self._header_number(headers, "x-ratelimit-limit")
+        remaining = self._header_number(headers, "x-ratelimit-remaining")
+        reset = self._header_number(headers, "x-ratelimit-reset")
+        if reset and reset > 1e9:  # a UNIX timestamp instead of seconds
+            reset = max(reset - time.time(), 0.0)
+        window = re.search(r"w=([0-9]+)", headers.get("x-ratelimit-limit") or "")
+        window = float(window.group(1)) if window else self.window
+        if response.status_code == 429 and remaining is None:
+            remaining = 0
+        if limit or remaining is not None:
+            bucket.update(limit, remaining, reset, window)
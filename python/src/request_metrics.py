@@ -0,0 +1,254 @@
+import atexit
+import json
+import math
+import re
+import threading
+from urllib.parse import urlparse
+
+# Quantiles reported in the summaries.
+QUANTILES = [0.5, 0.9, 0.99]
+
+
+def path_template(url):
+    """
+    Returns the path of the URL with identifiers replaced by {id}, so that
+    requests for different pins, boards, or ad accounts are aggregated by
+    endpoint. For example, /v5/boards/12345/pins becomes /v5/boards/{id}/pins.
+    Pinterest identifiers are numeric, so segments with digits are replaced.
+    """
+    path = urlparse(url).path or "/"
+    return "/".join(
+        "{id}" if re.search(r"\d", segment) and segment != "v5" else segment
+        for segment in path.split("/")
+    )
+
+
+class LatencyHistogram:
+    """
+    Latency histogram in the style of HdrHistogram: values are counted in
+    buckets that keep significant_figures digits of precision, so that the
+    memory used does not depend on the number of values and the quantiles
+    are accurate to within a few percent over any range of latencies.
+    """
+
+    def __init__(self, significant_figures=2):
+        self.significant_figures = significant_figures
+        self.buckets = {}  # bucket lower bound in microseconds -> count
+        self.count = 0
+        self.total = 0.0  # seconds
+        self.min = None
+        self.max = None
+
+    def _bucket(self, microseconds):
+        if microseconds < 1:
+            return 0, 1
+        digits = int(math.log10(microseconds)) + 1
+        unit = 10 ** max(digits - self.significant_figures, 0)
+        return microseconds // unit * unit, unit
+
+    def record(self, seconds):
+        lower, _ = self._bucket(int(seconds * 1e6))
+        self.buckets[lower] = self.buckets.get(lower, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def quantile(self, q):
+        """
+        Returns the value (in seconds) below which the fraction q of the
+        recorded values fall, or None if no values have been recorded.
+        """
+        if not self.count:
+            return None
+        rank = max(math.ceil(q * self.count), 1)
+        seen = 0
+        for lower in sorted(self.buckets):
+            seen += self.buckets[lower]
+            if seen >= rank:
+                _, unit = self._bucket(lower)
+                return min((lower + unit) / 1e6, self.max)
+        return self.max
+
+    def summary(self):
+        summary = {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min,
+            "max": self.max,
+        }
+        for q in QUANTILES:
+            summary[f"p{int(q * 100)}"] = self.quantile(q)
+        return summary
+
+
+class EndpointMetrics:
+    """
+    Counters and latency histograms for one method and path template.
+    """
+
+    def __init__(self):
+        self.statuses = {}  # status code (or "error") -> count
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.total = LatencyHistogram()
+        self.ttfb = LatencyHistogram()
+        self.slowest = None  # (seconds, x-pinterest-rid) of the slowest request
+
+    def summary(self):
+        summary = {
+            "requests": sum(self.statuses.values()),
+            "statuses": {str(status): n for status, n in self.statuses.items()},
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "retries": self.retries,
+            "cache_hits": self.cache_hits,
+            "total_seconds": self.total.summary(),
+            "ttfb_seconds": self.ttfb.summary(),
+        }
+        if self.slowest:
+            summary["slowest_seconds"], summary["slowest_rid"] = self.slowest
+        return summary
+
+
+class RequestMetrics:
+    """
+    Collects latency and throughput metrics for every request sent by an
+    HttpSession, aggregated by method and path template.
+
+    For each request, the metrics include the status, the bytes sent and
+    received, the time to the first byte (the time until the response headers
+    were parsed, as measured by requests), the total time including retries
+    and rate limit waits, the number of retries, and the x-pinterest-rid of
+    the slowest request for each endpoint. requests does not report the time
+    spent on DNS resolution and on connecting, so those are part of the time
+    to the first byte.
+
+    The metrics can be written as a JSON summary or in the Prometheus text
+    format with write(), and write_at_exit() does that when the process exits.
+    """
+
+    def __init__(self):
+        self.endpoints = {}  # (method, path template) -> EndpointMetrics
+        self._lock = threading.Lock()
+
+    def _endpoint(self, method, url):
+        key = (method.upper(), path_template(url))
+        endpoint = self.endpoints.get(key)
+        if not endpoint:
+            endpoint = self.endpoints[key] = EndpointMetrics()
+        return endpoint
+
+    @classmethod
+    def _body_size(cls, request):
+        body = getattr(request, "body", None)
+        if body is None:
+            return 0
+        if isinstance(body, (bytes, str)):
+            return len(body)
+        try:
+            return int(request.headers.get("Content-Length") or 0)
+        except ValueError:
+            return 0
+
+    @classmethod
+    def _content_size(cls, response):
+        if response._content_consumed and isinstance(response._content, bytes):
+            return len(response._content)
+        try:
+            return int(response.headers.get("Content-Length") or 0)
+        except ValueError:  # e.g. a streamed response that has not been read
+            return 0
+
+    def record(self, method, url, response, seconds):
+        """
+        Record a request that returned the response after the given number
+        of seconds. The response is None when the request raised an exception.
+        """
+        with self._lock:
+            endpoint = self._endpoint(method, url)
+            if response is None:
+                endpoint.statuses["error"] = endpoint.statuses.get("error", 0) + 1
+                endpoint.total.record(seconds)
+                return
+            status = response.status_code
+            endpoint.statuses[status] = endpoint.statuses.get(status, 0) + 1
+            endpoint.total.record(seconds)
+            if getattr(response, "from_cache", False):
+                endpoint.cache_hits += 1
+                return
+            endpoint.ttfb.record(response.elapsed.total_seconds())
+            endpoint.bytes_in += self._content_size(response)
+            endpoint.bytes_out += self._body_size(response.request)
+            endpoint.retries += getattr(response, "retries", 0)
+            if not endpoint.slowest or seconds > endpoint.slowest[0]:
+                endpoint.slowest = (seconds, response.headers.get("x-pinterest-rid"))
+
+    def summary(self):
+        """
+        Returns the metrics as a list of dicts, one for each endpoint.
+        """
+        with self._lock:
+            return [
+                dict(method=method, path=path, **endpoint.summary())
+                for (method, path), endpoint in sorted(self.endpoints.items())
+            ]
+
+    def prometheus(self):
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        lines = [
+            "# TYPE pinterest_api_requests_total counter",
+            "# TYPE pinterest_api_request_bytes_total counter",
+            "# TYPE pinterest_api_response_bytes_total counter",
+            "# TYPE pinterest_api_retries_total counter",
+            "# TYPE pinterest_api_cache_hits_total counter",
+            "# TYPE pinterest_api_request_duration_seconds summary",
+            "# TYPE pinterest_api_time_to_first_byte_seconds summary",
+        ]
+        for endpoint in self.summary():
+            labels = f'method="{endpoint["method"]}",path="{endpoint["path"]}"'
+            for status, count in endpoint["statuses"].items():
+                status_labels = f'{labels},status="{status}"'
+                lines.append(f"pinterest_api_requests_total{{{status_labels}}} {count}")
+            for name, key in [
+                ("request_bytes_total", "bytes_out"),
+                ("response_bytes_total", "bytes_in"),
+                ("retries_total", "retries"),
+                ("cache_hits_total", "cache_hits"),
+            ]:
+                lines.append(f"pinterest_api_{name}{{{labels}}} {endpoint[key]}")
+            for name, key in [
+                ("request_duration_seconds", "total_seconds"),
+                ("time_to_first_byte_seconds", "ttfb_seconds"),
+            ]:
+                histogram = endpoint[key]
+                for q in QUANTILES:
+                    value = histogram[f"p{int(q * 100)}"]
+                    if value is not None:
+                        lines.append(
+                            f'pinterest_api_{name}{{{labels},quantile="{q}"}} {value}'
+                        )
+                for suffix in ["sum", "count"]:
+                    lines.append(
+                        f"pinterest_api_{name}_{suffix}{{{labels}}} {histogram[suffix]}"
+                    )
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """
+        Write the metrics to the file. The format is JSON when the name of the
+        file ends with .json, and the Prometheus text format otherwise.
+        """
+        with open(path, "w") as metrics_file:
+            if path.endswith(".json"):
+                json.dump(self.summary(), metrics_file, indent=2)
+                metrics_file.write("\n")
+            else:
+                metrics_file.write(self.prometheus())
+
+    def write_at_exit(self, path):
+        atexit.register(self.write, path)
@@ -0,0 +1,225 @@
+import base64
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+# Time to live (in seconds) of cached responses for each endpoint. Responses
+# for endpoints that are not in this list are not cached.
+DEFAULT_CACHE_TTLS = [
+    (r"^/v5/user_account$", 3600),
+    (r"^/v5/resources/delivery_metrics$", 24 * 3600),
+    (r"^/v5/boards/[^/]+$", 600),
+    (r"^/v5/boards/[^/]+/sections$", 600),
+    (r"^/v5/ad_accounts$", 3600),
+    (r"^/v5/ad_accounts/[^/]+/(campaigns|ad_groups|ads)$", 600),
+    (r"/analytics$", 900),
+]
+DEFAULT_CACHE_MAX_BYTES = 100 * 1024 * 1024
+
+
+class CacheEntry:
+    """
+    A response saved in the cache.
+    """
+
+    def __init__(self, data):
+        self.data = data
+
+    def age(self):
+        return time.time() - self.data["stored"]
+
+    def etag(self):
+        return self.data["headers"].get("ETag") or self.data["headers"].get("etag")
+
+    def response(self, url):
+        """
+        Create a requests.Response with the saved data.
+        """
+        response = requests.Response()
+        response.url = url
+        response.status_code = self.data["status_code"]
+        response.reason = self.data["reason"]
+        response.headers = requests.structures.CaseInsensitiveDict(self.data["headers"])
+        response._content = base64.b64decode(self.data["content"])
+        response.encoding = self.data.get("encoding")
+        response.from_cache = True
+        return response
+
+
+class ResponseCache:
+    """
+    Disk-backed cache for the responses to GET requests.
+
+    Responses are saved in the directory, in files named with a hash of the
+    URL and of the Authorization header, so that responses for different
+    access tokens are kept separate and no credentials are saved.
+
+    Each endpoint has a time to live (see DEFAULT_CACHE_TTLS). Fresh responses
+    are returned without sending a request. When a response has expired, the
+    request is sent with If-None-Match, so that a 304 Not Modified response
+    from the server can refresh the cached response. With
+    stale_while_revalidate, an expired response is returned immediately and
+    the request is sent in the background to refresh the cache.
+
+    A request that is not a GET (e.g. a POST that creates a board section)
+    invalidates the cached responses for the same path, for the paths below
+    it, and for the paths above it (e.g. the list of sections).
+
+    When the cache exceeds max_bytes, the least recently used responses
+    are removed. The directory is scanned once, and the size of the cache
+    is then tracked in memory, so responses saved by other processes that
+    share the directory are counted the next time the cache is created.
+    """
+
+    def __init__(
+        self,
+        directory,
+        max_bytes=DEFAULT_CACHE_MAX_BYTES,
+        ttls=DEFAULT_CACHE_TTLS,
+        stale_while_revalidate=False,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in ttls]
+        self.stale_while_revalidate = stale_while_revalidate
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        # file path -> [modification time, size, URL (None until it is read)]
+        self._files = {}
+        self._total_bytes = 0
+        for entry in os.scandir(directory):
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                self._files[entry.path] = [stat.st_mtime, stat.st_size, None]
+                self._total_bytes += stat.st_size
+
+    def ttl(self, url):
+        """
+        Returns the time to live for the URL, or None if it should not be cached.
+        """
+        path = urlparse(url).path
+        for regex, ttl in self.ttls:
+            if regex.search(path):
+                return ttl
+        return None
+
+    def _path(self, url, headers):
+        authorization = (headers or {}).get("Authorization") or ""
+        hashed_token = hashlib.sha256(authorization.encode()).hexdigest()
+        key = hashlib.sha256(f"{url}\n{hashed_token}".encode()).hexdigest()
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, url, headers):
+        """
+        Returns the CacheEntry for the request, or None.
+        """
+        path = self._path(url, headers)
+        try:
+            with open(path, "r") as cache_file:
+                data = json.load(cache_file)
+            self._touch(path)
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(data)
+
+    def put(self, url, headers, response):
+        """
+        Save the response to the request.
+        """
+        data = {
+            "url": url,
+            "stored": time.time(),
+            "status_code": response.status_code,
+            "reason": response.reason,
+            "headers": dict(response.headers),
+            "encoding": response.encoding,
+            "content": base64.b64encode(response.content).decode("ascii"),
+        }
+        self._write(self._path(url, headers), data)
+        if self._total_bytes > self.max_bytes:
+            self.evict()
+
+    def refresh(self, url, headers, entry):
+        """
+        Reset the age of the entry after the server says it has not changed.
+        """
+        entry.data["stored"] = time.time()
+        self._write(self._path(url, headers), entry.data)
+
+    def _write(self, path, data):
+        temporary_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temporary_path, "w") as cache_file:
+            json.dump(data, cache_file)
+        size = os.path.getsize(temporary_path)
+        os.replace(temporary_path, path)
+        with self._lock:
+            previous = self._files.get(path)
+            self._total_bytes += size - (previous[1] if previous else 0)
+            self._files[path] = [0, size, data["url"]]
+        self._touch(path)
+
+    def _touch(self, path):
+        # The modification time is used for LRU eviction. It is set explicitly
+        # because file systems record the current time with a coarse clock.
+        now = time.time_ns()
+        os.utime(path, ns=(now, now))
+        with self._lock:
+            if path in self._files:
+                self._files[path][0] = now / 1e9
+
+    def _remove(self, path):
+        # called with the lock held
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        _, size, _ = self._files.pop(path)
+        self._total_bytes -= size
+
+    def invalidate(self, url):
+        """
+        Remove the responses for the URL of a request that modifies a
+        resource: the responses for the same path, for the paths below it,
+        and for the paths above it.
+        """
+        parsed = urlparse(url)
+        path = parsed.path.rstrip("/")
+        with self._lock:
+            for file_path, (_, _, cached_url) in list(self._files.items()):
+                if cached_url is None:  # saved by an earlier process
+                    try:
+                        with open(file_path, "r") as cache_file:
+                            cached_url = json.load(cache_file)["url"]
+                    except (OSError, ValueError, KeyError):
+                        self._remove(file_path)
+                        continue
+                    self._files[file_path][2] = cached_url
+                cached = urlparse(cached_url)
+                if cached.netloc != parsed.netloc:
+                    continue
+                cached_path = cached.path.rstrip("/")
+                if (
+                    cached_path == path
+                    or cached_path.startswith(path + "/")
+                    or path.startswith(cached_path + "/")
+                ):
+                    self._remove(file_path)
+
+    def evict(self):
+        """
+        Remove the least recently used responses until the cache fits in max_bytes.
+        """
+        with self._lock:
+            entries = sorted(
+                (mtime, path) for path, (mtime, _, _) in self._files.items()
+            )
+            for _, path in entries:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                self._remove(path)
@@ -0,0 +1,126 @@
+import datetime
+import email.utils
+import random
+import time
+
+# Defaults for the retry policy used by the HttpSession. These values can be
+# changed for an ApiConfig with environment variables.
+DEFAULT_MAX_RETRIES = 3  # number of retries after the first attempt
+DEFAULT_RETRY_BACKOFF = 1.0  # initial backoff delay in seconds
+DEFAULT_MAX_BACKOFF = 30.0  # maximum backoff delay in seconds
+DEFAULT_MAX_RETRY_AFTER = 300.0  # give up if the server asks to wait longer
+
+
+class RetryPolicy:
+    """
+    Decides whether an HTTP request should be retried, and how long to wait
+    before the retry.
+
+    Requests are retried when the response status is 429 (Too Many Requests)
+    or a temporary server error (5xx), or when the connection fails. When the
+    server specifies when to retry with the Retry-After header or with the
+    x-ratelimit-reset header, that delay is used. Otherwise, the delay is
+    determined by exponential backoff with full jitter, which prevents
+    concurrent clients from retrying at the same time.
+
+    Some requests are never retried:
+      * 429 responses caused by spam, which raise SpamException.
+      * Requests with methods that are not idempotent (e.g. POST), unless
+        the caller explicitly marks the request as safe to retry.
+    """
+
+    RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+    IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+    def __init__(
+        self,
+        max_retries=DEFAULT_MAX_RETRIES,
+        backoff=DEFAULT_RETRY_BACKOFF,
+        max_backoff=DEFAULT_MAX_BACKOFF,
+        max_retry_after=DEFAULT_MAX_RETRY_AFTER,
+    ):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+
+    def can_retry(self, method, retries, retry_safe=False):
+        """
+        Check whether another attempt is allowed for this request.
+        """
+        if retries >= self.max_retries:
+            return False
+        return retry_safe or method.upper() in self.IDEMPOTENT_METHODS
+
+    @classmethod
+    def is_spam(cls, response):
+        """
+        A 429 response is caused by spam when the message says so.
+        See ApiCommon.unpack, which raises SpamException in this case.
+        """
+        try:
+            unpacked = response.json()
+            detail = unpacked.get("message_detail") or unpacked.get("message")
+        except Exception:
+            return False
+        return bool(detail) and "spam" in detail.lower()
+
+    def should_retry(self, method, response, retries, retry_safe=False):
+        """
+        Check whether the request that returned the response should be retried.
+        """
+        if response.status_code not in self.RETRY_STATUS_CODES:
+            return False
+        if not self.can_retry(method, retries, retry_safe):
+            return False
+        if response.status_code == 429 and self.is_spam(response):
+            return False
+        return True
+
+    @classmethod
+    def server_delay(cls, response):
+        """
+        Returns the number of seconds that the server asked the client to wait,
+        or None if the response does not specify the delay.
+        """
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return max(float(retry_after), 0.0)
+            except ValueError:
+                pass
+            try:  # Retry-After may also be an HTTP date
+                retry_date = email.utils.parsedate_to_datetime(retry_after)
+                now = datetime.datetime.now(datetime.timezone.utc)
+                return max((retry_date - now).total_seconds(), 0.0)
+            except (TypeError, ValueError):
+                pass
+
+        reset = response.headers.get("x-ratelimit-reset")
+        if reset:
+            try:
+                reset = float(reset)
+            except ValueError:
+                return None
+            # the reset may be a number of seconds or a UNIX timestamp
+            if reset > 1e9:
+                reset -= time.time()
+            return max(reset, 0.0)
+
+        return None
+
+    def delay(self, response, retries):
+        """
+        Returns the number of seconds to wait before the next attempt, or None
+        if the server asked to wait for longer than max_retry_after seconds.
+        The response is None when the connection failed.
+        """
+        if response is not None:
+            server_delay = self.server_delay(response)
+            if server_delay is not None:
+                if server_delay > self.max_retry_after:
+                    return None
+                return server_delay
+
+        # exponential backoff with full jitter
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**retries))
@@ -23,5 +23,6 @@ class User(ApiObject):
         return self.get_iterator("/v5/boards", query_parameters)
 
     # https://developers.pinterest.com/docs/api/v5/pins-list/
-    def get_pins(self, query_parameters=None):
-        return self.get_iterator("/v5/pins", query_parameters)
+    def get_pins(self, query_parameters=None, checkpoint_path=None):
+        # the checkpoint file saves the position of the iterator (see get_iterator)
+        return self.get_iterator("/v5/pins", query_parameters, checkpoint_path)
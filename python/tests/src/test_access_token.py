@@ -5,6 +5,7 @@ from unittest import mock
 import requests_mock
 
 from access_token import AccessToken
+from http_session import HttpSession
 
 
 class AccessTokenTest(unittest.TestCase):
@@ -99,6 +100,7 @@ class AccessTokenTest(unittest.TestCase):
         mock_api_config.redirect_uri = "test-redirect-uri"
         mock_api_config.oauth_token_dir = "test-token-dir"
         mock_api_config.verbosity = 2
+        mock_api_config.session = HttpSession()
 
         rm.post(
             "https://test-api-uri/v5/oauth/token",
@@ -249,3 +249,291 @@ class AdAnalyticsTest(unittest.TestCase):
             "&view_window_days=60"
         )
         mock_request_data.reset_mock()
+
+    # Verify that analytics for many entities are requested in chunks.
+    @mock.patch("analytics.MAX_ANALYTICS_IDS", 2)
+    @mock.patch("analytics.ApiObject.request_data")
+    @mock.patch("analytics.ApiObject.__init__")
+    def test_adanalytics_entities(self, mock_init, mock_request_data):
+        mock_init.return_value = None
+        analytics = (
+            AdAnalytics("test_api_config", "test_access_token")
+            .date_range("2021-03-01", "2021-03-02")
+            .metrics({"SPEND_IN_DOLLAR"})
+            .granularity("DAY")
+        )
+
+        def request_data(request_uri):
+            ad_ids = request_uri.split("ad_ids=")[1].split("&")[0].split(",")
+            return [
+                {"AD_ID": int(ad_id), "DATE": date, "SPEND_IN_DOLLAR": int(ad_id)}
+                for ad_id in ad_ids
+                for date in ["2021-03-01", "2021-03-02"]
+            ]
+
+        mock_request_data.side_effect = request_data
+        rows = analytics.get_ads("test_ad_account", [1, 2, 3, 4, 5])
+
+        # 3 requests (of at most 2 ads) instead of 5
+        self.assertEqual(3, mock_request_data.call_count)
+        mock_request_data.assert_any_call(
+            "/v5/ad_accounts/test_ad_account/ads/analytics?"
+            "ad_ids=5"
+            "&start_date=2021-03-01&end_date=2021-03-02"
+            "&columns=SPEND_IN_DOLLAR"
+            "&granularity=DAY"
+        )
+        self.assertEqual(10, len(rows))
+        self.assertEqual(
+            {"AD_ID": 3, "DATE": "2021-03-02", "SPEND_IN_DOLLAR": 3},
+            rows[("3", "2021-03-02")],
+        )
+
+        mock_request_data.reset_mock()
+        mock_request_data.side_effect = None
+        mock_request_data.return_value = [
+            {"CAMPAIGN_ID": "1", "SPEND_IN_DOLLAR": 10}  # no DATE for TOTAL
+        ]
+        analytics.granularity("TOTAL")
+        self.assertEqual(
+            {("1", None): {"CAMPAIGN_ID": "1", "SPEND_IN_DOLLAR": 10}},
+            analytics.get_campaigns("test_ad_account", ["1"]),
+        )
+        mock_request_data.assert_called_once_with(
+            "/v5/ad_accounts/test_ad_account/campaigns/analytics?"
+            "campaign_ids=1"
+            "&start_date=2021-03-01&end_date=2021-03-02"
+            "&columns=SPEND_IN_DOLLAR"
+            "&granularity=TOTAL"
+        )
+        self.assertEqual({}, analytics.get_ad_groups("test_ad_account", []))
+
+    # Verify that long date ranges are requested in windows of MAX_DAYS.
+    @mock.patch("analytics.ApiObject.request_data")
+    @mock.patch("analytics.ApiObject.__init__")
+    def test_adanalytics_date_windows(self, mock_init, mock_request_data):
+        mock_init.return_value = None
+        analytics = (
+            AdAnalytics("test_api_config", "test_access_token")
+            .date_range("2021-01-01", "2021-12-31")
+            .metrics({"SPEND_IN_DOLLAR"})
+            .granularity("DAY")
+        )
+        self.assertEqual(
+            [
+                ("2021-01-01", "2021-03-31"),
+                ("2021-04-01", "2021-06-29"),
+                ("2021-06-30", "2021-09-27"),
+                ("2021-09-28", "2021-12-26"),
+                ("2021-12-27", "2021-12-31"),
+            ],
+            analytics.date_windows(),
+        )
+
+        def request_data(request_uri):
+            start = request_uri.split("start_date=")[1][:10]
+            end = request_uri.split("end_date=")[1][:10]
+            rows = [
+                {"AD_ACCOUNT_ID": "1", "DATE": start, "SPEND_IN_DOLLAR": 1},
+                {"AD_ACCOUNT_ID": "1", "DATE": end, "SPEND_IN_DOLLAR": 2},
+            ]
+            if start == "2021-04-01":  # returns a boundary day again
+                rows.insert(0, {"AD_ACCOUNT_ID": "1", "DATE": "2021-03-31"})
+            return rows
+
+        mock_request_data.side_effect = request_data
+        rows = analytics.get_ad_account("1")
+        self.assertEqual(5, mock_request_data.call_count)
+        dates = [row["DATE"] for row in rows]
+        self.assertEqual(sorted(set(dates)), dates)  # in order, without duplicates
+        self.assertEqual(10, len(rows))
+        self.assertEqual(("2021-01-01", "2021-12-31"), (dates[0], dates[-1]))
+
+        # windows can not be merged for other granularities
+        analytics.granularity("TOTAL")
+        with self.assertRaisesRegex(ValueError, "granularity must be DAY or HOUR"):
+            analytics.get_ad_account("1")
+
+    # Verify that WEEK, MONTH, and TOTAL reports can be computed locally.
+    @mock.patch("analytics.ApiObject.request_data")
+    @mock.patch("analytics.ApiObject.__init__")
+    def test_adanalytics_local_rollup(self, mock_init, mock_request_data):
+        mock_init.return_value = None
+        analytics = (
+            AdAnalytics("test_api_config", "test_access_token")
+            .date_range("2021-01-01", "2021-12-31")
+            .metrics({"CTR", "SPEND_IN_DOLLAR"})
+            .granularity("MONTH")
+        )
+        analytics.local_rollup = True
+
+        def request_data(request_uri):
+            start = request_uri.split("start_date=")[1][:10]
+            return [
+                {
+                    "AD_ACCOUNT_ID": "1",
+                    "DATE": start,
+                    "CLICKTHROUGH_1": 1,
+                    "IMPRESSION_1": 10,
+                    "SPEND_IN_DOLLAR": 2,
+                }
+            ]
+
+        mock_request_data.side_effect = request_data
+        rows = analytics.get_ad_account("1")
+        # the daily metrics are requested in windows of MAX_DAYS
+        self.assertEqual(5, mock_request_data.call_count)
+        mock_request_data.assert_any_call(
+            "/v5/ad_accounts/1/analytics?"
+            "start_date=2021-01-01&end_date=2021-03-31"
+            "&columns=CLICKTHROUGH_1,IMPRESSION_1,SPEND_IN_DOLLAR"
+            "&granularity=DAY"
+        )
+        self.assertEqual(
+            ["2021-01-01", "2021-04-01", "2021-06-01", "2021-09-01", "2021-12-01"],
+            [row["DATE"] for row in rows],
+        )
+        self.assertEqual(
+            {
+                "AD_ACCOUNT_ID": "1",
+                "DATE": "2021-01-01",
+                "CTR": 0.1,
+                "SPEND_IN_DOLLAR": 2,
+            },
+            rows[0],
+        )
+        # the attributes of the analytics object are not changed
+        self.assertEqual("MONTH", analytics.attrs["granularity"])
+        self.assertEqual(["CTR", "SPEND_IN_DOLLAR"], analytics.metrics_array())
+
+        mock_request_data.reset_mock()
+        analytics.granularity("TOTAL")
+        self.assertEqual(
+            [{"AD_ACCOUNT_ID": "1", "CTR": 0.1, "SPEND_IN_DOLLAR": 10}],
+            analytics.get_ad_account("1"),
+        )
+        self.assertEqual(5, mock_request_data.call_count)
+
+        analytics.metric("TOTAL_IMPRESSION_FREQUENCY")
+        with self.assertRaisesRegex(ValueError, "can not be computed"):
+            analytics.get_ad_account("1")
+
+
+class OrganicAnalyticsWindowsTest(unittest.TestCase):
+    # Verify that long date ranges of organic analytics are merged.
+    @mock.patch("analytics.ApiObject.request_data")
+    @mock.patch("analytics.ApiObject.__init__")
+    def test_pin_analytics_date_windows(self, mock_init, mock_request_data):
+        mock_init.return_value = None
+        analytics = (
+            PinAnalytics("test_pin_id", "test_api_config", "test_access_token")
+            .date_range("2021-01-01", "2021-04-30")
+            .metrics({"IMPRESSION", "PIN_CLICK", "PIN_CLICK_RATE"})
+        )
+
+        def day(date, impressions, clicks):
+            return {
+                "date": date,
+                "data_status": "READY",
+                "metrics": {
+                    "IMPRESSION": impressions,
+                    "PIN_CLICK": clicks,
+                    "PIN_CLICK_RATE": clicks / impressions,
+                },
+            }
+
+        mock_request_data.side_effect = [
+            {
+                "all": {
+                    "lifetime_metrics": {"IMPRESSION": 1000},
+                    "daily_metrics": [
+                        day("2021-01-01", 10, 1),
+                        day("2021-03-31", 30, 3),
+                    ],
+                    "summary_metrics": {},
+                }
+            },
+            {
+                "all": {
+                    "lifetime_metrics": {"IMPRESSION": 1001},
+                    "daily_metrics": [
+                        day("2021-03-31", 30, 3),
+                        day("2021-04-30", 60, 0),
+                    ],
+                    "summary_metrics": {},
+                }
+            },
+        ]
+        result = analytics.get()
+
+        mock_request_data.assert_any_call(
+            "/v5/pins/test_pin_id/analytics?"
+            "start_date=2021-04-01&end_date=2021-04-30"
+            "&metric_types=IMPRESSION,PIN_CLICK,PIN_CLICK_RATE"
+        )
+        self.assertEqual(
+            ["2021-01-01", "2021-03-31", "2021-04-30"],
+            [day["date"] for day in result["all"]["daily_metrics"]],
+        )
+        self.assertEqual(
+            {"IMPRESSION": 100, "PIN_CLICK": 4, "PIN_CLICK_RATE": 0.04},
+            result["all"]["summary_metrics"],
+        )
+        self.assertEqual({"IMPRESSION": 1001}, result["all"]["lifetime_metrics"])
+
+    # Verify that the components of rates are requested for long date ranges,
+    # and that metrics that can not be summed are rejected.
+    @mock.patch("analytics.ApiObject.request_data")
+    @mock.patch("analytics.ApiObject.__init__")
+    def test_user_analytics_date_windows_rates(self, mock_init, mock_request_data):
+        mock_init.return_value = None
+        analytics = (
+            UserAnalytics("test_user_id", "test_api_config", "test_access_token")
+            .date_range("2021-01-01", "2021-04-30")
+            .metrics({"IMPRESSION", "PIN_CLICK_RATE"})
+        )
+
+        def window(date, impressions, clicks):
+            metrics = {
+                "IMPRESSION": impressions,
+                "PIN_CLICK": clicks,
+                "PIN_CLICK_RATE": clicks / impressions,
+            }
+            return {
+                "all": {
+                    "daily_metrics": [
+                        {"date": date, "data_status": "READY", "metrics": metrics}
+                    ],
+                    "summary_metrics": metrics,
+                }
+            }
+
+        mock_request_data.side_effect = [
+            window("2021-01-01", 10, 1),
+            window("2021-04-30", 30, 6),
+        ]
+        result = analytics.get()
+
+        mock_request_data.assert_any_call(
+            "/v5/user_account/analytics?"
+            "start_date=2021-04-01&end_date=2021-04-30"
+            "&metric_types=IMPRESSION,PIN_CLICK,PIN_CLICK_RATE"
+        )
+        # the components are only used to compute the rates
+        self.assertEqual(
+            {"IMPRESSION": 40, "PIN_CLICK_RATE": 0.175},
+            result["all"]["summary_metrics"],
+        )
+        self.assertEqual(
+            {"IMPRESSION": 30, "PIN_CLICK_RATE": 0.2},
+            result["all"]["daily_metrics"][1]["metrics"],
+        )
+        # the metrics of the caller are not modified
+        self.assertEqual({"IMPRESSION", "PIN_CLICK_RATE"}, analytics._metrics)
+
+        # an average can not be computed from the windows
+        analytics.metric("VIDEO_AVG_WATCH_TIME")
+        with self.assertRaisesRegex(
+            ValueError, "VIDEO_AVG_WATCH_TIME can not be computed from daily metrics"
+        ):
+            analytics.get()
@@ -0,0 +1,126 @@
+import unittest
+
+from analytics_rollup import period_start, rollup, rollup_metrics
+
+
+def day_row(ad_id, date, spend, clicks, impressions):
+    return {
+        "AD_ID": ad_id,
+        "DATE": date,
+        "SPEND_IN_DOLLAR": spend,
+        "CLICKTHROUGH_1": clicks,
+        "IMPRESSION_1": impressions,
+    }
+
+
+class AnalyticsRollupTest(unittest.TestCase):
+    def test_period_start(self):
+        # 2022-03-02 is a Wednesday
+        self.assertEqual("2022-02-28", period_start("2022-03-02", "WEEK"))
+        self.assertEqual("2022-02-28", period_start("2022-02-28", "WEEK"))
+        self.assertEqual("2022-03-01", period_start("2022-03-02", "MONTH"))
+        self.assertIsNone(period_start("2022-03-02", "TOTAL"))
+
+    def test_rollup_metrics(self):
+        self.assertEqual(
+            ["CLICKTHROUGH_1", "IMPRESSION_1", "SPEND_IN_DOLLAR"],
+            rollup_metrics(["CTR", "CPM_IN_DOLLAR", "SPEND_IN_DOLLAR"]),
+        )
+        self.assertEqual(
+            ["TOTAL_CHECKOUT", "TOTAL_CLICK_SIGNUP_VALUE_IN_MICRO_DOLLAR"],
+            rollup_metrics(
+                ["TOTAL_CLICK_SIGNUP_VALUE_IN_MICRO_DOLLAR", "TOTAL_CHECKOUT"]
+            ),
+        )
+        # only known additive and ratio metrics can be computed
+        for metric in [
+            "TOTAL_IMPRESSION_USER",
+            "TOTAL_IMPRESSION_FREQUENCY",
+            "ALL",
+            "CAMPAIGN_DAILY_SPEND_CAP",
+            "CAMPAIGN_ENTITY_STATUS",
+            "CAMPAIGN_NAME",
+            "TOTAL_CHECKOUT_COST_PER_ACTION",
+            "TOTAL_CHECKOUT_ROAS",
+        ]:
+            with self.assertRaisesRegex(ValueError, f"{metric} can not be computed"):
+                rollup_metrics(["SPEND_IN_DOLLAR", metric])
+
+    def test_rollup(self):
+        rows = [
+            day_row("1", "2022-02-27", 1.5, 1, 100),  # Sunday
+            day_row("1", "2022-02-28", 2.5, 0, 0),
+            day_row("2", "2022-02-28", 4.0, 2, 50),
+            day_row("1", "2022-03-01", 1.0, 3, 300),
+        ]
+        metrics = ["CLICKTHROUGH_1", "CPM_IN_DOLLAR", "CTR"]
+
+        self.assertEqual(
+            [
+                {
+                    "AD_ID": "1",
+                    "DATE": "2022-02-21",
+                    "CLICKTHROUGH_1": 1,
+                    "CPM_IN_DOLLAR": 15.0,
+                    "CTR": 0.01,
+                },
+                {
+                    "AD_ID": "1",
+                    "DATE": "2022-02-28",
+                    "CLICKTHROUGH_1": 3,
+                    "CPM_IN_DOLLAR": 3.5 * 1000 / 300,
+                    "CTR": 0.01,
+                },
+                {
+                    "AD_ID": "2",
+                    "DATE": "2022-02-28",
+                    "CLICKTHROUGH_1": 2,
+                    "CPM_IN_DOLLAR": 80.0,
+                    "CTR": 0.04,
+                },
+            ],
+            rollup(rows, "WEEK", metrics),
+        )
+
+        monthly = rollup(rows, "MONTH", metrics)
+        self.assertEqual(
+            [("1", "2022-02-01"), ("2", "2022-02-01"), ("1", "2022-03-01")],
+            [(row["AD_ID"], row["DATE"]) for row in monthly],
+        )
+        # the ratio is 0 when there are no impressions
+        rows[0]["IMPRESSION_1"] = 0
+        self.assertEqual(0, rollup(rows, "MONTH", metrics)[0]["CTR"])
+
+        self.assertEqual(
+            [
+                {"AD_ID": "1", "CLICKTHROUGH_1": 4, "SPEND_IN_DOLLAR": 5.0},
+                {"AD_ID": "2", "CLICKTHROUGH_1": 2, "SPEND_IN_DOLLAR": 4.0},
+            ],
+            rollup(rows, "TOTAL", ["CLICKTHROUGH_1", "SPEND_IN_DOLLAR"]),
+        )
+
+        # other columns (e.g. names, statuses, and caps) are not summed
+        rows[0].update(
+            CAMPAIGN_NAME="spring",
+            CAMPAIGN_ENTITY_STATUS="ACTIVE",
+            CAMPAIGN_DAILY_SPEND_CAP=100,
+        )
+        self.assertEqual(
+            {"AD_ID": "1", "SPEND_IN_DOLLAR": 5.0},
+            rollup(rows, "TOTAL", ["SPEND_IN_DOLLAR"])[0],
+        )
+        with self.assertRaisesRegex(ValueError, "CAMPAIGN_DAILY_SPEND_CAP"):
+            rollup(rows, "TOTAL", ["CAMPAIGN_DAILY_SPEND_CAP"])
+
+        # missing values are not counted, and ratios need both components
+        self.assertEqual(
+            [{"AD_ACCOUNT_ID": "9", "SPEND_IN_DOLLAR": 1}],
+            rollup(
+                [
+                    {"AD_ACCOUNT_ID": "9", "DATE": "2022-03-01", "SPEND_IN_DOLLAR": 1},
+                    {"AD_ACCOUNT_ID": "9", "DATE": "2022-03-02", "IMPRESSION_1": None},
+                ],
+                "TOTAL",
+                ["SPEND_IN_DOLLAR", "CPM_IN_DOLLAR"],
+            ),
+        )
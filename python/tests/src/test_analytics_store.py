@@ -0,0 +1,228 @@
+import datetime
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from analytics import AdAnalytics, UserAnalytics
+from analytics_store import AnalyticsStore, consecutive_ranges, date_range
+
+
+class AnalyticsStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "analytics.sqlite")
+        # the store considers 2021-03-10 (UTC) to be the current date
+        patcher = mock.patch.object(
+            AnalyticsStore, "today", return_value=datetime.date(2021, 3, 10)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_dates(self):
+        self.assertEqual(
+            ["2021-02-27", "2021-02-28", "2021-03-01"],
+            date_range("2021-02-27", "2021-03-01"),
+        )
+        self.assertEqual(
+            [("2021-02-27", "2021-03-01"), ("2021-03-05", "2021-03-05")],
+            consecutive_ranges(
+                ["2021-02-27", "2021-02-28", "2021-03-01", "2021-03-05"]
+            ),
+        )
+
+    def test_analytics_store(self):
+        store = AnalyticsStore(self.path, settling_days=2)
+        metrics = ["CLICK", "SPEND"]
+        self.assertEqual(
+            date_range("2021-03-01", "2021-03-10"),
+            store.missing_dates("scope", metrics, "2021-03-01", "2021-03-10"),
+        )
+        store.put(
+            "scope",
+            metrics,
+            "2021-03-01",
+            "2021-03-10",
+            [
+                ("ad1", "2021-03-01", {"CLICK": 1, "SPEND": 1.5}),
+                ("ad2", "2021-03-01", {"CLICK": 2}),
+                ("ad1", "2021-03-05", None),  # not ready
+                ("ad1", "2021-03-09", {"CLICK": 9, "SPEND": 9.5}),
+            ],
+        )
+        store.close()
+
+        store = AnalyticsStore(self.path, settling_days=2)
+        # 2021-03-05 was not ready, and the last two days are settling
+        self.assertEqual(
+            ["2021-03-05", "2021-03-09", "2021-03-10"],
+            store.missing_dates("scope", metrics, "2021-03-01", "2021-03-10"),
+        )
+        # another metric has not been requested
+        self.assertEqual(
+            date_range("2021-03-01", "2021-03-10"),
+            store.missing_dates(
+                "scope", metrics + ["IMPRESSION"], "2021-03-01", "2021-03-10"
+            ),
+        )
+        self.assertEqual(
+            [
+                ("ad1", "2021-03-01", {"CLICK": 1, "SPEND": 1.5}),
+                ("ad2", "2021-03-01", {"CLICK": 2}),
+                ("ad1", "2021-03-09", {"CLICK": 9, "SPEND": 9.5}),
+            ],
+            store.get("scope", metrics, "2021-03-01", "2021-03-10"),
+        )
+        self.assertEqual([], store.get("other", metrics, "2021-03-01", "2021-03-10"))
+
+        # values are replaced when the dates are requested again
+        store.put("scope", metrics, "2021-03-09", "2021-03-10", [])
+        self.assertEqual([], store.get("scope", metrics, "2021-03-09", "2021-03-10"))
+        store.close()
+
+    # Verify that only the missing and settling days are requested.
+    @mock.patch("analytics.ApiObject.request_data")
+    @mock.patch("analytics.ApiObject.__init__")
+    def test_ad_analytics_store(self, mock_init, mock_request_data):
+        mock_init.return_value = None
+        store = AnalyticsStore(self.path, settling_days=1)  # today
+        analytics = (
+            AdAnalytics("test_api_config", "test_access_token")
+            .date_range("2021-03-01", "2021-03-10")
+            .metrics({"SPEND_IN_DOLLAR"})
+            .granularity("DAY")
+            .click_window_days(7)
+        )
+        analytics.analytics_store = store
+
+        def request_data(request_uri):
+            start = request_uri.split("start_date=")[1][:10]
+            end = request_uri.split("end_date=")[1][:10]
+            return [
+                {"AD_ID": 1, "DATE": date, "SPEND_IN_DOLLAR": int(date[-2:])}
+                for date in date_range(start, end)
+            ]
+
+        mock_request_data.side_effect = request_data
+        rows = analytics.get_ads("test_ad_account", [1])
+        mock_request_data.assert_called_once_with(
+            "/v5/ad_accounts/test_ad_account/ads/analytics?ad_ids=1"
+            "&start_date=2021-03-01&end_date=2021-03-10"
+            "&columns=SPEND_IN_DOLLAR&click_window_days=7&granularity=DAY"
+        )
+        self.assertEqual(10, len(rows))
+
+        mock_request_data.reset_mock()
+        self.assertEqual(rows, analytics.get_ads("test_ad_account", [1]))
+        mock_request_data.assert_called_once_with(
+            "/v5/ad_accounts/test_ad_account/ads/analytics?ad_ids=1"
+            "&start_date=2021-03-10&end_date=2021-03-10"
+            "&columns=SPEND_IN_DOLLAR&click_window_days=7&granularity=DAY"
+        )
+        self.assertEqual(
+            {
+                ("1", "2021-03-05"): {
+                    "AD_ID": 1,
+                    "DATE": "2021-03-05",
+                    "SPEND_IN_DOLLAR": 5,
+                }
+            },
+            {
+                key: row
+                for key, row in analytics.get_ads("test_ad_account", [1]).items()
+                if key[1] == "2021-03-05"
+            },
+        )
+
+        # other attribution windows are requested separately
+        mock_request_data.reset_mock()
+        analytics.click_window_days(30).get_ads("test_ad_account", [1])
+        self.assertIn("start_date=2021-03-01", mock_request_data.call_args[0][0])
+        store.close()
+
+    # Verify that organic analytics are built from the store, with the status
+    # of each day, the rates, and the lifetime metrics.
+    @mock.patch("analytics.ApiObject.request_data")
+    @mock.patch("analytics.ApiObject.__init__")
+    def test_user_analytics_store(self, mock_init, mock_request_data):
+        mock_init.return_value = None
+        store = AnalyticsStore(self.path, settling_days=0)
+        analytics = (
+            UserAnalytics("test_user_id", "test_api_config", "test_access_token")
+            .date_range("2021-03-07", "2021-03-09")
+            .metrics({"IMPRESSION", "PIN_CLICK_RATE"})
+        )
+        analytics.analytics_store = store
+        mock_request_data.return_value = {
+            "all": {
+                "lifetime_metrics": {"IMPRESSION": 1000},
+                "daily_metrics": [
+                    {"date": "2021-03-07", "data_status": "BEFORE_BUSINESS_CREATED"},
+                    {
+                        "date": "2021-03-08",
+                        "data_status": "READY",
+                        "metrics": {
+                            "IMPRESSION": 10,
+                            "PIN_CLICK": 1,
+                            "PIN_CLICK_RATE": 0.1,
+                        },
+                    },
+                    {"date": "2021-03-09", "data_status": "PROCESSING"},
+                ],
+                "summary_metrics": {},
+            }
+        }
+        expected = {
+            "all": {
+                "lifetime_metrics": {"IMPRESSION": 1000},
+                "daily_metrics": [
+                    {"date": "2021-03-07", "data_status": "BEFORE_BUSINESS_CREATED"},
+                    {
+                        "date": "2021-03-08",
+                        "data_status": "READY",
+                        "metrics": {"IMPRESSION": 10, "PIN_CLICK_RATE": 0.1},
+                    },
+                    {"date": "2021-03-09", "data_status": "PROCESSING"},
+                ],
+                "summary_metrics": {"IMPRESSION": 10, "PIN_CLICK_RATE": 0.1},
+            }
+        }
+        self.assertEqual(expected, analytics.get())
+        # the components of the rate are requested and stored
+        mock_request_data.assert_called_once_with(
+            "/v5/user_account/analytics?"
+            "start_date=2021-03-07&end_date=2021-03-09"
+            "&metric_types=IMPRESSION,PIN_CLICK,PIN_CLICK_RATE"
+        )
+
+        mock_request_data.reset_mock()
+        mock_request_data.return_value = {
+            "all": {
+                "daily_metrics": [
+                    {"date": "2021-03-09", "data_status": "PROCESSING"},
+                ],
+            }
+        }
+        self.assertEqual(expected, analytics.get())
+        # the day that was processing is requested again
+        mock_request_data.assert_called_once_with(
+            "/v5/user_account/analytics?"
+            "start_date=2021-03-09&end_date=2021-03-09"
+            "&metric_types=IMPRESSION,PIN_CLICK,PIN_CLICK_RATE"
+        )
+
+        # when no day is missing, the report is built from the store
+        mock_request_data.reset_mock()
+        analytics.date_range("2021-03-07", "2021-03-08")
+        del expected["all"]["daily_metrics"][2]
+        self.assertEqual(expected, analytics.get())
+        mock_request_data.assert_not_called()
+
+        # averages can not be computed from the stored days
+        mock_request_data.return_value = {"all": {"daily_metrics": []}}
+        analytics.metric("VIDEO_AVG_WATCH_TIME").get()
+        self.assertIn("VIDEO_AVG_WATCH_TIME", mock_request_data.call_args[0][0])
+        store.close()
@@ -0,0 +1,200 @@
+import io
+import json
+import math
+import unittest
+from unittest import mock
+
+import analytics_table
+from analytics_table import AnalyticsTable
+
+AD_ROWS = [
+    {
+        "AD_ID": 1,
+        "DATE": "2022-01-01",
+        "TOTAL_CLICKTHROUGH": 5,
+        "TOTAL_IMPRESSION": 100,
+    },
+    {
+        "AD_ID": 2,
+        "DATE": "2022-01-01",
+        "TOTAL_CLICKTHROUGH": 1,
+        "TOTAL_IMPRESSION": 50,
+    },
+    {
+        "AD_ID": 1,
+        "DATE": "2022-01-02",
+        "TOTAL_CLICKTHROUGH": 4,
+        "TOTAL_IMPRESSION": None,
+    },
+    {"AD_ID": 2, "DATE": "2022-02-01", "TOTAL_CLICKTHROUGH": 10},
+]
+
+
+class AnalyticsTableTest(unittest.TestCase):
+    # uses numpy when it is installed
+    def test_from_rows(self):
+        table = AnalyticsTable.from_rows(AD_ROWS)
+        self.assertEqual(4, len(table))
+        self.assertEqual(["TOTAL_CLICKTHROUGH", "TOTAL_IMPRESSION"], table.metrics)
+        self.assertEqual(["1", "2", "1", "2"], list(table.column("AD_ID")))
+        # missing values are NaN
+        impressions = list(table.column("TOTAL_IMPRESSION"))
+        self.assertEqual([100.0, 50.0], impressions[:2])
+        self.assertTrue(math.isnan(impressions[2]))
+        self.assertTrue(math.isnan(impressions[3]))
+
+        self.assertEqual(
+            [
+                {
+                    "AD_ID": "1",
+                    "DATE": "2022-01-01",
+                    "TOTAL_CLICKTHROUGH": 5.0,
+                    "TOTAL_IMPRESSION": 100.0,
+                },
+                {
+                    "AD_ID": "2",
+                    "DATE": "2022-01-01",
+                    "TOTAL_CLICKTHROUGH": 1.0,
+                    "TOTAL_IMPRESSION": 50.0,
+                },
+            ],
+            table.to_rows()[:2],
+        )
+
+        with self.assertRaisesRegex(ValueError, "does not have 2 values"):
+            AnalyticsTable({"DATE": ["2022-01-01", "2022-01-02"], "SPEND": [1.0]})
+
+    def test_string_columns(self):
+        table = AnalyticsTable.from_rows(
+            [
+                {
+                    "CAMPAIGN_ID": 1,
+                    "CAMPAIGN_NAME": "spring",
+                    "CAMPAIGN_ENTITY_STATUS": "ACTIVE",
+                    "SPEND_IN_DOLLAR": 1.5,
+                },
+                {
+                    "CAMPAIGN_ID": 2,
+                    "CAMPAIGN_NAME": None,
+                    "CAMPAIGN_ENTITY_STATUS": "PAUSED",
+                    "SPEND_IN_DOLLAR": 2,
+                },
+            ]
+        )
+        # columns with values that are not numbers are strings, not metrics
+        self.assertEqual(["SPEND_IN_DOLLAR"], table.metrics)
+        self.assertEqual(["spring", ""], list(table.column("CAMPAIGN_NAME")))
+        active = table.where("CAMPAIGN_ENTITY_STATUS", "ACTIVE")
+        self.assertEqual(1.5, active.sum("SPEND_IN_DOLLAR"))
+        self.assertEqual(["SPEND_IN_DOLLAR"], active.metrics)
+        self.assertEqual(
+            {
+                "CAMPAIGN_ID": "2",
+                "CAMPAIGN_NAME": "",
+                "CAMPAIGN_ENTITY_STATUS": "PAUSED",
+                "SPEND_IN_DOLLAR": 2.0,
+            },
+            table.to_rows()[1],
+        )
+
+        csv_file = io.StringIO()
+        table.to_csv(csv_file)
+        self.assertEqual(
+            "CAMPAIGN_ID,CAMPAIGN_NAME,CAMPAIGN_ENTITY_STATUS,SPEND_IN_DOLLAR\r\n"
+            "1,spring,ACTIVE,1.5\r\n"
+            "2,,PAUSED,2.0\r\n",
+            csv_file.getvalue(),
+        )
+
+    def test_aggregations(self):
+        table = AnalyticsTable.from_rows(AD_ROWS)
+        self.assertEqual(20.0, table.sum("TOTAL_CLICKTHROUGH"))
+        self.assertEqual(150.0, table.sum("TOTAL_IMPRESSION"))
+        self.assertEqual(75.0, table.mean("TOTAL_IMPRESSION"))
+        self.assertAlmostEqual(
+            20 / 150, table.ratio("TOTAL_CLICKTHROUGH", "TOTAL_IMPRESSION")
+        )
+
+        # aggregations of a table without values
+        empty = table.where("AD_ID", 3)
+        self.assertEqual(0, len(empty))
+        self.assertEqual(0.0, empty.sum("TOTAL_IMPRESSION"))
+        self.assertTrue(math.isnan(empty.mean("TOTAL_IMPRESSION")))
+        self.assertTrue(
+            math.isnan(empty.ratio("TOTAL_CLICKTHROUGH", "TOTAL_IMPRESSION"))
+        )
+
+    def test_selection(self):
+        table = AnalyticsTable.from_rows(AD_ROWS)
+
+        ad1 = table.where("AD_ID", 1)
+        self.assertEqual(2, len(ad1))
+        self.assertEqual(9.0, ad1.sum("TOTAL_CLICKTHROUGH"))
+
+        january = table.between("2022-01-01", "2022-01-31")
+        self.assertEqual(3, len(january))
+        self.assertEqual(
+            ["2022-01-01", "2022-01-01", "2022-01-02"], list(january.column("DATE"))
+        )
+        self.assertEqual(10.0, january.sum("TOTAL_CLICKTHROUGH"))
+
+        selected = table.select([False, True, False, True])
+        self.assertEqual(["2", "2"], list(selected.column("AD_ID")))
+        self.assertEqual(11.0, selected.sum("TOTAL_CLICKTHROUGH"))
+
+    def test_from_organic(self):
+        result = {
+            "all": {
+                "daily_metrics": [
+                    {
+                        "date": "2021-03-01",
+                        "data_status": "READY",
+                        "metrics": {"IMPRESSION": 10, "SAVE": 1},
+                    },
+                    {
+                        "date": "2021-03-02",
+                        "data_status": "PROCESSING",
+                    },
+                ],
+                "summary_metrics": {"IMPRESSION": 10, "SAVE": 1},
+            }
+        }
+        table = AnalyticsTable.from_organic(result)
+        self.assertEqual(2, len(table))
+        self.assertEqual(["2021-03-01", "2021-03-02"], list(table.column("DATE")))
+        self.assertEqual(10.0, table.sum("IMPRESSION"))
+        self.assertTrue(math.isnan(table.column("SAVE")[1]))
+
+        self.assertEqual(0, len(AnalyticsTable.from_organic(result, "ORGANIC")))
+
+    def test_output(self):
+        table = AnalyticsTable.from_rows(AD_ROWS[2:])
+
+        csv_file = io.StringIO()
+        table.to_csv(csv_file)
+        self.assertEqual(
+            "AD_ID,DATE,TOTAL_CLICKTHROUGH,TOTAL_IMPRESSION\r\n"
+            "1,2022-01-02,4.0,\r\n"
+            "2,2022-02-01,10.0,\r\n",
+            csv_file.getvalue(),
+        )
+
+        json_file = io.StringIO()
+        table.to_json(json_file)
+        self.assertEqual(
+            {
+                "AD_ID": ["1", "2"],
+                "DATE": ["2022-01-02", "2022-02-01"],
+                "TOTAL_CLICKTHROUGH": [4.0, 10.0],
+                "TOTAL_IMPRESSION": [None, None],
+            },
+            json.loads(json_file.getvalue()),
+        )
+
+
+class AnalyticsTableArrayTest(AnalyticsTableTest):
+    # the same tests, without numpy
+    def setUp(self):
+        patcher = mock.patch.object(analytics_table, "numpy", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
@@ -1,3 +1,4 @@
+import tempfile
 import unittest
 from unittest import mock
 
@@ -25,6 +26,17 @@ class ApiConfigTest(unittest.TestCase):
         )
         self.assertEqual(api_config.oauth_uri, "https://www.pinterest.com")
         self.assertEqual(api_config.api_uri, "https://api.pinterest.com")
+        self.assertEqual(api_config.pool_connections, 10)
+        self.assertEqual(api_config.pool_maxsize, 10)
+        self.assertTrue(api_config.keep_alive)
+        self.assertEqual(api_config.session.pool_maxsize, 10)
+        self.assertEqual(api_config.max_retries, 3)
+        self.assertEqual(api_config.session.retry_policy.max_retries, 3)
+        self.assertEqual(api_config.session.retry_policy.backoff, 1.0)
+        self.assertEqual(api_config.session.rate_limiter.rate_limits["pins_write"], 300)
+        self.assertIsNone(api_config.session.response_cache)
+        self.assertIsNone(api_config.session.metrics)
+        self.assertIsNone(api_config.session.gzip_min_bytes)
 
     mock_os_environ_complete = {
         "PINTEREST_APP_ID": "test-app-id",
@@ -32,11 +44,24 @@ class ApiConfigTest(unittest.TestCase):
         "REDIRECT_LANDING_URI": "test-landing-uri",
         "PINTEREST_OAUTH_URI": "test-oauth-uri",
         "PINTEREST_API_URI": "test-api-uri",
+        "PINTEREST_POOL_CONNECTIONS": "2",
+        "PINTEREST_POOL_MAXSIZE": "32",
+        "PINTEREST_KEEP_ALIVE": "false",
+        "PINTEREST_MAX_RETRIES": "0",
+        "PINTEREST_RETRY_BACKOFF": "0.5",
+        "PINTEREST_RATE_LIMITS": "pins_write=60",
+        "PINTEREST_METRICS_FILE": "test-metrics.json",
+        "PINTEREST_JSON_CODEC": "json",
+        "PINTEREST_GZIP_MIN_BYTES": "1024",
     }
 
     @mock.patch.dict("os.environ", mock_os_environ_complete, clear=True)
-    def test_api_config_complete(self):
+    @mock.patch("request_metrics.atexit.register")
+    def test_api_config_complete(self, mock_register):
         api_config = ApiConfig()
+        mock_register.assert_called_once_with(
+            api_config.session.metrics.write, "test-metrics.json"
+        )
         self.assertEqual(api_config.app_id, "test-app-id")
         self.assertEqual(api_config.app_secret, "test-app-secret")
         self.assertEqual(api_config.port, 8085)
@@ -44,3 +69,30 @@ class ApiConfigTest(unittest.TestCase):
         self.assertEqual(api_config.landing_uri, "test-landing-uri")
         self.assertEqual(api_config.oauth_uri, "test-oauth-uri")
         self.assertEqual(api_config.api_uri, "test-api-uri")
+        self.assertEqual(api_config.pool_connections, 2)
+        self.assertEqual(api_config.pool_maxsize, 32)
+        self.assertFalse(api_config.keep_alive)
+        self.assertEqual(api_config.session.pool_maxsize, 32)
+        self.assertFalse(api_config.session.keep_alive)
+        self.assertEqual(api_config.session.retry_policy.max_retries, 0)
+        self.assertEqual(api_config.session.retry_policy.backoff, 0.5)
+        self.assertEqual(api_config.session.rate_limiter.rate_limits["pins_write"], 60)
+        self.assertEqual(api_config.session.json_codec.name, "json")
+        self.assertEqual(api_config.session.gzip_min_bytes, 1024)
+
+    @mock.patch.dict("os.environ", mock_os_environ_minimal, clear=True)
+    def test_api_config_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with mock.patch.dict(
+                "os.environ",
+                {
+                    "PINTEREST_CACHE_DIR": cache_dir,
+                    "PINTEREST_CACHE_MAX_BYTES": "1000",
+                    "PINTEREST_CACHE_STALE_WHILE_REVALIDATE": "true",
+                },
+            ):
+                api_config = ApiConfig()
+            response_cache = api_config.session.response_cache
+            self.assertEqual(response_cache.directory, cache_dir)
+            self.assertEqual(response_cache.max_bytes, 1000)
+            self.assertTrue(response_cache.stale_while_revalidate)
@@ -1,9 +1,14 @@
+import os
+import tempfile
 import unittest
 from unittest import mock
 
+import requests
 import requests_mock
 
 from api_media_object import ApiMediaObject
+from http_session import HttpSession
+from media_cache import MediaCache
 
 
 # Tests for functionality related to media upload.
@@ -44,32 +49,121 @@ class ApiMediaObjectTest(unittest.TestCase):
         with self.assertRaisesRegex(ValueError, "invalid media: oops"):
             api_media_object.media_to_media_id("oops")
 
+    # Verify that the media cache is used to avoid uploading a file again.
+    def test_media_to_media_id_cache(self):
+        access_token = mock.Mock()
+        access_token.header.return_value = {"Authorization": "Bearer test"}
+        api_config = mock.Mock()
+        api_config.verbosity = 2
+        api_media_object = ApiMediaObject(api_config, access_token)
+        api_media_object.upload_media = mock.Mock(side_effect=["111", "222"])
+        api_media_object.request_data = mock.Mock(
+            return_value={"username": "pindexter"}
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            video_path = os.path.join(directory, "video.mp4")
+            with open(video_path, "wb") as video_file:
+                video_file.write(b"pinteresty video")
+            api_media_object.media_cache = MediaCache(
+                os.path.join(directory, "media.json")
+            )
+            self.assertEqual("111", api_media_object.media_to_media_id(video_path))
+            self.assertEqual("111", api_media_object.media_to_media_id(video_path))
+            api_media_object.upload_media.assert_called_once_with(video_path)
+
+            # a different file is uploaded
+            with open(video_path, "wb") as video_file:
+                video_file.write(b"another video")
+            self.assertEqual("222", api_media_object.media_to_media_id(video_path))
+
+            # the cache is keyed by user account, not by access token, and the
+            # account is requested once
+            access_token.header.return_value = {"Authorization": "Bearer new"}
+            self.assertEqual("222", api_media_object.media_to_media_id(video_path))
+            api_media_object.request_data.assert_called_once_with("/v5/user_account")
+
     # Verify that a file can be sent via a standard POST request
     # with form data.
     @requests_mock.Mocker()
     def test_upload_file_multipart(self, rm):
         api_config = mock.Mock()
         api_config.verbosity = 2
+        api_config.session = HttpSession()
         api_media_object = ApiMediaObject(api_config, mock.Mock())
+        progress = mock.Mock()
+        api_media_object.upload_progress = progress
 
         test_url = "https://test_upload_host/test_upload_path"
         test_data = {"test_key": "test_value"}
-        rm.post(test_url)  # mock the post request
+        bodies = []
+
+        def upload(request, context):
+            # the body is streamed, so read it the way requests sends it
+            bodies.append(b"".join(request.body))
+            return ""
+
+        rm.post(test_url, text=upload)  # mock the post request
 
-        # mock the upload of a file with the contents "pinteresty video"
-        with mock.patch(
-            "builtins.open", mock.mock_open(read_data="pinteresty video")
-        ) as mock_open:
-            api_media_object.upload_file_multipart(test_url, "test_file", test_data)
-            mock_open.assert_called_once_with("test_file", "rb")
+        # upload a file with the contents "pinteresty video"
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "video.mp4")
+            with open(file_path, "wb") as video_file:
+                video_file.write(b"pinteresty video")
+            api_media_object.upload_file_multipart(test_url, file_path, test_data)
 
         # check to verify the posted form data
+        self.assertEqual(1, len(bodies))
+        self.assertEqual(str(len(bodies[0])), rm.last_request.headers["Content-Length"])
+        self.assertRegex(
+            rm.last_request.headers["Content-Type"], r"^multipart/form-data; boundary="
+        )
         self.assertRegex(
-            rm.last_request.text,
+            bodies[0].decode(),
             r"Content-Disposition: form-data; "
             r'name="test_key"\r\n\r\n'
             r"test_value\r\n"
             r".*\r\n"
             r'Content-Disposition: form-data; name="file"\r\n\r\n'
-            r"pinteresty video",
+            r"pinteresty video\r\n",
         )
+        progress.assert_called_with(len(bodies[0]), len(bodies[0]))
+
+    @requests_mock.Mocker()
+    @mock.patch("api_object.time.sleep")
+    def test_upload_file_multipart_retry(self, rm, mock_sleep):
+        api_config = mock.Mock()
+        api_config.verbosity = 1
+        api_config.session = HttpSession()
+        api_media_object = ApiMediaObject(api_config, mock.Mock())
+
+        test_url = "https://test_upload_host/test_upload_path"
+        bodies = []
+
+        def upload(request, context):
+            bodies.append(b"".join(request.body))
+            return ""
+
+        # the connection fails twice, and then the whole file is sent again
+        rm.post(
+            test_url,
+            [
+                {"exc": requests.exceptions.ConnectionError},
+                {"exc": requests.exceptions.ConnectionError},
+                {"text": upload},
+            ],
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "video.mp4")
+            with open(file_path, "wb") as video_file:
+                video_file.write(b"pinteresty video" * 1000)
+            api_media_object.upload_file_multipart(test_url, file_path, {})
+
+            self.assertEqual(3, rm.call_count)
+            self.assertEqual(2, mock_sleep.call_count)
+            self.assertIn(b"pinteresty video" * 1000, bodies[0])
+
+            # give up after UPLOAD_RETRIES connection errors
+            rm.post(test_url, exc=requests.exceptions.ConnectionError)
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                api_media_object.upload_file_multipart(test_url, file_path, {})
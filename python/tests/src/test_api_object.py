@@ -1,9 +1,13 @@
+import json
+import os
+import tempfile
 import unittest
 from unittest import mock
 
 import requests_mock
 
-from api_object import ApiObject
+from api_object import ApiObject, PagedIterator
+from http_session import HttpSession
 
 
 class ApiObjectTest(unittest.TestCase):
@@ -63,6 +67,7 @@ class ApiObjectTest(unittest.TestCase):
         api_config = mock.Mock()
         api_config.api_uri = self.test_uri
         api_config.verbosity = 2
+        api_config.session = HttpSession()
 
         access_token = mock.Mock()
         access_token_header = {"access_token_key": "access_token_value"}
@@ -108,6 +113,7 @@ class ApiObjectTest(unittest.TestCase):
         api_config = mock.Mock()
         api_config.api_uri = self.test_uri
         api_config.verbosity = 2
+        api_config.session = HttpSession()
 
         access_token = mock.Mock()
         access_token_header = {"access_token_key": "access_token_value"}
@@ -128,3 +134,190 @@ class ApiObjectTest(unittest.TestCase):
         for index, value in enumerate(api_object.get_iterator("/test_iterpath")):
             self.assertEqual(expected_values[index], value)
         self.assertFalse(rm.last_request.allow_redirects)
+
+    # Verify that pages are fetched in the background when prefetch is set.
+    @requests_mock.Mocker()
+    def test_api_object_iterator_prefetch(self, rm):
+        api_config = mock.Mock()
+        api_config.api_uri = self.test_uri
+        api_config.verbosity = 0
+        api_config.session = HttpSession()
+        access_token = mock.Mock()
+        access_token.header.return_value = {"access_token_key": "access_token_value"}
+        api_object = ApiObject(api_config, access_token)
+        api_object.prefetch = 2
+
+        for page in range(5):
+            query = f"?page_size=2&bookmark=BOOKMARK{page}" if page else "?page_size=2"
+            rm.get(
+                self.test_uri + "/test_iterpath" + query,
+                complete_qs=True,
+                json={
+                    "items": [2 * page, 2 * page + 1],
+                    "bookmark": f"BOOKMARK{page + 1}" if page < 4 else None,
+                },
+            )
+
+        iterator = api_object.get_iterator("/test_iterpath", {"page_size": 2})
+        self.assertEqual(2, iterator.prefetcher.pages.maxsize)  # bounded memory
+        self.assertEqual(list(range(10)), list(iterator))
+        self.assertEqual(5, rm.call_count)
+        iterator.prefetcher.thread.join(timeout=5)
+        self.assertFalse(iterator.prefetcher.thread.is_alive())
+
+        # an abandoned iteration stops the background thread
+        iterator = api_object.get_iterator("/test_iterpath", {"page_size": 2})
+        iterator.close()
+        iterator.prefetcher.thread.join(timeout=5)
+        self.assertFalse(iterator.prefetcher.thread.is_alive())
+
+        # errors in the background are raised in the caller's thread
+        rm.get(
+            self.test_uri + "/test_iterpath?page_size=2&bookmark=BOOKMARK1",
+            complete_qs=True,
+            status_code=500,
+            reason="Internal Server Error",
+            json={},
+        )
+        iterator = api_object.get_iterator("/test_iterpath", {"page_size": 2})
+        self.assertEqual([0, 1], [next(iterator), next(iterator)])
+        with self.assertRaisesRegex(RuntimeError, "Internal Server Error"):
+            next(iterator)
+        # the error is raised again, because the background thread has stopped
+        with self.assertRaisesRegex(RuntimeError, "Internal Server Error"):
+            next(iterator)
+
+    # Verify that the position of the iterator can be saved and restored.
+    @requests_mock.Mocker()
+    def test_api_object_iterator_checkpoint(self, rm):
+        api_config = mock.Mock()
+        api_config.api_uri = self.test_uri
+        api_config.verbosity = 0
+        api_config.session = HttpSession()
+        access_token = mock.Mock()
+        access_token.header.return_value = {"access_token_key": "access_token_value"}
+        api_object = ApiObject(api_config, access_token)
+
+        for page in range(3):
+            query = f"?page_size=2&bookmark=BOOKMARK{page}" if page else "?page_size=2"
+            rm.get(
+                self.test_uri + "/test_iterpath" + query,
+                complete_qs=True,
+                json={
+                    "items": [2 * page, 2 * page + 1],
+                    "bookmark": f"BOOKMARK{page + 1}" if page < 2 else None,
+                },
+            )
+
+        # the checkpoint is the position of the next item
+        iterator = api_object.get_iterator("/test_iterpath", {"page_size": 2})
+        self.assertEqual([0, 1, 2], [next(iterator) for _ in range(3)])
+        checkpoint = json.loads(json.dumps(iterator.checkpoint()))
+        self.assertEqual(
+            {"path": "/test_iterpath?page_size=2", "bookmark": "BOOKMARK1", "index": 1},
+            checkpoint,
+        )
+        rm.reset_mock()
+        iterator = PagedIterator.from_checkpoint(api_object, checkpoint)
+        self.assertEqual([3, 4, 5], list(iterator))
+        self.assertEqual(2, rm.call_count)  # no pages downloaded again
+        self.assertTrue(iterator.checkpoint()["done"])
+
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint_path = os.path.join(directory, "checkpoint.json")
+
+            # simulate a crash after the first page
+            iterator = api_object.get_iterator(
+                "/test_iterpath", {"page_size": 2}, checkpoint_path
+            )
+            self.assertEqual([0, 1, 2], [next(iterator) for _ in range(3)])
+            with open(checkpoint_path) as checkpoint_file:
+                self.assertEqual(
+                    {
+                        "path": "/test_iterpath?page_size=2",
+                        "bookmark": "BOOKMARK1",
+                        "index": 0,
+                    },
+                    json.load(checkpoint_file),
+                )
+
+            # resume at the start of the page that was being processed
+            rm.reset_mock()
+            iterator = api_object.get_iterator(
+                "/test_iterpath", {"page_size": 2}, checkpoint_path
+            )
+            self.assertEqual([2, 3, 4, 5], list(iterator))
+            self.assertEqual(2, rm.call_count)
+
+            # the checkpoint of a completed iteration is removed, so that
+            # the next iteration starts over
+            self.assertFalse(os.path.exists(checkpoint_path))
+            iterator = api_object.get_iterator(
+                "/test_iterpath", {"page_size": 2}, checkpoint_path
+            )
+            self.assertEqual([0, 1], [next(iterator) for _ in range(2)])
+            next(iterator)  # writes the checkpoint
+
+            # the checkpoint can not be used for another path
+            with self.assertRaisesRegex(ValueError, "is for /test_iterpath"):
+                api_object.get_iterator("/other_path", checkpoint_path=checkpoint_path)
+
+            # other iterators of the object do not use the checkpoint
+            rm.get(self.test_uri + "/other_path", json={"items": ["other"]})
+            self.assertEqual(["other"], list(api_object.get_iterator("/other_path")))
+            self.assertTrue(os.path.exists(checkpoint_path))
+
+    # Verify that items are decoded from the response stream when stream is set.
+    @requests_mock.Mocker()
+    def test_api_object_iterator_stream(self, rm):
+        api_config = mock.Mock()
+        api_config.api_uri = self.test_uri
+        api_config.verbosity = 0
+        api_config.session = HttpSession()
+        access_token = mock.Mock()
+        access_token.header.return_value = {"access_token_key": "access_token_value"}
+        api_object = ApiObject(api_config, access_token)
+        api_object.stream = True
+
+        rm.get(
+            self.test_uri + "/test_iterpath",
+            complete_qs=True,
+            text='{"items": [{"id": "1"}, {"id": "2"}], "bookmark": "BOOKMARK1"}',
+        )
+        rm.get(
+            self.test_uri + "/test_iterpath?bookmark=BOOKMARK1",
+            complete_qs=True,
+            text='{"items": [{"id": "3"}], "bookmark": null}',
+        )
+
+        iterator = api_object.get_iterator("/test_iterpath")
+        self.assertTrue(rm.last_request.stream)
+        self.assertEqual([{"id": "1"}], [next(iterator)])
+        checkpoint = iterator.checkpoint()
+        self.assertEqual([{"id": "2"}, {"id": "3"}], list(iterator))
+        self.assertEqual(2, rm.call_count)
+
+        # resume in the middle of a streamed page
+        iterator = PagedIterator.from_checkpoint(api_object, checkpoint, stream=True)
+        self.assertEqual([{"id": "2"}, {"id": "3"}], list(iterator))
+
+        # errors are the same as without streaming
+        rm.get(
+            self.test_uri + "/error_path",
+            status_code=500,
+            reason="Internal Server Error",
+            json={},
+        )
+        with self.assertRaisesRegex(RuntimeError, "Internal Server Error"):
+            api_object.get_iterator("/error_path")
+
+        # invalid JSON raises the same exception as without streaming
+        rm.get(self.test_uri + "/invalid_path", text='{"items": [{"id": "1"} {')
+        iterator = api_object.get_iterator("/invalid_path")
+        with self.assertRaisesRegex(RuntimeError, "does not have valid json content"):
+            list(iterator)
+
+        # the pages can not be streamed and prefetched
+        api_object.prefetch = 2
+        with self.assertRaisesRegex(ValueError, "stream can not be used with prefetch"):
+            api_object.get_iterator("/test_iterpath")
@@ -0,0 +1,118 @@
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import requests_mock
+
+from api_common import RateLimitException, SpamException
+from api_object import ApiObject
+from async_api_object import AsyncApiObject
+from board import Board
+from http_session import HttpSession
+
+
+class AsyncApiObjectTest(unittest.TestCase):
+    test_uri = "https://test_host"
+
+    def setUp(self):
+        self.api_config = mock.Mock()
+        self.api_config.api_uri = self.test_uri
+        self.api_config.verbosity = 0
+        self.api_config.session = HttpSession()
+        self.access_token = mock.Mock()
+        self.access_token.header.return_value = {"Authorization": "Bearer test"}
+
+    # Verify the coroutine versions of the basic ApiObject methods.
+    @requests_mock.Mocker()
+    def test_async_api_object(self, rm):
+        api_object = AsyncApiObject(ApiObject(self.api_config, self.access_token))
+
+        rm.get(self.test_uri + "/test_get", json={"key": "get"})
+        rm.put(self.test_uri + "/test_put", json={"key": "put"})
+        rm.post(self.test_uri + "/test_post", json={"key": "post"})
+        rm.delete(self.test_uri + "/test_delete", status_code=204)
+
+        async def run():
+            return await asyncio.gather(
+                api_object.request_data("/test_get"),
+                api_object.put_data("/test_put", {"put": "data"}),
+                api_object.post_data("/test_post", {"post": "data"}),
+                api_object.delete_and_check("/test_delete"),
+            )
+
+        self.assertEqual(
+            [{"key": "get"}, {"key": "put"}, {"key": "post"}, None], asyncio.run(run())
+        )
+
+    # Verify that the executor is shut down only when the wrapper created it.
+    def test_close(self):
+        api_object = ApiObject(self.api_config, self.access_token)
+        with AsyncApiObject(api_object) as wrapper:
+            executor = wrapper.executor
+        with self.assertRaises(RuntimeError):  # shut down
+            executor.submit(print)
+
+        async def run(wrapper):
+            async with wrapper:
+                pass
+
+        with ThreadPoolExecutor(max_workers=1) as shared:
+            asyncio.run(run(AsyncApiObject(api_object, shared)))
+            self.assertEqual(2, shared.submit(lambda: 2).result())
+
+    # Verify that paging works with async for.
+    @requests_mock.Mocker()
+    def test_async_iterator(self, rm):
+        rm.get(
+            self.test_uri + "/v5/boards/test_board/pins",
+            json={"items": ["one", "two"], "bookmark": "BOOKMARK1"},
+        )
+        rm.get(
+            self.test_uri + "/v5/boards/test_board/pins?bookmark=BOOKMARK1",
+            json={"items": ["three"]},
+        )
+        rm.get(self.test_uri + "/test_iterpath", json={"items": ["four"]})
+
+        async def run(executor):
+            board = AsyncApiObject(
+                Board("test_board", self.api_config, self.access_token), executor
+            )
+            values = [value async for value in await board.get_pins()]
+            values += [
+                value async for value in await board.get_iterator("/test_iterpath")
+            ]
+            return values
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            self.assertEqual(
+                ["one", "two", "three", "four"], asyncio.run(run(executor))
+            )
+
+    # Verify that errors are the same as for synchronous requests.
+    @requests_mock.Mocker()
+    def test_async_errors(self, rm):
+        api_object = AsyncApiObject(ApiObject(self.api_config, self.access_token))
+        rm.get(
+            self.test_uri + "/rate_limit",
+            status_code=429,
+            reason="Too Many Requests",
+            json={},
+        )
+        rm.post(
+            self.test_uri + "/spam",
+            status_code=429,
+            reason="Too Many Requests",
+            json={"message": "Your request was blocked as spam."},
+        )
+
+        with self.assertRaises(RateLimitException):
+            asyncio.run(api_object.request_data("/rate_limit"))
+        with self.assertRaises(SpamException):
+            asyncio.run(api_object.post_data("/spam", {}))
+
+        # by default, there is one worker for each pooled connection
+        self.assertEqual(10, api_object.executor._max_workers)
+
+        # non-callable attributes are not wrapped
+        self.assertEqual(self.test_uri, api_object.api_uri)
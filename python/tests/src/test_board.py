@@ -93,3 +93,31 @@ class BoardTest(unittest.TestCase):
             {"owner": {"username": "test_board_username"}, "name": "Test Board Name"}
         )
         self.assertEqual("/test_board_username/test-board-name/", test_text_id)
+
+    # Verify that the snapshot lists the pins once and groups them by section.
+    @mock.patch("board.ApiObject.get_iterator")
+    @mock.patch("board.ApiObject.__init__")
+    def test_board_snapshot(self, mock_api_object_init, mock_api_object_get_iterator):
+        test_board = Board("test_board_id", "test_api_uri", "test_access_token")
+        sections = [{"id": "section_1"}, {"id": "section_2"}]
+        pins = [
+            {"id": "pin_1", "board_section_id": None},
+            {"id": "pin_2", "board_section_id": "section_2"},
+            {"id": "pin_3"},
+            {"id": "pin_4", "board_section_id": "section_2"},
+        ]
+        mock_api_object_get_iterator.side_effect = [iter(sections), iter(pins)]
+
+        snapshot = test_board.get_snapshot()
+        mock_api_object_get_iterator.assert_has_calls(
+            [
+                mock.call("/v5/boards/test_board_id/sections", None),
+                mock.call("/v5/boards/test_board_id/pins", None),
+            ]
+        )
+        self.assertEqual(sections, snapshot.sections)
+        self.assertEqual([pins[0], pins[2]], snapshot.board_pins)
+        self.assertEqual(
+            {"section_1": [], "section_2": [pins[1], pins[3]]}, snapshot.section_pins
+        )
+        self.assertEqual(4, snapshot.pin_count())
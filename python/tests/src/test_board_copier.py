@@ -0,0 +1,460 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import requests_mock
+
+from board_copier import BoardCopier
+from copy_journal import CopyJournal
+from copy_plan import CopyPlan
+from http_session import HttpSession
+
+
+def pin_data(pin_id, section_id=None, pin_type="pin"):
+    return {
+        "id": pin_id,
+        "type": pin_type,
+        "title": f"title {pin_id}",
+        "description": f"description {pin_id}",
+        "link": None,
+        "board_section_id": section_id,
+        "media": {"images": {"big": {"width": 10, "height": 10, "url": pin_id}}},
+    }
+
+
+def results_by_id(copier):
+    return {result["source_id"]: result for result in copier.results}
+
+
+class BoardCopierTest(unittest.TestCase):
+    test_uri = "https://test_host"
+
+    def setUp(self):
+        self.api_config = mock.Mock()
+        self.api_config.api_uri = self.test_uri
+        self.api_config.verbosity = 0
+        self.api_config.session = HttpSession()
+        self.source_token = mock.Mock()
+        self.source_token.header.return_value = {"Authorization": "Bearer source"}
+        self.target_token = mock.Mock()
+        self.target_token.header.return_value = {"Authorization": "Bearer target"}
+
+    def mock_source_board(self, rm):
+        rm.get(
+            self.test_uri + "/v5/boards/board1/sections",
+            json={"items": [{"id": "section1", "name": "one"}], "bookmark": None},
+        )
+        rm.get(
+            self.test_uri + "/v5/boards/board1/pins",
+            json={
+                "items": [
+                    pin_data("pin1"),
+                    pin_data("pin2", "section1"),
+                    pin_data("story", pin_type="story"),
+                    pin_data("spam"),
+                    pin_data("error"),
+                    pin_data("limited"),
+                ],
+                "bookmark": None,
+            },
+        )
+
+    # Verify that boards, sections, and pins are copied, and that the result
+    # of each pin is recorded.
+    @requests_mock.Mocker()
+    @mock.patch("board_copier.time")
+    @mock.patch("builtins.print")
+    def test_copy_board(self, rm, mock_print, mock_time):
+        # sleeping advances the clock
+        clock = [0.0]
+        mock_time.monotonic.side_effect = lambda: clock[0]
+        mock_time.sleep.side_effect = lambda delay: clock.__setitem__(
+            0, clock[0] + delay
+        )
+        self.mock_source_board(rm)
+        rm.post(self.test_uri + "/v5/boards", json={"id": "target_board", "name": "x"})
+        rm.post(
+            self.test_uri + "/v5/boards/target_board/sections",
+            json={"id": "target_section", "name": "one"},
+        )
+        limited_responses = [
+            {"status_code": 429, "reason": "Too Many Requests", "json": {}},
+            {"json": pin_data("target_limited")},
+        ]
+
+        def create_pin(request, context):
+            url = request.json()["media_source"]["url"]
+            if url == "spam":
+                context.status_code = 429
+                context.reason = "Too Many Requests"
+                return {"message": "Your request was blocked as spam."}
+            if url == "error":
+                context.status_code = 500
+                context.reason = "Internal Server Error"
+                return {}
+            if url == "limited":
+                response = limited_responses.pop(0)
+                context.status_code = response.get("status_code", 200)
+                context.reason = response.get("reason", "OK")
+                return response["json"]
+            return pin_data("target_" + url)
+
+        rm.post(self.test_uri + "/v5/pins", json=create_pin)
+
+        with BoardCopier(
+            self.api_config,
+            self.source_token,
+            self.target_token,
+            concurrency=3,
+            strategy="create",
+        ) as copier:
+            board_data = {"id": "board1", "name": "source name"}
+            target_board_data = copier.copy_board(board_data, name="target name")
+        self.assertEqual("target_board", target_board_data["id"])
+        self.assertEqual("source name", board_data["name"])  # not modified
+
+        board_request = rm.request_history[0]
+        self.assertEqual({"name": "target name"}, board_request.json())
+        self.assertEqual("Bearer target", board_request.headers["Authorization"])
+
+        # section pins are created in the corresponding section
+        pin_requests = {
+            request.json()["media_source"]["url"]: request.json()
+            for request in rm.request_history
+            if request.path == "/v5/pins"
+        }
+        self.assertEqual("target_section", pin_requests["pin2"]["board_section_id"])
+        self.assertNotIn("board_section_id", pin_requests["pin1"])
+        self.assertEqual("target_board", pin_requests["pin1"]["board_id"])
+        # the pins are listed once
+        self.assertEqual(
+            ["/v5/boards/board1/sections", "/v5/boards/board1/pins"],
+            [request.path for request in rm.request_history if request.method == "GET"],
+        )
+
+        results = {result["source_id"]: result for result in copier.results}
+        self.assertEqual(
+            {"copied": 3, "skipped": 1, "spam": 1, "failed": 1}, copier.summary()
+        )
+        self.assertEqual("target_pin2", results["pin2"]["target_id"])
+        self.assertEqual("target_limited", results["limited"]["target_id"])
+        self.assertEqual("skipped", results["story"]["status"])
+        self.assertIn("Internal Server Error", results["error"]["error"])
+        mock_time.sleep.assert_called_once_with(10.0)  # paused after the 429
+
+    # Verify that nothing is created with dry_run.
+    @requests_mock.Mocker()
+    @mock.patch("builtins.print")
+    def test_copy_board_dry_run(self, rm, mock_print):
+        self.mock_source_board(rm)
+        with BoardCopier(
+            self.api_config,
+            self.source_token,
+            self.target_token,
+            dry_run=True,
+            strategy="create",
+        ) as copier:
+            copier.copy_board({"id": "board1", "name": "source name"})
+        self.assertEqual([], copier.results)
+        self.assertEqual({"GET"}, {request.method for request in rm.request_history})
+
+    # Verify that a dry run counts the entities and requests of the copy.
+    @requests_mock.Mocker()
+    @mock.patch("builtins.print")
+    def test_copy_board_plan(self, rm, mock_print):
+        self.mock_source_board(rm)
+        with tempfile.TemporaryDirectory() as directory:
+            journal = CopyJournal(os.path.join(directory, "journal.ndjson"))
+            journal.record("board", "board1", "target_board")
+            journal.record("pin", "pin1", "target_pin1")
+            plan = CopyPlan(concurrency=2)
+            with BoardCopier(
+                self.api_config,
+                self.source_token,
+                self.target_token,
+                dry_run=True,
+                journal=journal,
+                strategy="create",
+                plan=plan,
+            ) as copier:
+                copier.copy_board({"id": "board1", "name": "source name"})
+            journal.close()
+
+        self.assertEqual({"board": 0, "section": 1, "pin": 4}, plan.create)
+        self.assertEqual({"board": 1, "section": 0, "pin": 1}, plan.present)
+        self.assertEqual(1, plan.skipped_pins)  # the story
+        self.assertEqual(
+            {"boards_read": 2, "boards_write": 1, "pins_write": 4}, plan.calls
+        )
+        # 3 requests one at a time and 4 pins two at a time
+        self.assertEqual(2.5, plan.wall_time())
+        self.assertEqual({"GET"}, {request.method for request in rm.request_history})
+
+    # Verify that a dry run with dedup counts every page of the listings of
+    # the source board and of the target account.
+    @requests_mock.Mocker()
+    @mock.patch("builtins.print")
+    def test_copy_board_plan_dedup(self, rm, mock_print):
+        self.mock_source_board(rm)
+        rm.get(
+            self.test_uri + "/v5/boards/board1/pins",
+            [
+                {"json": {"items": [pin_data("pin1")], "bookmark": "next"}},
+                {"json": {"items": [pin_data("pin2")], "bookmark": None}},
+            ],
+        )
+        rm.get(
+            self.test_uri + "/v5/boards",
+            json={"items": [{"id": "target_board", "name": "x"}], "bookmark": None},
+        )
+        rm.get(
+            self.test_uri + "/v5/boards/target_board/sections",
+            json={"items": [], "bookmark": None},
+        )
+        target_pin1 = dict(pin_data("pin1"), id="target_pin1")
+        rm.get(
+            self.test_uri + "/v5/boards/target_board/pins",
+            [
+                {"json": {"items": [], "bookmark": "next"}},
+                {"json": {"items": [target_pin1], "bookmark": None}},
+            ],
+        )
+        plan = CopyPlan()
+        with BoardCopier(
+            self.api_config,
+            self.source_token,
+            self.target_token,
+            dry_run=True,
+            strategy="create",
+            dedup=True,
+            plan=plan,
+        ) as copier:
+            copier.copy_board({"id": "board1", "name": "x"})
+
+        self.assertEqual({"board": 0, "section": 1, "pin": 1}, plan.create)
+        self.assertEqual({"board": 1, "section": 0, "pin": 1}, plan.present)
+        # each listing is counted with all of its pages
+        self.assertEqual(
+            len(rm.request_history),
+            plan.calls["boards_read"],
+        )
+        self.assertEqual(
+            {"boards_read": 7, "boards_write": 1, "pins_write": 1}, plan.calls
+        )
+
+    # Verify that dedup copies into the existing board and section, and skips
+    # the pins that are already on the target board.
+    @requests_mock.Mocker()
+    @mock.patch("builtins.print")
+    def test_copy_board_dedup(self, rm, mock_print):
+        self.mock_source_board(rm)
+        rm.get(
+            self.test_uri + "/v5/boards",
+            json={"items": [{"id": "target_board", "name": "x"}], "bookmark": None},
+        )
+        rm.get(
+            self.test_uri + "/v5/boards/target_board/sections",
+            json={"items": [{"id": "target_section", "name": "one"}], "bookmark": None},
+        )
+        # a copy of pin1, with the same link, title, and image
+        target_pin1 = dict(pin_data("pin1"), id="target_pin1")
+        rm.get(
+            self.test_uri + "/v5/boards/target_board/pins",
+            json={"items": [target_pin1], "bookmark": None},
+        )
+        rm.post(
+            self.test_uri + "/v5/pins",
+            json=lambda request, context: pin_data(
+                "target_" + request.json()["media_source"]["url"]
+            ),
+        )
+        with BoardCopier(
+            self.api_config,
+            self.source_token,
+            self.target_token,
+            strategy="create",
+            dedup=True,
+        ) as copier:
+            copier.copy_board({"id": "board1", "name": "x"})
+
+        results = {result["source_id"]: result for result in copier.results}
+        self.assertEqual(
+            {
+                "status": "already_copied",
+                "source_id": "pin1",
+                "target_id": "target_pin1",
+            },
+            results["pin1"],
+        )
+        self.assertEqual("copied", results["pin2"]["status"])
+        posts = [request for request in rm.request_history if request.method == "POST"]
+        # no board or section is created, and pin1 is not copied again
+        self.assertEqual(["/v5/pins"] * 4, [request.path for request in posts])
+        self.assertEqual(
+            "target_section",
+            [
+                request.json().get("board_section_id")
+                for request in posts
+                if request.json()["media_source"]["url"] == "pin2"
+            ][0],
+        )
+
+    # Verify that a copy with a journal continues after an interruption.
+    @requests_mock.Mocker()
+    @mock.patch("builtins.print")
+    def test_copy_board_journal(self, rm, mock_print):
+        self.mock_source_board(rm)
+        rm.post(self.test_uri + "/v5/boards", json={"id": "target_board", "name": "x"})
+        rm.post(
+            self.test_uri + "/v5/boards/target_board/sections",
+            json={"id": "target_section", "name": "one"},
+        )
+        rm.post(
+            self.test_uri + "/v5/pins",
+            json=lambda request, context: pin_data(
+                "target_" + request.json()["media_source"]["url"]
+            ),
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "journal.ndjson")
+            journal = CopyJournal(path)
+            journal.record("pin", "pin1", "target_pin1", "copied")
+            journal.record("pin", "spam", None, "spam")
+            journal.close()
+
+            # the first run is interrupted after the pins are listed
+            journal = CopyJournal(path)
+            with BoardCopier(
+                self.api_config,
+                self.source_token,
+                self.target_token,
+                journal=journal,
+                strategy="create",
+            ) as copier:
+                with mock.patch.object(
+                    copier, "_submit", side_effect=KeyboardInterrupt
+                ):
+                    with self.assertRaises(KeyboardInterrupt):
+                        copier.copy_board({"id": "board1", "name": "source name"})
+            journal.close()
+            self.assertEqual(  # board and section created
+                ["/v5/boards", "/v5/boards/target_board/sections"],
+                [r.path for r in rm.request_history if r.method == "POST"],
+            )
+
+            # the second run creates only the pins that have not been copied
+            rm.reset_mock()
+            journal = CopyJournal(path)
+            with BoardCopier(
+                self.api_config,
+                self.source_token,
+                self.target_token,
+                journal=journal,
+                strategy="create",
+            ) as copier:
+                copier.copy_board({"id": "board1", "name": "source name"})
+            journal.close()
+            created = [
+                request.json()["media_source"]["url"]
+                for request in rm.request_history
+                if request.method == "POST"
+            ]
+            self.assertEqual(["error", "limited", "pin2"], sorted(created))
+            self.assertEqual(
+                {"already_copied": 2, "copied": 3, "skipped": 1}, copier.summary()
+            )
+            self.assertEqual("target_pin2", results_by_id(copier)["pin2"]["target_id"])
+
+            # everything has been copied now
+            rm.reset_mock()
+            journal = CopyJournal(path)
+            with BoardCopier(
+                self.api_config,
+                self.source_token,
+                self.target_token,
+                journal=journal,
+                strategy="create",
+            ) as copier:
+                copier.copy_board({"id": "board1", "name": "source name"})
+            journal.close()
+            self.assertEqual(
+                {"GET"}, {request.method for request in rm.request_history}
+            )
+            self.assertEqual({"already_copied": 6}, copier.summary())
+
+    # Verify that pins are saved instead of created for the same account.
+    @requests_mock.Mocker()
+    @mock.patch("builtins.print")
+    def test_copy_board_strategy(self, rm, mock_print):
+        rm.get(
+            self.test_uri + "/v5/user_account",
+            json=lambda request, context: {
+                "username": request.headers["Authorization"].split()[1]
+            },
+        )
+
+        # the same token is the same account
+        copier = BoardCopier(self.api_config, self.source_token, self.source_token)
+        self.assertEqual("save", copier.pin_strategy())
+        copier.close()
+        self.assertEqual(0, rm.call_count)
+
+        # different accounts
+        copier = BoardCopier(self.api_config, self.source_token, self.target_token)
+        self.assertEqual("create", copier.pin_strategy())
+        copier.close()
+
+        # different tokens for the same account
+        self.target_token.header.return_value = {"Authorization": "Bearer source"}
+        copier = BoardCopier(self.api_config, self.source_token, self.target_token)
+        self.assertEqual("save", copier.pin_strategy())
+        copier.close()
+
+        # the strategy can be chosen explicitly
+        copier = BoardCopier(
+            self.api_config, self.source_token, self.source_token, strategy="create"
+        )
+        self.assertEqual("create", copier.pin_strategy())
+        copier.close()
+        with self.assertRaisesRegex(ValueError, "must be one of auto, create, save"):
+            BoardCopier(self.api_config, None, None, strategy="repin")
+
+        self.mock_source_board(rm)
+        rm.post(self.test_uri + "/v5/boards", json={"id": "target_board", "name": "x"})
+        rm.post(
+            self.test_uri + "/v5/boards/target_board/sections",
+            json={"id": "target_section", "name": "one"},
+        )
+        for pin_id in ["pin1", "pin2"]:
+            rm.post(
+                f"{self.test_uri}/v5/pins/{pin_id}/save",
+                json=pin_data("saved_" + pin_id),
+            )
+        for pin_id in ["spam", "error", "limited"]:
+            rm.post(
+                f"{self.test_uri}/v5/pins/{pin_id}/save",
+                status_code=500,
+                reason="Internal Server Error",
+                json={},
+            )
+        with BoardCopier(
+            self.api_config, self.source_token, self.source_token, concurrency=2
+        ) as copier:
+            copier.copy_board({"id": "board1", "name": "source name"}, name="copy")
+        self.assertEqual("saved_pin2", results_by_id(copier)["pin2"]["target_id"])
+        self.assertEqual({"copied": 2, "skipped": 1, "failed": 3}, copier.summary())
+        save_requests = {
+            request.path: request.json()
+            for request in rm.request_history
+            if request.path.endswith("/save")
+        }
+        self.assertEqual(
+            {"board_id": "target_board", "board_section_id": "target_section"},
+            save_requests["/v5/pins/pin2/save"],
+        )
+        self.assertEqual(
+            {"board_id": "target_board"}, save_requests["/v5/pins/pin1/save"]
+        )
+        self.assertNotIn("/v5/pins", [request.path for request in rm.request_history])
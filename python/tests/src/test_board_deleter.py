@@ -0,0 +1,87 @@
+import datetime
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import requests_mock
+
+from board_deleter import BoardDeleter, BoardFilter, read_board_ids
+from http_session import HttpSession
+
+
+def board_data(board_id, name, created_at="2022-06-01T12:00:00"):
+    return {
+        "id": board_id,
+        "name": name,
+        "created_at": created_at,
+        "owner": {"username": "tester"},
+    }
+
+
+class BoardDeleterTest(unittest.TestCase):
+    test_uri = "https://test_host"
+
+    def test_board_filter(self):
+        old = board_data("1", "load test 1", "2021-12-31T23:59:59")
+        new = board_data("2", "load test 2")
+        other = board_data("3", "recipes", "2020-01-01T00:00:00")
+
+        def matching(board_filter):
+            return [b["id"] for b in [old, new, other] if board_filter.matches(b)]
+
+        self.assertEqual(["1", "2", "3"], matching(BoardFilter()))
+        self.assertEqual(["1", "2"], matching(BoardFilter(name_pattern="^load test")))
+        created_before = datetime.date(2022, 1, 1)
+        self.assertEqual(
+            ["1", "3"], matching(BoardFilter(created_before=created_before))
+        )
+        self.assertEqual(
+            ["1"],
+            matching(BoardFilter(name_pattern="load", created_before=created_before)),
+        )
+        self.assertEqual(["2", "3"], matching(BoardFilter(board_ids=["2", "3", "4"])))
+        self.assertEqual([], matching(BoardFilter(board_ids=[])))
+
+        # boards without a creation time are never considered old
+        self.assertFalse(
+            BoardFilter(created_before=created_before).matches({"id": "4"})
+        )
+
+    def test_read_board_ids(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "boards.txt")
+            with open(path, "w") as board_file:
+                board_file.write("# boards from the load test\n123\n\n  456  \n")
+            self.assertEqual(["123", "456"], read_board_ids(path))
+
+    @requests_mock.Mocker()
+    @mock.patch("builtins.print")
+    def test_delete_boards(self, rm, mock_print):
+        api_config = mock.Mock()
+        api_config.api_uri = self.test_uri
+        api_config.verbosity = 1
+        api_config.session = HttpSession()
+        access_token = mock.Mock()
+        access_token.header.return_value = {"Authorization": "Bearer token"}
+
+        for board_id in ["1", "2", "4"]:
+            rm.delete(self.test_uri + f"/v5/boards/{board_id}", status_code=204)
+        rm.delete(
+            self.test_uri + "/v5/boards/3",
+            status_code=404,
+            reason="Not Found",
+            json={"code": 40, "message": "Board not found."},
+        )
+
+        with BoardDeleter(api_config, access_token, concurrency=2) as deleter:
+            deleter.skip(board_data("5", "keep"))
+            deleter.delete_boards(
+                [board_data(board_id, "load test") for board_id in ["1", "2", "3", "4"]]
+            )
+
+        self.assertEqual({"deleted": 3, "failed": 1, "skipped": 1}, deleter.summary())
+        failed = [r for r in deleter.results if r["status"] == "failed"]
+        self.assertEqual("3", failed[0]["board_id"])
+        self.assertEqual(4, rm.call_count)
+        mock_print.assert_any_call("deleted board /tester/load-test/")
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+from copy_journal import CopyJournal
+
+
+class CopyJournalTest(unittest.TestCase):
+    def test_copy_journal(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "journal.ndjson")
+            journal = CopyJournal(path)
+            self.assertIsNone(journal.get("board", "1"))
+            journal.record("board", "1", "101")
+            journal.record("pin", "2", None, "spam")
+            self.assertEqual("101", journal.target("board", "1"))
+            journal.close()
+
+            # simulate a crash while writing an entry
+            with open(path, "a") as journal_file:
+                journal_file.write('{"kind": "pin", "sou')
+
+            journal = CopyJournal(path)
+            self.assertEqual("101", journal.target("board", "1"))
+            self.assertEqual(
+                {"kind": "pin", "source": "2", "target": None, "status": "spam"},
+                journal.get("pin", "2"),
+            )
+            self.assertIsNone(journal.target("board", "2"))  # same id, other kind
+            journal.record("section", "3", "103")
+            journal.close()
+
+            journal = CopyJournal(path)
+            self.assertEqual("103", journal.target("section", "3"))
+            journal.close()
+
+    def test_target_account(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "journal.ndjson")
+            journal = CopyJournal(path, "target_user")
+            journal.record("board", "1", "101")
+            journal.close()
+
+            journal = CopyJournal(path, "target_user")
+            self.assertEqual("target_user", journal.target_account)
+            self.assertEqual("101", journal.target("board", "1"))
+            journal.close()
+
+            # the boards in the journal do not exist in another account
+            with self.assertRaisesRegex(
+                ValueError, "is for target account target_user, not other_user"
+            ):
+                CopyJournal(path, "other_user")
+
+            # the account is recorded once
+            with open(path) as journal_file:
+                self.assertEqual(2, len(journal_file.readlines()))
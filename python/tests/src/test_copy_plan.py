@@ -0,0 +1,35 @@
+import unittest
+from unittest import mock
+
+from copy_plan import CopyPlan
+
+
+class CopyPlanTest(unittest.TestCase):
+    def test_copy_plan(self):
+        plan = CopyPlan({"pins_write": 60}, concurrency=4, latency=1.0)
+        plan.add("board")
+        plan.add("pin")
+        plan.add("pin", present=True)
+        plan.add_calls("POST", "/v5/boards")
+        plan.add_calls("GET", "/v5/boards/1/pins", 2)
+        plan.add_calls("POST", "/v5/pins", 40)
+        self.assertEqual({"board": 1, "section": 0, "pin": 1}, plan.create)
+        self.assertEqual({"board": 0, "section": 0, "pin": 1}, plan.present)
+        self.assertEqual(
+            {"boards_write": 1, "boards_read": 2, "pins_write": 40}, plan.calls
+        )
+
+        # limited by the latency: 3 requests at a time and 40 requests 4 at a time
+        self.assertEqual(13.0, plan.wall_time())
+
+        # limited by the rate: 100 requests after a burst of 60, at 1 per second
+        plan.add_calls("POST", "/v5/pins", 120)
+        self.assertEqual(100.0, plan.wall_time())
+
+        with mock.patch("builtins.print") as mock_print:
+            plan.print_summary()
+        mock_print.assert_any_call("pins: 1 to create, 1 already present")
+        mock_print.assert_any_call("  pins_write: 160 (limit 60 per minute)")
+        mock_print.assert_any_call(
+            "expected time: 1 minutes 40 seconds with concurrency 4"
+        )
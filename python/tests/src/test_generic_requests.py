@@ -24,3 +24,15 @@ class GenericRequestsTest(unittest.TestCase):
         mock_file.write.assert_has_calls(
             [call("chunk 1"), call("chunk 2"), call("chunk 3")]
         )
+
+    @mock.patch("builtins.open")
+    def test_downloadfile_with_session(self, mock_open):
+        response = mock.MagicMock()
+        response.iter_content.return_value = ["chunk 1"]
+        response.__enter__.return_value = response  # for context manager
+        session = mock.Mock()
+        session.get.return_value = response
+
+        download_file("test_url", "/test/download/path", session=session)
+        session.get.assert_called_once_with("test_url", stream=True)
+        mock_open.assert_called_once_with("/test/download/path", "wb")
@@ -0,0 +1,128 @@
+import gzip
+import json
+import unittest
+from unittest import mock
+
+import requests
+import requests_mock
+
+from http_session import HttpSession
+from json_codec import JsonCodec
+from retry_policy import RetryPolicy
+
+
+class HttpSessionTest(unittest.TestCase):
+    def test_pool_configuration(self):
+        session = HttpSession(pool_connections=3, pool_maxsize=7)
+        for prefix in ["https://", "http://"]:
+            adapter = session.get_adapter(prefix + "api.pinterest.com")
+            self.assertEqual(3, adapter._pool_connections)
+            self.assertEqual(7, adapter._pool_maxsize)
+        self.assertEqual("keep-alive", session.headers["Connection"])
+
+    @requests_mock.Mocker()
+    def test_keep_alive(self, rm):
+        rm.get("https://test_host/test_path", json={})
+
+        # by default, connections are kept open for reuse
+        HttpSession().get("https://test_host/test_path")
+        self.assertNotEqual("close", rm.last_request.headers.get("Connection"))
+
+        # otherwise, the session asks the server to close the connection
+        HttpSession(keep_alive=False).get("https://test_host/test_path")
+        self.assertEqual("close", rm.last_request.headers["Connection"])
+
+    @requests_mock.Mocker()
+    @mock.patch("http_session.time.sleep")
+    def test_retry(self, rm, mock_sleep):
+        session = HttpSession(retry_policy=RetryPolicy(max_retries=3))
+        rm.get(
+            "https://test_host/test_path",
+            [
+                {"status_code": 429, "headers": {"Retry-After": "2"}},
+                {"status_code": 503, "headers": {"Retry-After": "3"}},
+                {"status_code": 200, "json": {"key": "value"}},
+            ],
+        )
+        response = session.get("https://test_host/test_path")
+        self.assertEqual({"key": "value"}, response.json())
+        self.assertEqual(2, response.retries)
+        self.assertEqual(5.0, response.retry_sleep)
+        mock_sleep.assert_has_calls([mock.call(2.0), mock.call(3.0)])
+        self.assertEqual(2, session.retries)
+        self.assertEqual(5.0, session.retry_sleep)
+
+        # POST is not retried unless it is marked as safe
+        rm.post(
+            "https://test_host/test_path",
+            [
+                {"status_code": 429, "headers": {"Retry-After": "1"}},
+                {"status_code": 200, "json": {}},
+            ],
+        )
+        response = session.post("https://test_host/test_path")
+        self.assertEqual(429, response.status_code)
+        self.assertEqual(0, response.retries)
+        rm.post(
+            "https://test_host/test_path",
+            [
+                {"status_code": 429, "headers": {"Retry-After": "1"}},
+                {"status_code": 200, "json": {}},
+            ],
+        )
+        response = session.post("https://test_host/test_path", retry_safe=True)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(1, response.retries)
+
+        # connection errors are retried, up to the maximum number of retries
+        rm.get("https://test_host/down", exc=requests.ConnectionError)
+        with self.assertRaises(requests.ConnectionError):
+            session.get("https://test_host/down")
+        self.assertEqual(6, session.retries)
+
+    @requests_mock.Mocker()
+    @mock.patch("http_session.time.sleep")
+    def test_no_retry(self, rm, mock_sleep):
+        # by default, the session does not retry
+        rm.get("https://test_host/test_path", status_code=500)
+        response = HttpSession().get("https://test_host/test_path")
+        self.assertEqual(500, response.status_code)
+        self.assertEqual(0, response.retries)
+        mock_sleep.assert_not_called()
+
+    # Verify that the JSON codec is used for requests and responses, and that
+    # large request bodies are compressed.
+    @requests_mock.Mocker()
+    def test_json_codec(self, rm):
+        class TestCodec(JsonCodec):
+            name = "test"
+
+            def dumps(self, data):
+                return b"test" + super().dumps(data)
+
+            def loads(self, content):
+                return {"decoded": super().loads(content)}
+
+        url = "https://test_host/test_path"
+        rm.post(url, json={"key": "value"})
+        data = {"key": "x" * 100}
+
+        # the standard library is used by default, exactly as by requests
+        session = HttpSession()
+        self.assertIn("gzip", session.headers["Accept-Encoding"])
+        response = session.post(url, json=data)
+        self.assertEqual(data, rm.last_request.json())
+        self.assertEqual("application/json", rm.last_request.headers["Content-Type"])
+        self.assertEqual({"key": "value"}, response.json())
+
+        session = HttpSession(json_codec=TestCodec(), gzip_min_bytes=100)
+        headers = {"Authorization": "Bearer test"}
+        response = session.post(url, json={"short": 1}, headers=headers)
+        self.assertEqual(b'test{"short": 1}', rm.last_request.body)
+        self.assertEqual({"decoded": {"key": "value"}}, response.json())
+        self.assertEqual({"Authorization": "Bearer test"}, headers)  # unchanged
+
+        session.post(url, json=data, headers=headers)
+        self.assertEqual("gzip", rm.last_request.headers["Content-Encoding"])
+        self.assertEqual("application/json", rm.last_request.headers["Content-Type"])
+        self.assertEqual(data, json.loads(gzip.decompress(rm.last_request.body)[4:]))
@@ -0,0 +1,37 @@
+import unittest
+from unittest import mock
+
+import requests
+
+from json_codec import JsonCodec, OrjsonCodec, get_json_codec
+
+
+class JsonCodecTest(unittest.TestCase):
+    def test_get_json_codec(self):
+        self.assertIsInstance(get_json_codec("json"), JsonCodec)
+        with self.assertRaisesRegex(ValueError, "must be one of auto, json, orjson"):
+            get_json_codec("simplejson")
+
+        with mock.patch("json_codec.orjson", None):
+            self.assertEqual("json", get_json_codec("auto").name)
+            with self.assertRaisesRegex(ValueError, "requires the orjson package"):
+                get_json_codec("orjson")
+
+        with mock.patch("json_codec.orjson"):
+            self.assertEqual("orjson", get_json_codec("auto").name)
+            self.assertIsInstance(get_json_codec("orjson"), OrjsonCodec)
+
+    def test_json_codec(self):
+        codec = JsonCodec()
+        data = {"title": "café", "items": [1, 2.5, None, True]}
+        encoded = codec.dumps(data)
+        self.assertIsInstance(encoded, bytes)
+        self.assertEqual(data, codec.loads(encoded))
+
+        # errors are the same as for response.json()
+        response = requests.Response()
+        response._content = b"not json"
+        with self.assertRaises(requests.JSONDecodeError):
+            codec.response_json(response)
+        with self.assertRaises(ValueError):
+            codec.dumps(float("nan"))
@@ -0,0 +1,62 @@
+import json
+import unittest
+from unittest import mock
+
+from json_stream import JsonItemStream
+
+
+class JsonItemStreamTest(unittest.TestCase):
+    def stream(self, text, chunk_size):
+        data = text.encode("utf-8")
+        response = mock.Mock()
+        chunks = [data[i:][:chunk_size] for i in range(0, len(data), chunk_size)]
+        response.iter_content.return_value = iter(chunks)
+        return JsonItemStream(response), response
+
+    # Verify that the items and the other fields are decoded for any chunk size,
+    # including values and multi-byte characters split between chunks.
+    def test_json_item_stream(self):
+        page = {
+            "items": [
+                {"id": "1", "title": "café ☃", "media": {"images": [1, 2]}},
+                12345,
+                -1.5e3,
+                'a string with "quotes" and ] and }',
+                None,
+                True,
+                [],
+            ],
+            "bookmark": "BOOKMARK",
+            "count": 1234567,
+        }
+        for indent in [None, 2]:
+            text = json.dumps(page, indent=indent, ensure_ascii=False)
+            for chunk_size in [1, 2, 3, 7, 1000]:
+                stream, response = self.stream(text, chunk_size)
+                self.assertEqual(page["items"], list(stream))
+                self.assertEqual(
+                    {"bookmark": "BOOKMARK", "count": 1234567}, stream.fields
+                )
+                response.close.assert_called_once_with()
+
+    # Verify that the bookmark can come before the items and that items
+    # may be empty or missing.
+    def test_json_item_stream_order(self):
+        stream, _ = self.stream('{"bookmark": "B1", "items": [1, 2]}', 5)
+        self.assertTrue(stream.peek())
+        self.assertEqual("B1", stream.fields["bookmark"])
+        self.assertEqual([1, 2], list(stream))
+
+        stream, _ = self.stream(' { "items" : [ ] , "bookmark" : null } ', 4)
+        self.assertEqual([], list(stream))
+        self.assertEqual({"bookmark": None}, stream.fields)
+
+        stream, _ = self.stream("{}", 4)
+        self.assertFalse(stream.peek())
+        self.assertEqual({}, stream.fields)
+
+    def test_json_item_stream_errors(self):
+        for text in ["", "[1, 2]", '{"items": [1, 2', '{"items": [1 2]}', "{1: 2}"]:
+            stream, _ = self.stream(text, 3)
+            with self.assertRaises(json.JSONDecodeError):
+                list(stream)
@@ -0,0 +1,51 @@
+import hashlib
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from media_cache import MediaCache, file_sha256
+
+
+class MediaCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.directory.name, "media.json")
+        self.video_path = os.path.join(self.directory.name, "video.mp4")
+        with open(self.video_path, "wb") as video_file:
+            video_file.write(b"pinteresty video" * 1000)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_file_sha256(self):
+        expected = hashlib.sha256(b"pinteresty video" * 1000).hexdigest()
+        self.assertEqual(expected, file_sha256(self.video_path))
+        self.assertEqual(expected, file_sha256(self.video_path, chunk_size=7))
+
+    def test_media_cache(self):
+        cache = MediaCache(self.cache_path)
+        key = cache.key(self.video_path, "pindexter")
+        self.assertIsNone(cache.get(key))
+        cache.put(key, "12345")
+        self.assertEqual("12345", cache.get(key))
+        self.assertEqual("registered", cache.status("12345"))
+        cache.set_status("12345", "succeeded")
+
+        # the cache is persistent
+        cache = MediaCache(self.cache_path)
+        self.assertEqual("12345", cache.get(key))
+        self.assertEqual("succeeded", cache.status("12345"))
+        self.assertIsNone(cache.status("67890"))
+
+        # media may only be used by the user who uploaded it
+        other_key = cache.key(self.video_path, "other_user")
+        self.assertIsNone(cache.get(other_key))
+
+        # old and failed uploads are not reused
+        later = time.time() + cache.max_age + 1
+        with mock.patch("media_cache.time.time", return_value=later):
+            self.assertIsNone(cache.get(key))
+        cache.set_status("12345", "failed")
+        self.assertIsNone(cache.get(key))
@@ -0,0 +1,136 @@
+import unittest
+from unittest import mock
+
+from media_upload_manager import MediaUploadManager
+
+
+class MediaListIterator:
+    # stands in for the PagedIterator returned by get_iterator
+    def __init__(self, items):
+        self.items = iter(items)
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.items)
+
+    def close(self):
+        self.closed = True
+
+
+class MediaUploadManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.media_object = mock.Mock()
+        self.media_object.media_cache = None
+        self.media_object.media_to_media_id.side_effect = lambda path: {
+            "one.mp4": "111",
+            "two.mp4": "222",
+            "three.mp4": "333",
+        }[path]
+        self.iterators = []
+
+    def media_list(self, *statuses):
+        # each call of get_iterator returns the next list of statuses,
+        # and the last list is returned once the others have been used
+        lists = list(statuses)
+
+        def get_iterator(path, query):
+            self.assertEqual("/v5/media", path)
+            current = lists.pop(0) if len(lists) > 1 else lists[0]
+            media_list = MediaListIterator(
+                [
+                    {"media_id": media_id, "status": status}
+                    for media_id, status in current.items()
+                ]
+            )
+            self.iterators.append(media_list)
+            return media_list
+
+        self.media_object.get_iterator.side_effect = get_iterator
+
+    def test_upload(self):
+        self.media_list(
+            {"111": "registered", "222": "registered", "999": "succeeded"},
+            {"111": "processing", "222": "succeeded"},
+            {"111": "succeeded"},
+        )
+        with MediaUploadManager(
+            self.media_object, min_delay=0.001, max_delay=0.01
+        ) as manager:
+            futures = [manager.upload(path) for path in ["one.mp4", "two.mp4"]]
+            self.assertEqual(["111", "222"], [f.result(5) for f in futures])
+
+        # all of the media were found in the list
+        self.media_object.request_data.assert_not_called()
+        self.assertTrue(self.iterators)
+        self.assertTrue(all(media_list.closed for media_list in self.iterators))
+
+    def test_upload_once(self):
+        # the same media is uploaded once
+        self.media_list({"111": "succeeded"})
+        with MediaUploadManager(self.media_object, min_delay=0.001) as manager:
+            future = manager.upload("one.mp4")
+            self.assertIs(future, manager.upload("one.mp4"))
+            self.assertEqual("111", future.result(5))
+        self.media_object.media_to_media_id.assert_called_once_with("one.mp4")
+
+    def test_upload_not_listed(self):
+        # media that are not in the list are requested one at a time
+        self.media_list({"111": "succeeded"}, {})
+        self.media_object.request_data.return_value = {
+            "media_id": "333",
+            "status": "failed",
+        }
+        with MediaUploadManager(
+            self.media_object, min_delay=0.001, max_delay=0.01
+        ) as manager:
+            one = manager.upload("one.mp4")
+            three = manager.upload("three.mp4")
+            self.assertEqual("111", one.result(5))
+            with self.assertRaisesRegex(RuntimeError, "media upload 333 failed"):
+                three.result(5)
+        self.media_object.request_data.assert_called_with("/v5/media/333")
+
+    def test_upload_error(self):
+        self.media_object.media_to_media_id.side_effect = FileNotFoundError("gone")
+        with MediaUploadManager(self.media_object, min_delay=0.001) as manager:
+            future = manager.upload("missing.mp4")
+            with self.assertRaises(FileNotFoundError):
+                future.result(5)
+        self.media_object.get_iterator.assert_not_called()
+
+    def test_upload_cached(self):
+        media_cache = mock.Mock()
+        media_cache.status.return_value = "succeeded"
+        self.media_object.media_cache = media_cache
+        with MediaUploadManager(self.media_object, min_delay=0.001) as manager:
+            self.assertEqual("111", manager.upload("one.mp4").result(5))
+        self.media_object.get_iterator.assert_not_called()
+
+    def test_upload_sets_cache_status(self):
+        media_cache = mock.Mock()
+        media_cache.status.return_value = "registered"
+        self.media_object.media_cache = media_cache
+        self.media_list({"111": "succeeded"})
+        with MediaUploadManager(self.media_object, min_delay=0.001) as manager:
+            self.assertEqual("111", manager.upload("one.mp4").result(5))
+        media_cache.set_status.assert_called_once_with("111", "succeeded")
+
+    def test_adaptive_delay(self):
+        manager = MediaUploadManager(self.media_object, min_delay=1, max_delay=4)
+        try:
+            future = mock.Mock()
+            manager.pending["111"] = (future, None)
+            delays = []
+            for status in ["registered", "processing", "processing", "processing"]:
+                self.assertTrue(manager._update({"111": status}))
+                delays.append(manager.delay)
+            self.assertEqual([1, 1, 2, 4], delays)  # doubles without progress
+
+            self.assertFalse(manager._update({"111": "succeeded"}))
+            self.assertEqual(1, manager.delay)
+            future.set_result.assert_called_once_with("111")
+        finally:
+            manager.close()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from multipart_stream import MultipartStream
+
+
+class MultipartStreamTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.directory.name, "video.mp4")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_file(self, content):
+        with open(self.file_path, "wb") as media_file:
+            media_file.write(content)
+
+    def test_multipart_stream(self):
+        content = bytes(range(256)) * 40
+        self.write_file(content)
+        progress = mock.Mock()
+        with MultipartStream(
+            self.file_path, {"key": "value"}, chunk_size=1000, progress=progress
+        ) as stream:
+            chunks = list(stream)
+            body = b"".join(chunks)
+            self.assertEqual(len(stream), len(body))
+            # head, 11 chunks of the file (the last one is short), tail
+            self.assertEqual(13, len(chunks))
+            self.assertTrue(all(len(chunk) <= 1000 for chunk in chunks[1:-1]))
+
+            boundary = stream.boundary.encode()
+            self.assertEqual(
+                b"--" + boundary + b"\r\n"
+                b'Content-Disposition: form-data; name="key"\r\n\r\n'
+                b"value\r\n"
+                b"--" + boundary + b"\r\n"
+                b'Content-Disposition: form-data; name="file"\r\n\r\n'
+                + content
+                + b"\r\n--"
+                + boundary
+                + b"--\r\n",
+                body,
+            )
+            self.assertEqual(
+                {"Content-Type": f"multipart/form-data; boundary={stream.boundary}"},
+                stream.headers(),
+            )
+
+            self.assertEqual(13, progress.call_count)
+            progress.assert_called_with(len(body), len(body))
+            self.assertEqual(len(body), stream.bytes_sent)
+            self.assertGreater(stream.throughput(), 0)
+
+            # the stream can be sent again
+            self.assertEqual(body, b"".join(stream))
+
+    def test_multipart_stream_empty_file(self):
+        self.write_file(b"")
+        with MultipartStream(self.file_path) as stream:
+            self.assertEqual(0.0, stream.throughput())
+            body = b"".join(stream)
+            self.assertEqual(len(stream), len(body))
+            self.assertTrue(
+                body.endswith(
+                    b'name="file"\r\n\r\n\r\n--' + stream.boundary.encode() + b"--\r\n"
+                )
+            )
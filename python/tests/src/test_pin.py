@@ -159,6 +159,7 @@ class PinTest(unittest.TestCase):
         mock_api_object_init.assert_called_once_with(
             "test_api_uri", "test_access_token"
         )
+        test_pin.media_cache = None  # set by ApiMediaObject.__init__
 
         # simulated responses to upload status
         mock_api_object_request_data.side_effect = [
@@ -250,6 +251,52 @@ class PinTest(unittest.TestCase):
             [call(1), call(2), call(4), call(8), call(10), call(10)]
         )
 
+    # Verify that the media cache saves the status of processed media.
+    @mock.patch("pin.ApiMediaObject.request_data")
+    @mock.patch("pin.ApiMediaObject.__init__")
+    def test_check_media_id_cache(
+        self, mock_api_object_init, mock_api_object_request_data
+    ):
+        test_pin = Pin(None, "test_api_uri", "test_access_token")
+        test_pin.media_cache = mock.Mock()
+        test_pin.media_cache.status.return_value = "registered"
+        mock_api_object_request_data.return_value = {"status": "succeeded"}
+        test_pin.check_media_id("test_media_id")
+        test_pin.media_cache.set_status.assert_called_once_with(
+            "test_media_id", "succeeded"
+        )
+
+        # media that has been processed is not checked again
+        mock_api_object_request_data.reset_mock()
+        test_pin.media_cache.status.return_value = "succeeded"
+        test_pin.check_media_id("test_media_id")
+        mock_api_object_request_data.assert_not_called()
+
+    # Verify that a MediaUploadManager uploads the media and waits for it.
+    @mock.patch("pin.ApiMediaObject.post_data")
+    @mock.patch("pin.ApiMediaObject.request_data")
+    @mock.patch("pin.ApiMediaObject.__init__")
+    def test_video_pin_create_uploads(
+        self, mock_api_object_init, mock_api_object_request_data, mock_post_data
+    ):
+        test_pin = Pin(None, "test_api_uri", "test_access_token")
+        uploads = mock.Mock()
+        uploads.upload.return_value.result.return_value = "test_media_id"
+        mock_post_data.return_value = {"id": "new_pin_id"}
+        pin_data = {"media": {"images": {"big": {"width": 1, "height": 1, "url": "u"}}}}
+
+        test_pin.create(pin_data, "test_board_id", media="video.mp4", uploads=uploads)
+        uploads.upload.assert_called_once_with("video.mp4")
+        mock_api_object_request_data.assert_not_called()  # processed by uploads
+        self.assertEqual(
+            {
+                "source_type": "video_id",
+                "cover_image_url": "u",
+                "media_id": "test_media_id",
+            },
+            mock_post_data.call_args.args[1]["media_source"],
+        )
+
     # verify the logic used to upload a media file
     @mock.patch("pin.ApiMediaObject.upload_file_multipart")
     @mock.patch("pin.ApiMediaObject.post_data")
@@ -0,0 +1,50 @@
+import unittest
+from unittest import mock
+
+from pin_index import PinIndex, pin_fingerprint
+
+
+def pin_data(pin_id, link="https://example.com", title="title", image="abc.jpg"):
+    return {
+        "id": pin_id,
+        "link": link,
+        "title": title,
+        "media": {
+            "images": {
+                "150x150": {
+                    "width": 150,
+                    "height": 150,
+                    "url": f"https://i.pinimg.com/150x150/{image}",
+                },
+                "1200x": {
+                    "width": 1200,
+                    "height": 900,
+                    "url": f"https://i.pinimg.com/1200x/{image}",
+                },
+            }
+        },
+    }
+
+
+class PinIndexTest(unittest.TestCase):
+    def test_pin_fingerprint(self):
+        self.assertEqual(
+            ("https://example.com", "title", "abc.jpg"), pin_fingerprint(pin_data("1"))
+        )
+        # copies of the image are served from other hosts and directories
+        copy = pin_data("2")
+        copy["media"]["images"]["1200x"]["url"] = "https://i2.pinimg.com/x/abc.jpg"
+        self.assertEqual(pin_fingerprint(pin_data("1")), pin_fingerprint(copy))
+        self.assertEqual(("", "", None), pin_fingerprint({"id": "3", "link": None}))
+
+    def test_pin_index(self):
+        board = mock.Mock()
+        board.get_pins.return_value = iter(
+            [pin_data("1"), pin_data("2", title="other"), pin_data("3")]
+        )
+        index = PinIndex.from_board(board)
+        self.assertEqual(2, len(index))
+        self.assertEqual("1", index.get(pin_data("source1")))  # first pin wins
+        self.assertEqual("2", index.get(pin_data("source2", title="other")))
+        self.assertIsNone(index.get(pin_data("source3", link=None)))
+        self.assertIsNone(index.get(pin_data("source4", image="def.jpg")))
@@ -0,0 +1,148 @@
+import threading
+import unittest
+from unittest import mock
+
+import requests_mock
+
+from http_session import HttpSession
+from rate_limiter import RateLimiter, TokenBucket, endpoint_category, parse_rate_limits
+
+
+class MockClock:
+    """
+    Replaces time.monotonic and time.sleep so that sleeping advances the clock.
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class RateLimiterTest(unittest.TestCase):
+    def test_endpoint_category(self):
+        base = "https://api.pinterest.com"
+        self.assertEqual("pins_read", endpoint_category("GET", base + "/v5/pins/1"))
+        self.assertEqual("pins_write", endpoint_category("POST", base + "/v5/pins"))
+        self.assertEqual("pins_write", endpoint_category("POST", base + "/v5/media"))
+        self.assertEqual(
+            "boards_write", endpoint_category("DELETE", base + "/v5/boards/2")
+        )
+        self.assertEqual(
+            "boards_read", endpoint_category("GET", base + "/v5/boards/2/pins?x=y")
+        )
+        self.assertEqual(
+            "ads_analytics",
+            endpoint_category("GET", base + "/v5/ad_accounts/3/campaigns/analytics"),
+        )
+        self.assertEqual(
+            "ads_analytics",
+            endpoint_category("POST", base + "/v5/ad_accounts/3/reports"),
+        )
+        self.assertEqual(
+            "ads_read", endpoint_category("GET", base + "/v5/ad_accounts/3/ads")
+        )
+        self.assertEqual(
+            "org_analytics", endpoint_category("GET", base + "/v5/pins/4/analytics")
+        )
+        self.assertEqual(
+            "org_analytics",
+            endpoint_category("GET", base + "/v5/user_account/analytics?a=b"),
+        )
+        self.assertEqual(
+            "org_read", endpoint_category("GET", base + "/v5/user_account")
+        )
+
+    def test_parse_rate_limits(self):
+        self.assertEqual({}, parse_rate_limits(""))
+        self.assertEqual(
+            {"pins_write": 60.0, "ads_analytics": 100.0},
+            parse_rate_limits("pins_write=60, ads_analytics=100"),
+        )
+        with self.assertRaisesRegex(ValueError, "invalid rate limit: oops"):
+            parse_rate_limits("oops")
+        for value in ["pins_write=0", "pins_write=-1"]:
+            with self.assertRaisesRegex(ValueError, "rate limit must be positive"):
+                parse_rate_limits(value)
+        with self.assertRaisesRegex(ValueError, "rate must be positive"):
+            TokenBucket(0, 0.0)
+
+    def test_token_bucket(self):
+        clock = MockClock()
+        with mock.patch("rate_limiter.time", clock):
+            bucket = TokenBucket(2, 1.0)  # burst of 2, then 1 per second
+
+            self.assertEqual(0.0, bucket.acquire())
+            self.assertEqual(0.0, bucket.acquire())
+            self.assertEqual(1.0, bucket.acquire())
+            self.assertEqual([1.0], clock.sleeps)
+
+            # the server says that the budget is exhausted for 30 seconds
+            bucket.update(limit=120, remaining=0, reset=30, window=60)
+            self.assertEqual(30.0, bucket.acquire())
+            self.assertEqual(2.0, bucket.rate)
+            self.assertEqual(31.0, bucket.wait_time)
+
+    @requests_mock.Mocker()
+    def test_rate_limiter_session(self, rm):
+        clock = MockClock()
+        rm.get(
+            "https://test_host/v5/pins/1",
+            headers={"x-ratelimit-limit": "60, 60;w=60", "x-ratelimit-remaining": "1"},
+            json={},
+        )
+        rm.get("https://test_host/v5/boards/1", json={})
+        limiter = RateLimiter({"pins_read": 10})
+        session = HttpSession(rate_limiter=limiter)
+        header_1 = {"Authorization": "Bearer token-1"}
+        header_2 = {"Authorization": "Bearer token-2"}
+
+        with mock.patch("rate_limiter.time", clock):
+            # the first response reduces the budget to 1 request
+            session.get("https://test_host/v5/pins/1", headers=header_1)
+            response = session.get("https://test_host/v5/pins/1", headers=header_1)
+            self.assertEqual(0.0, response.rate_limit_wait)
+            response = session.get("https://test_host/v5/pins/1", headers=header_1)
+            self.assertEqual(1.0, response.rate_limit_wait)  # 60 per minute
+
+            # other tokens, other categories, and requests without
+            # authorization have their own budgets
+            response = session.get("https://test_host/v5/pins/1", headers=header_2)
+            self.assertEqual(0.0, response.rate_limit_wait)
+            response = session.get("https://test_host/v5/boards/1", headers=header_1)
+            self.assertEqual(0.0, response.rate_limit_wait)
+            response = session.get("https://test_host/v5/pins/1")
+            self.assertEqual(0.0, response.rate_limit_wait)
+
+        self.assertEqual(3, len(limiter.buckets))
+        self.assertEqual(
+            {"boards_read", "pins_read"},
+            {category for (_, category) in limiter.buckets},
+        )
+
+    def test_threads(self):
+        # many threads share a bucket without exceeding the budget
+        clock = MockClock()
+        clock_lock = threading.Lock()
+
+        def sleep(seconds):
+            with clock_lock:
+                clock.sleep(seconds)
+
+        with mock.patch("rate_limiter.time") as mock_time:
+            mock_time.monotonic = clock.monotonic
+            mock_time.sleep = sleep
+            bucket = TokenBucket(5, 5.0)
+            threads = [threading.Thread(target=bucket.acquire) for _ in range(20)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        # 5 requests in the initial burst, then 15 more at 5 per second
+        self.assertGreaterEqual(clock.now - 1000.0, 3.0 - 1e-6)
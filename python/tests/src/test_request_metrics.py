@@ -0,0 +1,93 @@
+import json
+import os
+import tempfile
+import unittest
+
+import requests
+import requests_mock
+
+from http_session import HttpSession
+from request_metrics import LatencyHistogram, RequestMetrics, path_template
+
+
+class RequestMetricsTest(unittest.TestCase):
+    test_uri = "https://test_host"
+
+    def test_path_template(self):
+        self.assertEqual(
+            "/v5/boards/{id}/pins",
+            path_template(self.test_uri + "/v5/boards/12345/pins?bookmark=b"),
+        )
+        self.assertEqual(
+            "/v5/ad_accounts/{id}/campaigns/{id}",
+            path_template(self.test_uri + "/v5/ad_accounts/549/campaigns/626"),
+        )
+        self.assertEqual("/v5/user_account", path_template("/v5/user_account"))
+
+    def test_histogram(self):
+        histogram = LatencyHistogram()
+        self.assertIsNone(histogram.quantile(0.5))
+        for milliseconds in range(1, 1001):
+            histogram.record(milliseconds / 1000)
+        self.assertEqual(1000, histogram.count)
+        self.assertEqual(0.001, histogram.min)
+        self.assertEqual(1.0, histogram.max)
+        # quantiles are accurate to two significant figures
+        self.assertAlmostEqual(0.5, histogram.quantile(0.5), delta=0.5 * 0.021)
+        self.assertAlmostEqual(0.99, histogram.quantile(0.99), delta=0.99 * 0.021)
+        self.assertEqual(1.0, histogram.quantile(1.0))
+        # the number of buckets does not grow with the number of values
+        self.assertLess(len(histogram.buckets), 300)
+
+    @requests_mock.Mocker()
+    def test_session_metrics(self, rm):
+        metrics = RequestMetrics()
+        session = HttpSession(metrics=metrics)
+        rm.get(
+            self.test_uri + "/v5/boards/1",
+            headers={"x-pinterest-rid": "rid-1"},
+            text="0123456789",
+        )
+        rm.get(self.test_uri + "/v5/boards/2", status_code=404, text="")
+        rm.post(self.test_uri + "/v5/pins", text="{}")
+        rm.get(self.test_uri + "/v5/pins/3", exc=requests.ConnectTimeout)
+
+        session.get(self.test_uri + "/v5/boards/1")
+        session.get(self.test_uri + "/v5/boards/2")
+        session.post(self.test_uri + "/v5/pins", data="abcde")
+        with self.assertRaises(requests.ConnectTimeout):
+            session.get(self.test_uri + "/v5/pins/3")
+
+        summary = {(e["method"], e["path"]): e for e in metrics.summary()}
+        boards = summary[("GET", "/v5/boards/{id}")]
+        self.assertEqual(2, boards["requests"])
+        self.assertEqual({"200": 1, "404": 1}, boards["statuses"])
+        self.assertEqual(10, boards["bytes_in"])
+        self.assertEqual(2, boards["total_seconds"]["count"])
+        self.assertEqual(2, boards["ttfb_seconds"]["count"])
+        self.assertEqual("rid-1", boards["slowest_rid"])
+        self.assertEqual(5, summary[("POST", "/v5/pins")]["bytes_out"])
+        self.assertEqual({"error": 1}, summary[("GET", "/v5/pins/{id}")]["statuses"])
+
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = os.path.join(directory, "metrics.json")
+            metrics.write(json_path)
+            with open(json_path) as json_file:
+                self.assertEqual(metrics.summary(), json.load(json_file))
+
+            prometheus_path = os.path.join(directory, "metrics.prom")
+            metrics.write(prometheus_path)
+            with open(prometheus_path) as prometheus_file:
+                prometheus = prometheus_file.read()
+        labels = 'method="GET",path="/v5/boards/{id}"'
+        self.assertIn(
+            f'pinterest_api_requests_total{{{labels},status="404"}} 1', prometheus
+        )
+        self.assertIn(f"pinterest_api_response_bytes_total{{{labels}}} 10", prometheus)
+        self.assertIn(
+            f"pinterest_api_request_duration_seconds_count{{{labels}}} 2", prometheus
+        )
+        self.assertIn(
+            f'pinterest_api_time_to_first_byte_seconds{{{labels},quantile="0.5"}}',
+            prometheus,
+        )
@@ -0,0 +1,163 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import requests
+import requests_mock
+
+from http_session import HttpSession
+from response_cache import ResponseCache
+
+
+class ResponseCacheTest(unittest.TestCase):
+    test_uri = "https://test_host"
+    headers_1 = {"Authorization": "Bearer token-1"}
+    headers_2 = {"Authorization": "Bearer token-2"}
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(self.directory.name)
+        self.session = HttpSession(response_cache=self.cache)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_ttl(self):
+        self.assertEqual(3600, self.cache.ttl(self.test_uri + "/v5/user_account"))
+        self.assertEqual(600, self.cache.ttl(self.test_uri + "/v5/boards/123"))
+        self.assertEqual(
+            900, self.cache.ttl(self.test_uri + "/v5/user_account/analytics?a=b")
+        )
+        self.assertIsNone(self.cache.ttl(self.test_uri + "/v5/boards/123/pins"))
+
+    @requests_mock.Mocker()
+    def test_cache(self, rm):
+        url = self.test_uri + "/v5/user_account"
+        rm.get(url, json={"username": "pindexter"})
+
+        # the second request for the same token is returned from the cache
+        response = self.session.get(url, headers=self.headers_1)
+        self.assertFalse(hasattr(response, "from_cache"))
+        response = self.session.get(url, headers=self.headers_1)
+        self.assertTrue(response.from_cache)
+        self.assertEqual({"username": "pindexter"}, response.json())
+        self.assertEqual(1, rm.call_count)
+
+        # each token has its own cache entry, which does not contain the token
+        self.session.get(url, headers=self.headers_2)
+        self.assertEqual(2, rm.call_count)
+        for name in os.listdir(self.directory.name):
+            with open(os.path.join(self.directory.name, name)) as cache_file:
+                self.assertNotIn("token-", cache_file.read())
+
+        # only GET requests for endpoints with a ttl are cached
+        rm.post(url, json={})
+        rm.get(self.test_uri + "/v5/pins/1", json={})
+        self.session.post(url, headers=self.headers_1)
+        self.session.get(self.test_uri + "/v5/pins/1", headers=self.headers_1)
+        self.session.get(self.test_uri + "/v5/pins/1", headers=self.headers_1)
+        self.assertEqual(5, rm.call_count)
+
+        # errors are not cached
+        rm.get(self.test_uri + "/v5/boards/1", status_code=500)
+        self.session.get(self.test_uri + "/v5/boards/1", headers=self.headers_1)
+        self.session.get(self.test_uri + "/v5/boards/1", headers=self.headers_1)
+        self.assertEqual(7, rm.call_count)
+
+    @requests_mock.Mocker()
+    def test_conditional_request(self, rm):
+        url = self.test_uri + "/v5/boards/1"
+        rm.get(url, headers={"ETag": '"v1"'}, json={"name": "board"})
+        self.session.get(url, headers=self.headers_1)
+
+        # after the ttl, the request is sent with the ETag
+        rm.get(url, status_code=304)
+        with mock.patch("response_cache.time.time", return_value=time.time() + 601):
+            with mock.patch.object(
+                requests.Response, "close", autospec=True
+            ) as mock_close:
+                response = self.session.get(url, headers=self.headers_1)
+        self.assertEqual(304, mock_close.call_args.args[0].status_code)
+        self.assertEqual('"v1"', rm.last_request.headers["If-None-Match"])
+        self.assertNotIn("If-None-Match", self.headers_1)  # caller's dict unchanged
+        self.assertTrue(response.from_cache)
+        self.assertEqual({"name": "board"}, response.json())
+
+        # the 304 response reset the age of the cached response
+        response = self.session.get(url, headers=self.headers_1)
+        self.assertTrue(response.from_cache)
+        self.assertEqual(2, rm.call_count)
+
+    @requests_mock.Mocker()
+    def test_stale_while_revalidate(self, rm):
+        self.cache.stale_while_revalidate = True
+        url = self.test_uri + "/v5/boards/1"
+        rm.get(url, json={"name": "old"})
+        self.session.get(url, headers=self.headers_1)
+
+        # the stale response is returned and refreshed in the background
+        rm.get(url, json={"name": "new"})
+        with mock.patch("response_cache.time.time", return_value=time.time() + 601):
+            with mock.patch("http_session.threading.Thread") as mock_thread:
+                response = self.session.get(url, headers=self.headers_1)
+                self.assertEqual({"name": "old"}, response.json())
+                thread_kwargs = mock_thread.call_args.kwargs
+                thread_kwargs["target"](*thread_kwargs["args"])  # run revalidation
+        response = self.session.get(url, headers=self.headers_1)
+        self.assertEqual({"name": "new"}, response.json())
+        self.assertEqual(2, rm.call_count)
+
+    @requests_mock.Mocker()
+    def test_eviction(self, rm):
+        for index in range(10):
+            url = f"{self.test_uri}/v5/boards/{index}"
+            rm.get(url, json={"name": "x" * 200})
+            self.session.get(url, headers=self.headers_1)
+            if index == 0:  # room for three responses, which vary a little in size
+                (entry,) = os.scandir(self.directory.name)
+                self.cache.max_bytes = 3 * entry.stat().st_size + 100
+            self.cache.get(self.test_uri + "/v5/boards/0", self.headers_1)  # recent
+
+        entries = list(os.scandir(self.directory.name))
+        self.assertEqual(3, len(entries))
+        # the most recently used responses are still in the cache
+        for index in [0, 8, 9]:
+            self.assertIsNotNone(
+                self.cache.get(f"{self.test_uri}/v5/boards/{index}", self.headers_1)
+            )
+
+    @requests_mock.Mocker()
+    def test_invalidation(self, rm):
+        board_url = self.test_uri + "/v5/boards/1"
+        sections_url = board_url + "/sections"
+        other_url = self.test_uri + "/v5/boards/2"
+        for url in [board_url, sections_url, other_url]:
+            rm.get(url, json={})
+            self.session.get(url, headers=self.headers_1)
+        self.assertEqual(3, rm.call_count)
+
+        # a new section invalidates the list of sections and the board
+        rm.post(sections_url, json={})
+        self.session.post(sections_url, headers=self.headers_1)
+        rm.reset_mock()
+        for url in [board_url, sections_url, other_url]:
+            self.session.get(url, headers=self.headers_1)
+        self.assertEqual(
+            [board_url, sections_url], [request.url for request in rm.request_history]
+        )
+
+        # responses saved by another instance of the cache are invalidated too
+        session = HttpSession(response_cache=ResponseCache(self.directory.name))
+        rm.delete(sections_url + "/5", status_code=204)
+        session.delete(sections_url + "/5", headers=self.headers_2)
+        self.assertEqual(1, len(os.listdir(self.directory.name)))
+        rm.reset_mock()
+        session.get(other_url, headers=self.headers_1)
+        self.assertEqual(0, rm.call_count)
+
+        # the directory is not scanned to save a response that fits in the cache
+        with mock.patch("response_cache.os.scandir") as mock_scandir:
+            self.session.get(board_url, headers=self.headers_1)
+        mock_scandir.assert_not_called()
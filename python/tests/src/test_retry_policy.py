@@ -0,0 +1,85 @@
+import email.utils
+import time
+import unittest
+from unittest import mock
+
+from retry_policy import RetryPolicy
+
+
+def mock_response(status_code, headers={}, json=None):
+    response = mock.Mock()
+    response.status_code = status_code
+    response.headers = headers
+    response.json.return_value = json or {}
+    return response
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def test_should_retry(self):
+        policy = RetryPolicy(max_retries=2)
+
+        # retry rate limits and temporary server errors
+        self.assertTrue(policy.should_retry("GET", mock_response(429), 0))
+        self.assertTrue(policy.should_retry("get", mock_response(503), 1))
+        self.assertTrue(policy.should_retry("DELETE", mock_response(500), 0))
+
+        # do not retry after max_retries or for other statuses
+        self.assertFalse(policy.should_retry("GET", mock_response(429), 2))
+        self.assertFalse(policy.should_retry("GET", mock_response(404), 0))
+        self.assertFalse(policy.should_retry("GET", mock_response(200), 0))
+
+        # POST is retried only when it is marked as safe
+        self.assertFalse(policy.should_retry("POST", mock_response(429), 0))
+        self.assertTrue(policy.should_retry("POST", mock_response(429), 0, True))
+
+        # spam is never retried
+        spam = mock_response(429, json={"message_detail": "blah blah Spam yada"})
+        self.assertFalse(policy.should_retry("GET", spam, 0))
+        self.assertFalse(policy.should_retry("POST", spam, 0, True))
+
+        # no retries by default for a policy without retries
+        self.assertFalse(RetryPolicy(max_retries=0).can_retry("GET", 0))
+
+    def test_server_delay(self):
+        self.assertIsNone(RetryPolicy.server_delay(mock_response(429)))
+        self.assertEqual(
+            7.0, RetryPolicy.server_delay(mock_response(429, {"Retry-After": "7"}))
+        )
+        self.assertEqual(
+            12.0,
+            RetryPolicy.server_delay(mock_response(429, {"x-ratelimit-reset": "12"})),
+        )
+
+        # HTTP date and UNIX timestamp formats
+        retry_date = email.utils.formatdate(time.time() + 60, usegmt=True)
+        delay = RetryPolicy.server_delay(
+            mock_response(503, {"Retry-After": retry_date})
+        )
+        self.assertTrue(55 < delay <= 60)
+        reset = str(int(time.time() + 30))
+        delay = RetryPolicy.server_delay(
+            mock_response(429, {"x-ratelimit-reset": reset})
+        )
+        self.assertTrue(25 < delay <= 30)
+
+        # dates in the past mean no delay
+        self.assertEqual(
+            0.0,
+            RetryPolicy.server_delay(
+                mock_response(429, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+            ),
+        )
+
+    @mock.patch("retry_policy.random.uniform")
+    def test_delay(self, mock_uniform):
+        policy = RetryPolicy(backoff=1, max_backoff=5, max_retry_after=100)
+        mock_uniform.side_effect = lambda low, high: high  # maximum jitter
+
+        # exponential backoff up to the maximum
+        self.assertEqual(1, policy.delay(mock_response(500), 0))
+        self.assertEqual(4, policy.delay(mock_response(500), 2))
+        self.assertEqual(5, policy.delay(None, 5))
+
+        # the server delay has priority, unless it is too long
+        self.assertEqual(50, policy.delay(mock_response(429, {"Retry-After": "50"}), 0))
+        self.assertIsNone(policy.delay(mock_response(429, {"Retry-After": "500"}), 0))
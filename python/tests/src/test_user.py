@@ -68,5 +68,5 @@ class UserTest(unittest.TestCase):
             self.assertEqual(expected_pins[index], pin)
 
         mock_api_object_get_iterator.assert_called_once_with(
-            "/v5/pins", {"param1": "value1"}
+            "/v5/pins", {"param1": "value1"}, None
         )